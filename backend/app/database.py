@@ -2,7 +2,7 @@
 Database configuration and models for SQLite
 """
 import os
-from sqlalchemy import create_engine, Column, String, Integer, DateTime
+from sqlalchemy import create_engine, inspect, text, Column, String, Integer, DateTime, Boolean, Text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import datetime
@@ -27,10 +27,59 @@ class FileMetadata(Base):
     size = Column(Integer, nullable=False)
     type = Column(String, nullable=False)
     company = Column(String, nullable=True)
+    sha256 = Column(String, nullable=True, index=True)  # content hash -> StoredBlob
+
+# Content-addressed upload blob shared by every FileMetadata row with the same bytes
+class StoredBlob(Base):
+    __tablename__ = "stored_blobs"
+
+    sha256 = Column(String, primary_key=True, index=True)
+    path = Column(String, nullable=False)  # relative to the uploads directory
+    size = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+# Background analysis job (see app.services.job_service)
+class AnalysisJob(Base):
+    __tablename__ = "analysis_jobs"
+
+    id = Column(String, primary_key=True, index=True)
+    status = Column(String, nullable=False, default="queued", index=True)  # queued | running | succeeded | failed
+    stage = Column(String, nullable=True)
+    progress = Column(Text, nullable=True)  # JSON of the latest progress event
+    file_id = Column(String, nullable=True)
+    pdf_path = Column(String, nullable=False)
+    sha256 = Column(String, nullable=True)  # content hash of pdf_path when known (analysis cache key)
+    owns_file = Column(Boolean, default=False)  # pdf_path was uploaded with the job; remove when done
+    prefer_label_column = Column(Boolean, default=True)
+    result = Column(Text, nullable=True)  # JSON
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 # Create tables
 def init_db():
     Base.metadata.create_all(bind=engine)
+    _add_missing_columns()
+
+def _add_missing_columns():
+    """
+    create_all() does not alter existing tables, so add columns (and their indexes)
+    introduced after a database file was first created.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            missing = [c for c in table.columns if c.name not in existing]
+            for col in missing:
+                col_type = col.type.compile(dialect=engine.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {col.name} {col_type}"))
+            if missing:
+                for index in table.indexes:
+                    index.create(bind=conn, checkfirst=True)
 
 # Dependency for routes
 def get_db():
@@ -0,0 +1,44 @@
+# app/routes/admin.py
+"""
+Admin routes for inspecting and purging backend caches.
+"""
+import logging
+from fastapi import APIRouter, HTTPException
+
+from app.services.analysis_cache import analysis_cache
+
+router = APIRouter()
+logger = logging.getLogger("app.routes.admin")
+
+
+@router.get("/cache")
+def cache_stats():
+    """
+    Inspect the analysis result cache (entries, size on disk, hit/miss counters).
+    """
+    try:
+        return analysis_cache.stats()
+    except Exception:
+        logger.exception("Failed to read analysis cache stats")
+        raise HTTPException(status_code=500, detail="could_not_read_cache")
+
+
+@router.delete("/cache")
+def purge_cache():
+    """
+    Remove every cached analysis result.
+    """
+    removed = analysis_cache.purge()
+    return {"message": "Cache purged", "documents_removed": removed}
+
+
+@router.delete("/cache/{sha256}")
+def evict_cache_entry(sha256: str):
+    """
+    Remove cached analysis results for one document, by PDF SHA-256.
+    """
+    try:
+        removed = analysis_cache.evict(sha256.lower())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="invalid_sha256")
+    return {"message": "Cache entry evicted", "entries_removed": removed}
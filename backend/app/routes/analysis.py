@@ -45,25 +45,28 @@
 
 
 # app/routes/analysis.py
+import asyncio
 import os
 import tempfile
 import logging
-from typing import Any
+from itertools import islice
+from typing import Any, Optional
 
-from fastapi import APIRouter, UploadFile, File, HTTPException, Query
+from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Depends
 from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
 
-from app.services.ocr_service import OcrService, OcrServiceError
-from app.services.parser_service import ParserService
+from app.database import get_db
+
+from app.services.ocr_service import OcrServiceError
+from app.services.analysis_pipeline import analyze_with_cache, lookup_analysis
+from app.services.executor import run_in_process
+from app.services.storage_service import resolve_file, iter_stored_files, UPLOAD_DIR
+from app.utils.upload_stream import save_upload, UploadTooLargeError
 
 router = APIRouter()
 logger = logging.getLogger("app.routes.analysis")
 
-# Shared absolute uploads directory (same logic as upload.py)
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-STORAGE_DIR = os.path.normpath(os.path.join(BASE_DIR, "..", "uploads"))
-os.makedirs(STORAGE_DIR, exist_ok=True)
-
 
 # POST /analyze  -> upload + analyze immediately
 @router.post("/", tags=["Analysis"])
@@ -74,20 +77,21 @@ async def analyze_pdf(
     """
     Upload a PDF and analyze immediately. Returns same JSON as GET /analyze/{file_id}.
     """
-    # Save to temp file and analyze
+    # Stream to temp file (hashing as we go) and analyze
     suffix = ".pdf" if (file.filename or "").lower().endswith(".pdf") else ""
     tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
     tmp_path = tmp.name
+    tmp.close()
     try:
-        content = await file.read()
-        tmp.write(content)
-        tmp.flush()
-        tmp.close()
-        logger.info("Temporary uploaded file saved: %s", tmp_path)
+        size, sha256 = await save_upload(file, tmp_path)
+        logger.info("Temporary uploaded file saved: %s (%d bytes)", tmp_path, size)
 
-        response = _run_analysis(tmp_path, prefer_label_column)
+        response = await _run_analysis(tmp_path, prefer_label_column, sha256)
         return response
 
+    except UploadTooLargeError:
+        raise HTTPException(status_code=413, detail="file_too_large")
+
     except Exception:
         logger.exception("Failed during POST /analyze")
         raise HTTPException(status_code=500, detail="internal_error")
@@ -103,21 +107,23 @@ async def analyze_pdf(
 
 # GET /analyze/{file_id} -> analyze previously uploaded file
 @router.get("/{file_id}", tags=["Analysis"])
-def analyze_stored(
+async def analyze_stored(
     file_id: str,
-    prefer_label_column: bool = Query(True)
+    prefer_label_column: bool = Query(True),
+    db: Session = Depends(get_db),
 ) -> Any:
     """
     Analyze a previously uploaded file by file_id (returned from /upload).
     """
-    file_path = os.path.join(STORAGE_DIR, file_id)
-    if not os.path.exists(file_path):
-        logger.warning("Requested file not found: %s", file_path)
+    found = resolve_file(db, file_id)
+    if not found:
+        logger.warning("Requested file not found: %s", file_id)
         raise HTTPException(status_code=404, detail="file_not_found")
+    file_path, sha256 = found
 
     logger.info("Analyzing stored file: %s", file_path)
     try:
-        return _run_analysis(file_path, prefer_label_column)
+        return await _run_analysis(file_path, prefer_label_column, sha256)
     except Exception:
         logger.exception("Failed during GET /analyze/{file_id}")
         raise HTTPException(status_code=500, detail="internal_error")
@@ -125,10 +131,21 @@ def analyze_stored(
 
 # Debug helper: list stored uploads (secure enough for local dev)
 @router.get("/debug/uploads", tags=["Debug"])
-def debug_list_uploads():
+def debug_list_uploads(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+):
     try:
-        files = sorted(os.listdir(STORAGE_DIR))
-        return {"storage_dir": STORAGE_DIR, "files": files}
+        # lazy scandir walk: cost is offset + limit entries, not the whole tree
+        page = list(islice(iter_stored_files(), offset, offset + limit + 1))
+        has_more = len(page) > limit
+        return {
+            "storage_dir": UPLOAD_DIR,
+            "offset": offset,
+            "limit": limit,
+            "files": page[:limit],
+            "next_offset": offset + limit if has_more else None,
+        }
     except Exception:
         logger.exception("Failed to list uploads directory")
         raise HTTPException(status_code=500, detail="could_not_list_uploads")
@@ -158,43 +175,22 @@ def extract_important_kpis(parsed):
     }
 
 # Shared pipeline
-def _run_analysis(pdf_path: str, prefer_label_column: bool):
+async def _run_analysis(pdf_path: str, prefer_label_column: bool, sha256: Optional[str] = None):
     """
-    Runs OCR -> table extraction -> parser and returns JSONResponse.
+    Runs OCR -> table extraction -> parser in the analysis process pool and returns JSONResponse.
+    Results are served from the content-addressed analysis cache when the same
+    PDF bytes were analyzed before with the same options; the cache is read here,
+    in the API process, so a hit never waits for a pool worker. Pass `sha256` when
+    the digest is already known (e.g. computed while streaming the upload).
     """
-    ocr = None
     try:
-        ocr = OcrService(pdf_path)
-        ocr.open()
-
-        toc_candidates = ocr._find_toc()
-        logical_start = 99
-        if toc_candidates and toc_candidates[0].get("captured"):
-            try:
-                logical_start = int(toc_candidates[0]["captured"])
-            except Exception:
-                logger.debug("Could not parse TOC captured page; using default 99")
-
-        mapped = ocr.map_logical_to_physical(logical_start)
-        pages_text = ocr.extract_pages_text(mapped["physical_start"], mapped["physical_end"])
-        tables = ocr.extract_tables(mapped["physical_start"], mapped["physical_end"])
-
-        parser = ParserService(prefer_first_column_labels=prefer_label_column)
-        result = parser.parse(tables, pages_text)
-
-        logger.info(
-            "Parsed sections: balance_sheet=%d, pnl=%d, cash_flow=%d, flags=%d",
-            len(result.get("balance_sheet", [])),
-            len(result.get("pnl", [])),
-            len(result.get("cash_flow", [])),
-            len(result.get("flags", [])),
+        cached, sha256 = await asyncio.to_thread(lookup_analysis, pdf_path, prefer_label_column, sha256)
+        if cached is not None:
+            return JSONResponse(content=cached, headers={"X-Analysis-Cache": "hit"})
+        result, cache_status = await run_in_process(
+            analyze_with_cache, pdf_path, prefer_label_column, sha256, lookup=False
         )
-
-        kpis = parser._compute_important_kpis(result)
-        result["important_kpis"] = kpis
-
-
-        return JSONResponse(content=result)
+        return JSONResponse(content=result, headers={"X-Analysis-Cache": cache_status})
 
     except OcrServiceError as e:
         logger.exception("OCR service failure")
@@ -203,10 +199,3 @@ def _run_analysis(pdf_path: str, prefer_label_column: bool):
     except Exception:
         logger.exception("Unhandled exception in analysis pipeline")
         raise HTTPException(status_code=500, detail="analysis_failed")
-
-    finally:
-        if ocr:
-            try:
-                ocr.close()
-            except Exception:
-                logger.debug("Failed to close OCR service (ignored).")
\ No newline at end of file
@@ -2,7 +2,6 @@
 File management routes using SQLite database
 Stores only metadata, temporary files deleted after analysis
 """
-import os
 from typing import List
 from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
@@ -10,15 +9,10 @@ from datetime import datetime
 
 from app.database import get_db, FileMetadata
 from app.schemas.file_schema import FileMetadataSchema, FileMetadataCreate
+from app.services.storage_service import release_file
 
 router = APIRouter()
 
-# Temporary upload directory
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-TEMP_UPLOAD_DIR = os.path.join(BASE_DIR, "backend", "app", "uploads")
-if not os.path.exists(TEMP_UPLOAD_DIR):
-    TEMP_UPLOAD_DIR = os.path.join(BASE_DIR, "app", "uploads")
-
 
 @router.get("/", response_model=List[FileMetadataSchema])
 async def list_files(db: Session = Depends(get_db)):
@@ -71,20 +65,19 @@ async def save_file_metadata(info: FileMetadataCreate, db: Session = Depends(get
 @router.delete("/{file_id}")
 async def delete_file(file_id: str, db: Session = Depends(get_db)):
     """
-    Delete file metadata from database and temporary file if exists.
+    Delete file metadata from database and release its stored bytes.
+    The shared blob (and its cached analysis) is removed only with its last reference.
     """
     file_entry = db.query(FileMetadata).filter(FileMetadata.id == file_id).first()
     
     if not file_entry:
         return {"message": "File not found", "deleted": False}
     
-    # Try to delete temporary file if it exists
+    # Release the stored blob (removed from disk when this was the last reference)
     try:
-        temp_file_path = os.path.join(TEMP_UPLOAD_DIR, file_entry.stored_as)
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
+        release_file(db, file_entry)
     except Exception as e:
-        print(f"Warning: failed to remove temporary file: {e}")
+        print(f"Warning: failed to release stored file: {e}")
     
     # Delete from database
     db.delete(file_entry)
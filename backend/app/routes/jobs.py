@@ -0,0 +1,151 @@
+# app/routes/jobs.py
+"""
+Asynchronous analysis jobs.
+
+POST /jobs/analyze          -> queue analysis of an upload or a stored file_id, returns job id (202);
+                               uploads are stored like POST /upload (content-addressed blob + file_id)
+GET  /jobs/{job_id}         -> status, latest progress and (when finished) the analysis result
+GET  /jobs/{job_id}/events  -> Server-Sent Events stream of per-stage / per-page progress
+"""
+import asyncio
+import json
+import logging
+import os
+import uuid
+from typing import Optional
+
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query, Request, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.services.job_service import job_manager, TERMINAL_STATUSES
+from app.services.storage_service import (
+    blob_abspath,
+    incoming_path,
+    register_file,
+    release_blob,
+    resolve_file,
+    store_upload,
+)
+from app.utils.company_extract import extract_company_name
+from app.utils.upload_stream import save_upload, UploadTooLargeError
+
+router = APIRouter()
+logger = logging.getLogger("app.routes.jobs")
+
+SSE_POLL_SECONDS = 0.5
+SSE_KEEPALIVE_SECONDS = 15
+
+
+@router.post("/analyze", status_code=202)
+async def submit_analysis_job(
+    file: Optional[UploadFile] = File(None),
+    file_id: Optional[str] = Form(None),
+    prefer_label_column: bool = Query(True),
+    db: Session = Depends(get_db),
+):
+    """
+    Queue an analysis job. Send either a PDF `file` or the `file_id` of a previous upload.
+    An uploaded file is stored like POST /upload does (one blob per content hash) and
+    gets a file_id, returned with the job id; its digest, computed while streaming,
+    is the analysis cache key.
+    """
+    if file is not None:
+        original_name = os.path.basename(file.filename or "upload.pdf")
+        file_id = f"{uuid.uuid4().hex}_{original_name}"
+        tmp_path = incoming_path(original_name)
+        try:
+            size, sha256 = await save_upload(file, tmp_path)
+            blob, _ = store_upload(db, tmp_path, sha256, size, original_name)
+            try:
+                register_file(
+                    db,
+                    file_id,
+                    name=original_name,
+                    size=size,
+                    content_type=file.content_type or "application/pdf",
+                    sha256=sha256,
+                    company=extract_company_name(original_name),
+                )
+            except Exception:
+                # give back the reference store_upload took, or the blob is never removed
+                db.rollback()
+                release_blob(db, sha256)
+                raise
+        except UploadTooLargeError:
+            raise HTTPException(status_code=413, detail="file_too_large")
+        except Exception:
+            logger.exception("Failed to save job upload")
+            raise HTTPException(status_code=500, detail="could_not_save_upload")
+        pdf_path = blob_abspath(blob)
+    elif file_id:
+        found = resolve_file(db, file_id)
+        if not found:
+            raise HTTPException(status_code=404, detail="file_not_found")
+        pdf_path, sha256 = found
+    else:
+        raise HTTPException(status_code=400, detail="file_or_file_id_required")
+
+    job = job_manager.submit(pdf_path, prefer_label_column, file_id=file_id, sha256=sha256)
+    logger.info("Queued analysis job %s", job["job_id"])
+    return {"job_id": job["job_id"], "status": job["status"], "file_id": file_id}
+
+
+@router.get("/{job_id}")
+def get_job(job_id: str):
+    """
+    Job status, latest progress event and the analysis result once succeeded.
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="job_not_found")
+    return job
+
+
+def _sse(event: dict) -> str:
+    return f"id: {event.get('seq', 0)}\nevent: {event['stage']}\ndata: {json.dumps(event)}\n\n"
+
+
+@router.get("/{job_id}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """
+    Stream progress as Server-Sent Events until the job succeeds or fails.
+    Events: queued, started, opened, toc_found / pages_mapped (documents without an
+    outline, and the TOC fallback window), statements_located (sampling search, large
+    documents without an outline or TOC), pages_classified, text_extracted,
+    table_page (one per page), tables_extracted, parsed, cache_hit, succeeded, failed.
+    """
+    job = job_manager.get(job_id, include_result=False)
+    if not job:
+        raise HTTPException(status_code=404, detail="job_not_found")
+
+    async def event_stream():
+        seq = 0
+        idle = 0.0
+        while not await request.is_disconnected():
+            events = job_manager.events_since(job_id, seq)
+            for event in events:
+                seq = event["seq"]
+                yield _sse(event)
+                if event["stage"] in TERMINAL_STATUSES:
+                    return
+
+            if not events and not job_manager.is_tracked(job_id):
+                # no in-memory log (e.g. after a restart): report persisted state
+                current = job_manager.get(job_id, include_result=False)
+                if current and current["status"] in TERMINAL_STATUSES:
+                    yield _sse({"stage": current["status"], "error": current["error"]})
+                    return
+
+            idle = 0.0 if events else idle + SSE_POLL_SECONDS
+            if idle >= SSE_KEEPALIVE_SECONDS:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(SSE_POLL_SECONDS)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
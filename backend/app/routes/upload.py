@@ -46,26 +46,25 @@
 
 
 # app/routes/upload.py
-import os
 import uuid
 import logging
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.services.storage_service import incoming_path, store_upload, register_file, release_blob
 from app.utils.company_extract import extract_company_name
+from app.utils.upload_stream import save_upload, UploadTooLargeError
 
 router = APIRouter()
 logger = logging.getLogger("app.routes.upload")
 
-# Temporary storage for analysis (files will be deleted after analysis)
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-TEMP_UPLOAD_DIR = os.path.normpath(os.path.join(BASE_DIR, "..", "uploads"))
-os.makedirs(TEMP_UPLOAD_DIR, exist_ok=True)
-
 
 @router.post("/", status_code=201)
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(file: UploadFile = File(...), db: Session = Depends(get_db)):
     """
-    Upload file temporarily for analysis.
-    File will be stored temporarily and can be deleted after analysis.
+    Upload file for analysis.
+    Bytes are stored once per content hash; re-uploading an identical file reuses
+    the stored blob (and any cached analysis) instead of writing it again.
     """
     if not file:
         raise HTTPException(status_code=400, detail="No file uploaded.")
@@ -76,34 +75,51 @@ async def upload_file(file: UploadFile = File(...)):
     if ext not in allowed_exts:
         raise HTTPException(status_code=415, detail=f"Unsupported file type: {ext}")
 
-    try:
-        # Read file content
-        content = await file.read()
-        file_size = len(content)
+    detected_company = extract_company_name(original_name)
 
+    try:
         # Generate unique ID
         unique_id = f"{uuid.uuid4().hex}_{original_name}"
 
-        # Save temporarily for analysis
-        file_path = os.path.join(TEMP_UPLOAD_DIR, unique_id)
-        with open(file_path, "wb") as f:
-            f.write(content)
+        # Stream to disk, hashing as chunks arrive, then file under the content hash
+        tmp_path = incoming_path(original_name)
+        file_size, sha256 = await save_upload(file, tmp_path)
+        blob, deduplicated = store_upload(db, tmp_path, sha256, file_size, original_name)
+        try:
+            register_file(
+                db,
+                unique_id,
+                name=original_name,
+                size=file_size,
+                content_type=file.content_type or ext,
+                sha256=sha256,
+                company=detected_company,
+            )
+        except Exception:
+            # give back the reference store_upload took, or the blob is never removed
+            db.rollback()
+            release_blob(db, sha256)
+            raise
 
         logger.info(
-            "Saved file temporarily for analysis: %s (size: %d bytes)",
+            "Stored upload: %s (size: %d bytes, sha256: %s, deduplicated: %s)",
             original_name,
             file_size,
+            sha256,
+            deduplicated,
         )
+    except UploadTooLargeError:
+        raise HTTPException(status_code=413, detail="File too large.")
     except Exception as e:
         logger.exception("Failed to process uploaded file")
         raise HTTPException(status_code=500, detail=f"Could not process file: {e}")
 
-    detected_company = extract_company_name(original_name)
-
     return {
         "message": "File uploaded successfully.",
         "file_id": unique_id,
         "stored_as": unique_id,
         "size": file_size,
+        "sha256": sha256,
+        "deduplicated": deduplicated,
         "company": detected_company,
-    }
\ No newline at end of file
+    }
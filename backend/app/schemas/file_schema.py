@@ -24,6 +24,7 @@ class FileMetadataSchema(BaseModel):
     size: int
     type: str
     company: Optional[str] = None
+    sha256: Optional[str] = None
 
     class Config:
         from_attributes = True
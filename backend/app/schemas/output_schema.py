@@ -12,4 +12,5 @@ class ExtractionOutput(BaseModel):
     pnl: List[Dict[str, Any]] = []
     cash_flow: List[Dict[str, Any]] = []
     flags: List[Dict[str, Any]] = []
-    important_kpis: Dict[str, Any] = {} 
\ No newline at end of file
+    important_kpis: Dict[str, Any] = {}
+    debug: Dict[str, Any] = {} 
\ No newline at end of file
@@ -0,0 +1,167 @@
+"""
+Content-addressed on-disk cache of analysis results.
+
+An uploaded PDF never changes, so the output of the OCR -> table -> parser pipeline
+is fully determined by:
+- the SHA-256 of the PDF bytes
+- the prefer_label_column flag
+- PARSER_VERSION (bump it whenever parsing output changes)
+
+Layout on disk:
+    <ANALYSIS_CACHE_DIR>/<sha256>/<prefer_label_column>-<PARSER_VERSION>.json
+    <ANALYSIS_CACHE_DIR>/<sha256>/<name>.doc.json   (per-document data, e.g. the
+                                                    document structure / page-label map)
+
+Keeping every variant of one document under a single directory lets
+DELETE /files/{file_id} evict a document with one rmtree.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+from typing import Any, Dict, Optional
+
+from app.services.parser_service import PARSER_VERSION
+
+logger = logging.getLogger("app.services.analysis_cache")
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ANALYSIS_CACHE_DIR = os.getenv("ANALYSIS_CACHE_DIR", os.path.join(BASE_DIR, "analysis_cache"))
+
+HASH_CHUNK_SIZE = 1024 * 1024
+SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+DOC_DATA_SUFFIX = ".doc.json"
+DOC_DATA_NAME_RE = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def _is_result_entry(name: str) -> bool:
+    return name.endswith(".json") and not name.endswith(DOC_DATA_SUFFIX)
+
+
+def file_sha256(path: str) -> str:
+    """Stream the file through SHA-256 without loading it into memory."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class AnalysisCache:
+    def __init__(self, root: str, version: str = PARSER_VERSION):
+        self.root = root
+        self.version = version
+        # lookups made by this process (the API process; see analysis_pipeline.lookup_analysis)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _doc_dir(self, sha256: str) -> str:
+        if not SHA256_RE.match(sha256 or ""):
+            raise ValueError(f"invalid sha256: {sha256!r}")
+        return os.path.join(self.root, sha256)
+
+    def _entry_path(self, sha256: str, prefer_label_column: bool) -> str:
+        return os.path.join(self._doc_dir(sha256), f"{int(bool(prefer_label_column))}-{self.version}.json")
+
+    def _doc_data_path(self, sha256: str, name: str) -> str:
+        if not DOC_DATA_NAME_RE.match(name or ""):
+            raise ValueError(f"invalid document data name: {name!r}")
+        return os.path.join(self._doc_dir(sha256), f"{name}{DOC_DATA_SUFFIX}")
+
+    def get(self, sha256: str, prefer_label_column: bool) -> Optional[Dict[str, Any]]:
+        result = self._read(self._entry_path(sha256, prefer_label_column))
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def put(self, sha256: str, prefer_label_column: bool, result: Dict[str, Any]):
+        self._write(self._entry_path(sha256, prefer_label_column), result)
+
+    def get_document_data(self, sha256: str, name: str) -> Optional[Dict[str, Any]]:
+        """Per-document data stored under `name` (not counted as an analysis hit/miss)."""
+        return self._read(self._doc_data_path(sha256, name))
+
+    def put_document_data(self, sha256: str, name: str, data: Dict[str, Any]):
+        self._write(self._doc_data_path(sha256, name), data)
+
+    @staticmethod
+    def _read(path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception:
+            logger.exception(f"Corrupt analysis cache entry {path}; ignoring")
+            return None
+
+    @staticmethod
+    def _write(path: str, result: Dict[str, Any]):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # write to a temp file in the same directory and rename, so readers never see partial JSON
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(result, f)
+            os.replace(tmp_path, path)
+        except Exception:
+            logger.exception(f"Failed to write analysis cache entry {path}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def evict(self, sha256: str) -> int:
+        """Remove every cached variant of one document. Returns number of entries removed."""
+        doc_dir = self._doc_dir(sha256)
+        if not os.path.isdir(doc_dir):
+            return 0
+        removed = len([n for n in os.listdir(doc_dir) if _is_result_entry(n)])
+        shutil.rmtree(doc_dir, ignore_errors=True)
+        logger.info(f"Evicted {removed} analysis cache entries for {sha256}")
+        return removed
+
+    def purge(self) -> int:
+        """Remove the whole cache. Returns number of documents removed."""
+        removed = 0
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if entry.is_dir() and SHA256_RE.match(entry.name):
+                    shutil.rmtree(entry.path, ignore_errors=True)
+                    removed += 1
+        logger.info(f"Purged analysis cache ({removed} documents)")
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        documents = 0
+        entries = 0
+        size = 0
+        with os.scandir(self.root) as it:
+            for doc in it:
+                if not (doc.is_dir() and SHA256_RE.match(doc.name)):
+                    continue
+                documents += 1
+                with os.scandir(doc.path) as files:
+                    for f in files:
+                        if _is_result_entry(f.name):
+                            entries += 1
+                            size += f.stat().st_size
+        return {
+            "cache_dir": self.root,
+            "parser_version": self.version,
+            "documents": documents,
+            "entries": entries,
+            "bytes": size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+analysis_cache = AnalysisCache(ANALYSIS_CACHE_DIR)
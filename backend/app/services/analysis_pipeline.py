@@ -0,0 +1,435 @@
+"""
+Analysis and summary pipelines.
+
+These are plain synchronous functions that return JSON-ready dicts, so they can
+run inside a worker process (see app.services.executor) and be pickled back to
+the API process. Routes translate the exceptions raised here into HTTP errors.
+
+- run_analysis: OCR -> page classification -> table extraction on statement pages
+  (stopping once all three statements were found) -> parser (-> KPIs); pages are
+  classified from the first place that applies: the outline's financial-information
+  section (document_structure), the page the TOC entry for the summary financial
+  information maps to, the page a sampling search locates in large documents, else
+  the whole document; when not all statements were found from there, the pages next
+  to that scope are scanned for the missing ones within a page/time budget; when no
+  page classifies, a window from the outline / TOC-mapped page grows until the
+  statements are found or its page/time budget runs out
+- lookup_analysis: cached result of a PDF, looked up in the calling process; the
+  API process calls it before dispatching to the pool, so cache hits do not queue
+  behind running analyses and the cache's hit/miss counters live where
+  GET /admin/cache reads them
+- analyze_with_cache: run_analysis behind the content-addressed analysis cache
+- run_summary: outline (or TOC text) -> MD&A page range -> MD&A text -> TextRank summary
+
+run_analysis / analyze_with_cache accept an optional `progress(stage, **info)`
+callback that is invoked as each stage completes (used by the job API).
+"""
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.services.ocr_service import WINDOW_PAGE_BUDGET, WINDOW_TIME_BUDGET, OcrService
+from app.services.parser_service import ParserService
+from app.services.analysis_cache import analysis_cache, file_sha256
+from app.services.document_structure import FINANCIAL_INFORMATION, MDA, DocumentStructure, load_structure
+from app.services.keyword_matcher import SECTION_CATEGORIES
+from app.services.toc_service import extract_toc_text, detect_mda_page_range
+from app.services.mda_extractor import PAGE_OFFSET, extract_mda_text
+from app.services.summarizer import clean_text, textrank_summarize
+from app.utils.company_extract import extract_company_name
+from app.utils.memory import peak_rss_bytes, to_mb
+
+logger = logging.getLogger("app.services.analysis_pipeline")
+
+ProgressCallback = Callable[..., None]
+
+# Stop the statement search once balance sheet, P&L and cash flow were all found
+# (ANALYSIS_EARLY_EXIT=0 walks the whole document).
+EARLY_EXIT = os.getenv("ANALYSIS_EARLY_EXIT", "1") != "0"
+
+# Documents without an outline and at least this many pages locate the statements
+# with the sampling search (OcrService.locate_statement_section) before scanning.
+SAMPLE_SEARCH_MIN_PAGES = int(os.getenv("SAMPLE_SEARCH_MIN_PAGES", "300"))
+
+
+def _noop_progress(stage: str, **info: Any):
+    pass
+
+
+def _load_structure(pdf_path: str, sha256: Optional[str]) -> Optional[DocumentStructure]:
+    """Cached document structure, or None (OcrService then reads it from the PDF itself)."""
+    try:
+        return load_structure(pdf_path, sha256)
+    except Exception:
+        logger.exception("Failed to load document structure")
+        return None
+
+
+def _map_toc(ocr: OcrService, progress: ProgressCallback) -> Optional[Dict[str, Any]]:
+    """
+    The TOC entry for the summary financial information mapped to the physical page
+    carrying its heading (OcrService.map_logical_to_physical), or None when the first
+    pages hold no such TOC line with a page number.
+    """
+    toc_candidates = ocr._find_toc()
+    captured = toc_candidates[0].get("captured") if toc_candidates else None
+    try:
+        logical_start = int(captured) if captured else None
+    except ValueError:
+        logger.debug(f"Could not parse TOC captured page {captured!r}")
+        logical_start = None
+    progress("toc_found", found=logical_start is not None, source="toc_text", logical_start=logical_start)
+    if logical_start is None:
+        return None
+
+    mapped = ocr.map_logical_to_physical(logical_start)
+    progress("pages_mapped", physical_start=mapped["physical_start"], physical_end=mapped["physical_end"])
+    return mapped
+
+
+def _scan_pass(first_page: int, last_page: Optional[int], scan: Dict[str, Any]) -> Dict[str, Any]:
+    """Debug summary of one scan_statements pass."""
+    return {
+        "first_page": first_page,
+        "last_page": last_page or scan["pages_total"],
+        "pages_scanned": scan["pages_scanned"],
+        "stopped": scan["stopped"],
+        "found": scan["found"],
+    }
+
+
+def _merge_scans(first: Dict[str, Any], second: Dict[str, Any]) -> Dict[str, Any]:
+    """Results of two scan_statements passes over disjoint pages, as one scan in page order."""
+    found = {**second["found"], **first["found"]}
+    pages_scanned = first["pages_scanned"] + second["pages_scanned"]
+    return {
+        **second,
+        "statement_pages": sorted(first["statement_pages"] + second["statement_pages"]),
+        "pages": dict(sorted({**first["pages"], **second["pages"]}.items())),
+        "tables": sorted(first["tables"] + second["tables"], key=lambda t: t["page"]),
+        "pages_text": dict(sorted({**first["pages_text"], **second["pages_text"]}.items())),
+        "found": {section: found[section] for section in SECTION_CATEGORIES if section in found},
+        "pages_scanned": pages_scanned,
+        "pages_skipped": first["pages_total"] - pages_scanned,
+    }
+
+
+def _scan_outside_scope(
+    ocr: OcrService,
+    scan: Dict[str, Any],
+    first_page: int,
+    last_page: Optional[int],
+    scan_options: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Look for the statements `scan` (pages first_page..last_page) did not find on the
+    pages next to that scope: after it, then before it, at most WINDOW_PAGE_BUDGET
+    pages and WINDOW_TIME_BUDGET seconds in all. Returns `scan` merged with these
+    passes, each of them recorded under "passes".
+    """
+    total = scan["pages_total"]
+    last_page = last_page or total
+    budget = WINDOW_PAGE_BUDGET
+    ranges = []
+    if last_page < total:
+        ranges.append((last_page + 1, min(total, last_page + budget)))
+        budget -= ranges[-1][1] - last_page
+    if first_page > 1 and budget > 0:
+        ranges.append((max(1, first_page - budget), first_page - 1))
+
+    deadline = time.monotonic() + WINDOW_TIME_BUDGET
+    for start, end in ranges:
+        missing = [section for section in SECTION_CATEGORIES if section not in scan["found"]]
+        remaining = deadline - time.monotonic()
+        if not missing or remaining <= 0:
+            break
+        rescan = ocr.scan_statements(
+            first_page=start, last_page=end, sections=missing, time_budget=remaining, **scan_options
+        )
+        scan = {**_merge_scans(scan, rescan), "passes": scan["passes"] + [_scan_pass(start, end, rescan)]}
+    return scan
+
+
+def _toc_window_start(
+    ocr: OcrService,
+    progress: ProgressCallback,
+    toc: Optional[Dict[str, Any]],
+    sampling: Optional[Dict[str, Any]],
+) -> int:
+    """
+    Fallback start page when no page classifies as a statement: the outline entry for
+    the financial information, else the TOC-mapped page (`toc`, from _map_toc), else
+    the sampling search's start (`sampling` when it already ran), else logical page 99
+    mapped to its physical page.
+    """
+    outline_range = ocr.structure().section_range(FINANCIAL_INFORMATION)
+    if outline_range:
+        progress("toc_found", found=True, source="outline", physical_start=outline_range[0])
+        return outline_range[0]
+    if toc is not None:
+        return toc["physical_start"]
+
+    located = sampling or ocr.locate_statement_section()
+    if located["start"]:
+        progress("toc_found", found=False, source="sampling", physical_start=located["start"])
+        return located["start"]
+
+    mapped = ocr.map_logical_to_physical(99)
+    progress("pages_mapped", physical_start=mapped["physical_start"], physical_end=mapped["physical_end"])
+    return mapped["physical_start"]
+
+
+def run_analysis(
+    pdf_path: str,
+    prefer_label_column: bool,
+    progress: Optional[ProgressCallback] = None,
+    sha256: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Runs OCR -> page classification -> table extraction -> parser and returns the result dict.
+    The document structure (outline / page-label map) is shared with run_summary
+    through the analysis cache when `sha256` is given.
+    Raises OcrServiceError for PDF-level failures.
+    """
+    progress = progress or _noop_progress
+    ocr = None
+    try:
+        ocr = OcrService(pdf_path, structure=_load_structure(pdf_path, sha256))
+        ocr.open()
+        progress("opened", pages=len(ocr._pdf.pages))
+
+        parser = ParserService(prefer_first_column_labels=prefer_label_column)
+        scan_options = dict(
+            is_confident=parser.is_confident_statement,
+            early_exit=EARLY_EXIT,
+            on_page=lambda page, n_tables: progress("table_page", page=page, tables=n_tables),
+        )
+        # start at the outline's financial-information section, else at the page the
+        # TOC points to, else (large documents) where the sampling search locates the
+        # statements; the whole document when none applies or not all statements
+        # were found from there
+        scope, first_page, last_page = "document", 1, None
+        toc = sampling = None
+        outline_range = ocr.structure().section_range(FINANCIAL_INFORMATION)
+        if outline_range:
+            scope, (first_page, last_page) = "outline", outline_range
+        else:
+            toc = _map_toc(ocr, progress)
+            if toc is not None:
+                scope, first_page = "toc", toc["physical_start"]
+            elif len(ocr._pdf.pages) >= SAMPLE_SEARCH_MIN_PAGES:
+                sampling = ocr.locate_statement_section()
+                progress("statements_located", **sampling)
+                if sampling["confirmed"]:
+                    scope, first_page = "sampled", sampling["start"]
+        scan = ocr.scan_statements(first_page=first_page, last_page=last_page, **scan_options)
+        scan["passes"] = [_scan_pass(first_page, last_page, scan)]
+        if scope != "document" and len(scan["found"]) < len(SECTION_CATEGORIES):
+            logger.warning(
+                f"Pages {first_page}-{last_page or 'end'} ({scope}) hold only {sorted(scan['found'])}; "
+                f"scanning up to {WINDOW_PAGE_BUDGET} pages next to them"
+            )
+            scan = _scan_outside_scope(ocr, scan, first_page, last_page, scan_options)
+        statement_pages = scan["statement_pages"]
+        progress(
+            "pages_classified",
+            pages_scanned=scan["pages_scanned"],
+            statement_pages=statement_pages,
+            ended_at_page=scan["ended_at_page"],
+            pages_skipped=scan["pages_skipped"],
+        )
+        if statement_pages:
+            pages_text, tables = scan["pages_text"], scan["tables"]
+        else:
+            logger.warning("Page classifier found no statement pages; falling back to the TOC window")
+            window = ocr.extract_adaptive_window(
+                _toc_window_start(ocr, progress, toc, sampling),
+                classify=parser._classify_page,
+                is_confident=parser.is_confident_statement,
+                on_page=lambda page, n_tables: progress("table_page", page=page, tables=n_tables),
+            )
+            pages_text, tables = window["pages_text"], window["tables"]
+            scan["window"] = {k: window[k] for k in ("start", "end", "stopped", "found")}
+        progress("text_extracted", pages=len(pages_text))
+        progress("tables_extracted", tables=len(tables))
+
+        result = parser.parse(tables, pages_text)
+
+        logger.info(
+            "Parsed sections: balance_sheet=%d, pnl=%d, cash_flow=%d, flags=%d",
+            len(result.get("balance_sheet", [])),
+            len(result.get("pnl", [])),
+            len(result.get("cash_flow", [])),
+            len(result.get("flags", [])),
+        )
+
+        # important_kpis were computed by parse() on the columnar statements
+        result.setdefault("debug", {}).update(
+            page_classifier={
+                "pages_scanned": scan["pages_scanned"],
+                "statement_pages": {str(p): info for p, info in scan["pages"].items()},
+            },
+            statement_search={
+                "early_exit": EARLY_EXIT,
+                "scope": scope,
+                "outline_range": list(outline_range) if outline_range else None,
+                "toc_start": toc["physical_start"] if toc else None,
+                "sampling": sampling,
+                "found": scan["found"],
+                "pages_total": scan["pages_total"],
+                "pages_scanned": scan["pages_scanned"],
+                "ended_at_page": scan["ended_at_page"],
+                "pages_skipped": scan["pages_skipped"],
+                "passes": scan["passes"],
+                "toc_window": scan.get("window"),
+            },
+            document_structure={
+                "outline_entries": len(ocr.structure().outline),
+                "label_source": ocr.structure().label_source,
+            },
+            page_cache=ocr.cache_stats(),
+            memory=ocr.memory_stats(),
+        )
+        logger.info(
+            "Analysis memory: peak RSS %.1f MiB (+%.1f MiB for this document, process peak %.1f MiB)",
+            to_mb(ocr.rss_peak),
+            to_mb(max(0, ocr.rss_peak - ocr.rss_start)),
+            to_mb(peak_rss_bytes()),
+        )
+        progress(
+            "parsed",
+            balance_sheet=len(result.get("balance_sheet", [])),
+            pnl=len(result.get("pnl", [])),
+            cash_flow=len(result.get("cash_flow", [])),
+        )
+        return result
+
+    finally:
+        if ocr:
+            try:
+                ocr.close()
+            except Exception:
+                logger.debug("Failed to close OCR service (ignored).")
+
+
+def lookup_analysis(
+    pdf_path: str,
+    prefer_label_column: bool,
+    sha256: Optional[str] = None,
+) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Cached analysis of the PDF with these options, or None.
+    The PDF is hashed here unless its `sha256` is already known.
+    Returns (result or None, sha256 or None when hashing failed).
+    """
+    if not sha256:
+        try:
+            sha256 = file_sha256(pdf_path)
+        except Exception:
+            logger.exception("Failed to hash PDF for analysis cache")
+            return None, None
+
+    cached = analysis_cache.get(sha256, prefer_label_column)
+    if cached is not None:
+        logger.info("Analysis cache hit: %s", sha256)
+    return cached, sha256
+
+
+def analyze_with_cache(
+    pdf_path: str,
+    prefer_label_column: bool,
+    sha256: Optional[str] = None,
+    progress: Optional[ProgressCallback] = None,
+    lookup: bool = True,
+) -> Tuple[Dict[str, Any], str]:
+    """
+    Serve run_analysis from the content-addressed cache when the same PDF bytes were
+    analyzed before with the same options. Returns (result, "hit" | "miss").
+    The PDF is hashed here unless its `sha256` is already known. With `lookup=False`
+    the caller already missed in lookup_analysis: the analysis runs and is stored.
+    """
+    progress = progress or _noop_progress
+    if lookup:
+        cached, sha256 = lookup_analysis(pdf_path, prefer_label_column, sha256)
+        if cached is not None:
+            progress("cache_hit", sha256=sha256)
+            return cached, "hit"
+
+    result = run_analysis(pdf_path, prefer_label_column, progress, sha256)
+    if sha256:
+        analysis_cache.put(sha256, prefer_label_column, result)
+    return result, "miss"
+
+
+def run_summary(
+    file_path: str,
+    file_id: str,
+    display_name: Optional[str] = None,
+    sha256: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Extract the MD&A section and summarize it.
+    `display_name` (default: the file name) is what the company name is inferred from.
+    The MD&A pages come from the PDF outline when it has an MD&A entry; otherwise
+    from the TOC text, mapped to physical pages through the document's page-label
+    map (or mda_extractor.PAGE_OFFSET when there is none). The PDF is hashed here
+    unless its `sha256` is already known, to share the cached structure.
+    Returns {"success": False, "error": "toc_not_found"} when neither exists.
+    """
+    company = extract_company_name(display_name or os.path.basename(file_path))
+    if not sha256:
+        try:
+            sha256 = file_sha256(file_path)
+        except Exception:
+            logger.exception("Failed to hash PDF for the document structure cache")
+    structure = _load_structure(file_path, sha256) or DocumentStructure(0)
+
+    # Step 1 + 2 — MD&A page range: outline first, TOC text as the fallback
+    outline_range = structure.section_range(MDA)
+    if outline_range:
+        physical_start, physical_end = outline_range
+        start_page = structure.logical_page(physical_start) or physical_start
+        end_page = structure.logical_page(physical_end) or physical_end
+        toc_preview = structure.outline_preview()
+        source = "outline"
+    else:
+        toc_text = extract_toc_text(file_path)
+        if not toc_text.strip():
+            return {"success": False, "error": "toc_not_found"}
+
+        start_page, end_page = detect_mda_page_range(toc_text)
+        if not start_page:
+            return {
+                "success": False,
+                "message": "MDA section not found in TOC",
+                "toc_preview": toc_text[:3000],
+            }
+        labelled = structure.physical_page(start_page)
+        offset = labelled - start_page if labelled else PAGE_OFFSET
+        physical_start, physical_end = start_page + offset, end_page + offset
+        toc_preview = toc_text[:2500]
+        source = structure.label_source if labelled else "page_offset"
+
+    # Step 3 — Extract Full MDA Text
+    mda_text = extract_mda_text(file_path, physical_start, physical_end, page_offset=0)
+
+    # Step 4 — Clean + Summarize
+    cleaned = clean_text(mda_text)
+    summary = textrank_summarize(cleaned)
+
+    return {
+        "success": True,
+        "file": file_id,
+        "company": company,
+        "section": "Management Discussion & Analysis",
+        "start_page": start_page,
+        "end_page": end_page,
+        "physical_start_page": physical_start,
+        "physical_end_page": physical_end,
+        "page_source": source,
+        "extracted_chars": len(mda_text),
+        "summary": summary,
+        "mda_text": mda_text[:25000],
+        "toc_preview": toc_preview
+    }
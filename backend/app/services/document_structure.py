@@ -0,0 +1,281 @@
+"""
+Document-structure index built from a PDF's outline (bookmarks) and /PageLabels.
+
+Exchange-filed offer documents usually embed both: the outline points every
+section at its physical page, and the page labels give the printed page number
+of every physical page. Both are read from the document catalog through
+pdfminer, so no page content is parsed or laid out. Without /PageLabels, the
+page-label map is derived from the printed page numbers in the footers of a
+few sampled pages (load_structure only). The index gives:
+
+- section_range(section): physical page range (1-based, inclusive) of the
+  "financial_information" or "mda" section, from the shallowest outline entry
+  whose title matches the section keywords (app.services.keyword_matcher) up to
+  the page before the next entry at the same or a higher outline level
+- physical_page(logical): physical page carrying a printed page number, for TOC
+  page numbers scraped from text
+- logical_page(physical): printed page number of a physical page
+
+Callers fall back to TOC text scraping when a document has no outline, and to a
+fixed page offset when it has no page-label map either.
+
+load_structure(pdf_path, sha256) computes the index once per document and keeps
+it in the analysis cache next to the document's analysis results
+(<sha256>/structure-<STRUCTURE_VERSION>.doc.json), so the analysis and summary
+requests of one document share it.
+
+Configuration (environment):
+- DOCUMENT_STRUCTURE: read outline/page labels (default: on; DOCUMENT_STRUCTURE=0 disables)
+- FOOTER_SAMPLE_PAGES: pages sampled for footer page numbers without /PageLabels (default: 12)
+"""
+import logging
+import os
+import re
+import time
+from collections import Counter
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple
+
+import pdfplumber
+from pdfminer.pdftypes import PDFObjRef, resolve1
+from pdfminer.psparser import PSLiteral
+
+from app.services import page_extraction
+from app.services.analysis_cache import analysis_cache
+from app.services.keyword_matcher import KEYWORD_MATCHER
+from app.services.pdf_pool import pdf_pool
+
+logger = logging.getLogger("app.services.document_structure")
+
+USE_DOCUMENT_STRUCTURE = os.getenv("DOCUMENT_STRUCTURE", "1") != "0"
+FOOTER_SAMPLE_PAGES = int(os.getenv("FOOTER_SAMPLE_PAGES", "12"))
+
+# bump whenever the cached structure changes shape or derivation
+STRUCTURE_VERSION = "1"
+
+# a printed page number alone on the last line of a page ("45", "Page 45", "- 45 -")
+FOOTER_PAGE_RE = re.compile(r"^(?:page\s*)?[-–]?\s*(\d{1,4})\s*[-–]?$", re.IGNORECASE)
+# footer offsets seen on fewer sampled pages are treated as noise
+FOOTER_MIN_VOTES = 2
+
+FINANCIAL_INFORMATION = "financial_information"
+MDA = "mda"
+
+# keyword_matcher categories an outline title is matched against, per section
+SECTION_KEYWORDS = {
+    FINANCIAL_INFORMATION: ("toc", "heading"),
+    MDA: ("mda",),
+}
+
+
+class DocumentStructure:
+    def __init__(
+        self,
+        page_count: int,
+        outline: Optional[List[Dict[str, Any]]] = None,
+        page_labels: Optional[List[str]] = None,
+        label_source: Optional[str] = None,
+    ):
+        self.page_count = page_count
+        # [{"level": int, "title": str, "page": int (1-based physical)}] in outline order
+        self.outline = outline or []
+        # printed label of each physical page (index 0 = page 1; "" = unnumbered);
+        # empty when the page numbering is unknown
+        self.page_labels = page_labels or []
+        # "page_labels" (/PageLabels), "footers" (sampled footer numbers) or None
+        self.label_source = label_source if self.page_labels else None
+        self._label_pages: Dict[str, int] = {}
+        for i, label in enumerate(self.page_labels):
+            if label:
+                self._label_pages.setdefault(label, i + 1)
+
+    @property
+    def has_outline(self) -> bool:
+        return bool(self.outline)
+
+    @property
+    def has_page_labels(self) -> bool:
+        return bool(self.page_labels)
+
+    def section_range(self, section: str) -> Optional[Tuple[int, int]]:
+        """Physical (start, end) pages of `section` from the outline, or None."""
+        categories = SECTION_KEYWORDS[section]
+        best = None
+        for i, entry in enumerate(self.outline):
+            title = entry["title"].replace("’", "'")
+            if KEYWORD_MATCHER.search(title, categories) is None:
+                continue
+            if best is None or entry["level"] < self.outline[best]["level"]:
+                best = i
+        if best is None:
+            return None
+
+        start = self.outline[best]["page"]
+        end = self.page_count
+        for entry in self.outline[best + 1:]:
+            if entry["level"] <= self.outline[best]["level"] and entry["page"] > start:
+                end = entry["page"] - 1
+                break
+        return start, end
+
+    def physical_page(self, logical: Any) -> Optional[int]:
+        """Physical page whose printed label is `logical` (first one if repeated), or None."""
+        return self._label_pages.get(str(logical).strip())
+
+    def logical_page(self, physical: int) -> Optional[int]:
+        """Printed page number of `physical` when its label is numeric, else None."""
+        if 1 <= physical <= len(self.page_labels) and self.page_labels[physical - 1].isdigit():
+            return int(self.page_labels[physical - 1])
+        return None
+
+    def outline_preview(self, max_entries: int = 60) -> str:
+        return "\n".join(
+            f"{'  ' * (e['level'] - 1)}{e['title']} .... {e['page']}" for e in self.outline[:max_entries]
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "page_count": self.page_count,
+            "outline": self.outline,
+            "page_labels": self.page_labels,
+            "label_source": self.label_source,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DocumentStructure":
+        return cls(int(data.get("page_count", 0)), data.get("outline"), data.get("page_labels"), data.get("label_source"))
+
+
+def _resolve_dest(doc, dest: Any) -> Any:
+    if isinstance(dest, (str, bytes)):
+        dest = resolve1(doc.get_dest(dest))
+    elif isinstance(dest, PSLiteral):
+        dest = resolve1(doc.get_dest(dest.name))
+    dest = resolve1(dest)
+    if isinstance(dest, dict):
+        dest = resolve1(dest.get("D"))
+    return dest
+
+
+def _outline_entries(pdf: pdfplumber.PDF) -> List[Dict[str, Any]]:
+    doc = pdf.doc
+    page_numbers = {page.page_obj.pageid: page.page_number for page in pdf.pages}
+    entries = []
+    for level, title, dest, action, _ in doc.get_outlines():
+        try:
+            if dest is None and action is not None:
+                action = resolve1(action)
+                if isinstance(action, dict) and getattr(action.get("S"), "name", None) == "GoTo":
+                    dest = action.get("D")
+            dest = _resolve_dest(doc, dest)
+            if not isinstance(dest, list) or not dest or not isinstance(dest[0], PDFObjRef):
+                continue
+            page = page_numbers.get(dest[0].objid)
+        except Exception:
+            logger.debug(f"Unresolvable outline destination for {title!r} (ignored)")
+            continue
+        if page is not None and title:
+            entries.append({"level": level, "title": " ".join(str(title).split()), "page": page})
+    return entries
+
+
+def build_structure(pdf: pdfplumber.PDF) -> DocumentStructure:
+    """Read the outline and page labels of an open document (missing or broken ones are left empty)."""
+    page_count = len(pdf.pages)
+    if not USE_DOCUMENT_STRUCTURE:
+        return DocumentStructure(page_count)
+
+    started = time.perf_counter()
+    outline: List[Dict[str, Any]] = []
+    labels: List[str] = []
+    try:
+        outline = _outline_entries(pdf)
+    except Exception:
+        # PDFNoOutlines, or a malformed outline tree
+        logger.debug("No usable document outline")
+    try:
+        labels = [str(label) for label in islice(pdf.doc.get_page_labels(), page_count)]
+    except Exception:
+        logger.debug("No usable page labels")
+
+    structure = DocumentStructure(page_count, outline, labels, "page_labels")
+    logger.info(
+        f"Document structure: {len(outline)} outline entries, page labels {'yes' if labels else 'no'}, "
+        f"financial_information={structure.section_range(FINANCIAL_INFORMATION)}, "
+        f"mda={structure.section_range(MDA)} ({(time.perf_counter() - started) * 1000:.1f} ms)"
+    )
+    return structure
+
+
+def _footer_number(page_text: str) -> Optional[int]:
+    lines = [line.strip() for line in (page_text or "").splitlines() if line.strip()]
+    if not lines:
+        return None
+    m = FOOTER_PAGE_RE.match(lines[-1])
+    return int(m.group(1)) if m else None
+
+
+def footer_page_labels(pdf_path: str, page_count: int, sample_pages: int = FOOTER_SAMPLE_PAGES) -> List[str]:
+    """
+    Page-label map from the printed page numbers in the footers of `sample_pages`
+    evenly spaced pages. Every sampled footer votes for an offset (physical - printed);
+    offsets with at least FOOTER_MIN_VOTES votes are kept, and each page takes the
+    offset of the closest kept sample before it (numbering can restart between
+    sections). Returns [] when the footers show no consistent numbering.
+    """
+    if page_count < 1 or sample_pages < FOOTER_MIN_VOTES:
+        return []
+    step = max(1, page_count // sample_pages)
+    indexes = list(range(step // 2, page_count, step))[:sample_pages]
+
+    samples = []
+    for p, text, _ in page_extraction.extract_pages(pdf_path, indexes, text=True):
+        printed = _footer_number(text)
+        if printed is not None and printed <= p + 1:
+            samples.append((p + 1, p + 1 - printed))
+    votes = Counter(offset for _, offset in samples)
+    anchors = [(page, offset) for page, offset in samples if votes[offset] >= FOOTER_MIN_VOTES]
+    if not anchors:
+        return []
+
+    labels = []
+    anchor = 0
+    for page in range(1, page_count + 1):
+        while anchor + 1 < len(anchors) and anchors[anchor + 1][0] <= page:
+            anchor += 1
+        printed = page - anchors[anchor][1]
+        labels.append(str(printed) if printed >= 1 else "")
+    logger.info(f"Page labels from footers: offsets {sorted(set(o for _, o in anchors))} ({len(samples)}/{len(indexes)} sampled footers numbered)")
+    return labels
+
+
+def load_structure(pdf_path: str, sha256: Optional[str] = None) -> DocumentStructure:
+    """
+    Document structure of `pdf_path`, with footer-derived page labels when the PDF
+    has no /PageLabels. Served from / stored in the analysis cache when `sha256` is given.
+    """
+    cache_name = f"structure-{STRUCTURE_VERSION}"
+    if sha256 and USE_DOCUMENT_STRUCTURE:
+        try:
+            cached = analysis_cache.get_document_data(sha256, cache_name)
+        except ValueError:
+            logger.warning(f"Not caching document structure for invalid sha256 {sha256!r}")
+            sha256 = None
+            cached = None
+        if cached is not None:
+            logger.debug(f"Document structure cache hit: {sha256}")
+            return DocumentStructure.from_dict(cached)
+
+    with pdf_pool.borrow(pdf_path) as pdf:
+        structure = build_structure(pdf)
+    if USE_DOCUMENT_STRUCTURE and not structure.page_labels:
+        try:
+            labels = footer_page_labels(pdf_path, structure.page_count)
+        except Exception:
+            logger.exception("Failed to derive page labels from footers")
+            labels = []
+        structure = DocumentStructure(structure.page_count, structure.outline, labels, "footers")
+
+    if sha256 and USE_DOCUMENT_STRUCTURE:
+        analysis_cache.put_document_data(sha256, cache_name, structure.to_dict())
+    return structure
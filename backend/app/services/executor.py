@@ -0,0 +1,72 @@
+"""
+Dedicated process pool for CPU-bound analysis and summary work.
+
+Routes await `run_in_process(fn, *args)` instead of calling pipelines directly,
+so pdfminer layout work never blocks the event loop (or fights over the GIL in
+Starlette's threadpool) and throughput scales with the number of cores.
+
+Configuration (environment):
+- ANALYSIS_WORKERS: analysis worker processes (default: min(4, CPUs))
+
+Each analysis worker gets its own page-extraction pool sized so that
+ANALYSIS_WORKERS x PAGE_WORKERS roughly matches the CPU count, unless
+PAGE_WORKERS is set explicitly.
+"""
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger("app.services.executor")
+
+CPU_COUNT = os.cpu_count() or 1
+ANALYSIS_WORKERS = max(1, int(os.getenv("ANALYSIS_WORKERS", "0")) or min(4, CPU_COUNT))
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _init_worker(page_workers: int):
+    """Runs once in every analysis worker process."""
+    from app.services import page_extraction
+
+    if not os.getenv("PAGE_WORKERS"):
+        page_extraction.configure(page_workers)
+
+
+def get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            page_workers = max(1, CPU_COUNT // ANALYSIS_WORKERS)
+            # spawn: the API process runs threads, which fork does not copy safely
+            _executor = ProcessPoolExecutor(
+                max_workers=ANALYSIS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(page_workers,),
+            )
+            logger.info(
+                f"Started analysis pool with {ANALYSIS_WORKERS} workers "
+                f"({page_workers} page workers each)"
+            )
+        return _executor
+
+
+async def run_in_process(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a picklable top-level function in the analysis pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(fn, *args, **kwargs))
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+            logger.info("Analysis pool shut down")
@@ -1,5 +1,7 @@
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+from app.services.statement_table import StatementTable
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -20,16 +22,45 @@ def _generate_summary(kpis: Dict[str, Any]) -> str:
         parts.append(f"Free cash flow: {kpis['free_cash_flow']}")
     return "; ".join(parts)
 
+def _latest_values(table: StatementTable) -> Iterable[Tuple[str, Optional[float]]]:
+    """(lowercased label, first numeric value) of every row of a statement table."""
+    labels = table.labels.tolist()
+    return ((str(labels[r] or "").lower(), table.first_value(r)) for r in range(len(table)))
+
+
+def _find_latest(table: Any, keywords: Tuple[str, ...]) -> Optional[float]:
+    """First numeric value of the first row whose label contains one of `keywords`."""
+    if not isinstance(table, StatementTable):
+        return None
+    for label, val in _latest_values(table):
+        if val is not None and any(k in label for k in keywords):
+            return val
+    return None
+
+
 def compute_kpis(parsed: Dict[str, Any]) -> Dict[str, Any]:
     """
     Compute financial KPIs: ROE, ROA, profit margin, current ratio, debt/equity, free cash flow.
+    `parsed` is either {"sections": {...}} with item / value_rupees entries, or the
+    {section: StatementTable} mapping of ParserService.parse_statements.
     """
     result: Dict[str, Any] = {}
     try:
-        sections = parsed.get("sections", {})
-        bs_items = sections.get("balance_sheet", [])
-        pnl = sections.get("pnl", {})
-        cf = sections.get("cash_flow", {})
+        if isinstance(parsed.get("balance_sheet"), StatementTable):
+            bs_items = ({"item": label, "current_period": val} for label, val in _latest_values(parsed["balance_sheet"]))
+            revenue = _find_latest(parsed.get("pnl"), ("total income", "revenue"))
+            net_profit = _find_latest(parsed.get("pnl"), ("profit for the period", "profit"))
+            operating_cf = _find_latest(parsed.get("cash_flow"), ("operating activities",))
+            capex = _find_latest(parsed.get("cash_flow"), ("purchase of property",))
+        else:
+            sections = parsed.get("sections", {})
+            bs_items = sections.get("balance_sheet", [])
+            pnl = sections.get("pnl", {})
+            cf = sections.get("cash_flow", {})
+            revenue = pnl.get("revenue", {}).get("value_rupees")
+            net_profit = pnl.get("net_profit", {}).get("value_rupees")
+            operating_cf = cf.get("operating_cf", {}).get("value_rupees")
+            capex = cf.get("capex", {}).get("value_rupees")
 
         # Extract values
         total_assets = None
@@ -54,11 +85,6 @@ def compute_kpis(parsed: Dict[str, Any]) -> Dict[str, Any]:
             if "current liabilities" in label:
                 current_liabilities = float(val)
 
-        revenue = pnl.get("revenue", {}).get("value_rupees")
-        net_profit = pnl.get("net_profit", {}).get("value_rupees")
-        operating_cf = cf.get("operating_cf", {}).get("value_rupees")
-        capex = cf.get("capex", {}).get("value_rupees")
-
         # Compute ratios
         try:
             if revenue is not None and net_profit is not None and revenue != 0:
@@ -0,0 +1,277 @@
+"""
+Background analysis jobs.
+
+- submit(): persist an AnalysisJob row (status=queued) and put its id on an in-process queue
+- a small pool of worker threads pulls job ids, answers cached analyses directly
+  (lookup_analysis, in the API process) and runs the others in the analysis
+  process pool (app.services.executor)
+- progress events raised inside the worker process travel back through a
+  multiprocessing manager queue; each event is appended to the job's in-memory
+  event log (streamed by GET /jobs/{id}/events) and its latest stage is written
+  to the database
+- on start(), jobs left queued/running by a previous process are re-queued, so a
+  restart does not lose work
+
+Configuration (environment):
+- JOB_WORKERS: concurrent jobs (default: ANALYSIS_WORKERS)
+"""
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from app.database import SessionLocal, AnalysisJob
+from app.services import executor
+from app.services.analysis_pipeline import analyze_with_cache, lookup_analysis
+
+logger = logging.getLogger("app.services.job_service")
+
+JOB_WORKERS = max(1, int(os.getenv("JOB_WORKERS", "0")) or executor.ANALYSIS_WORKERS)
+TERMINAL_STATUSES = ("succeeded", "failed")
+MAX_TRACKED_JOBS = 500  # in-memory event logs kept for streaming
+EVENT_POLL_SECONDS = 0.2
+
+
+class _QueueProgress:
+    """Picklable progress callback that forwards events to a manager queue."""
+
+    def __init__(self, events):
+        self.events = events
+
+    def __call__(self, stage: str, **info: Any):
+        self.events.put({"stage": stage, **info})
+
+
+def _run_job(pdf_path: str, prefer_label_column: bool, sha256: Optional[str], events) -> Dict[str, Any]:
+    """Worker-process entry point (the cache was already looked up by the job thread)."""
+    result, _ = analyze_with_cache(pdf_path, prefer_label_column, sha256, _QueueProgress(events), lookup=False)
+    return result
+
+
+def _job_to_dict(job: AnalysisJob, include_result: bool = True) -> Dict[str, Any]:
+    out = {
+        "job_id": job.id,
+        "status": job.status,
+        "stage": job.stage,
+        "progress": json.loads(job.progress) if job.progress else None,
+        "file_id": job.file_id,
+        "prefer_label_column": job.prefer_label_column,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "updated_at": job.updated_at.isoformat() if job.updated_at else None,
+    }
+    if include_result:
+        out["result"] = json.loads(job.result) if job.result else None
+    return out
+
+
+class JobManager:
+    def __init__(self, workers: int = JOB_WORKERS):
+        self.workers = workers
+        self._queue: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._events: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._mp_manager = None
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self):
+        if self._threads:
+            return
+        self._mp_manager = multiprocessing.get_context("spawn").Manager()
+        self._requeue_unfinished()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        logger.info(f"Job manager started with {self.workers} workers")
+
+    def stop(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join(timeout=5)
+        self._threads = []
+        if self._mp_manager is not None:
+            self._mp_manager.shutdown()
+            self._mp_manager = None
+
+    def _requeue_unfinished(self):
+        db = SessionLocal()
+        try:
+            jobs = (
+                db.query(AnalysisJob)
+                .filter(AnalysisJob.status.in_(["queued", "running"]))
+                .order_by(AnalysisJob.created_at)
+                .all()
+            )
+            for job in jobs:
+                job.status = "queued"
+                job.stage = "requeued"
+            db.commit()
+            for job in jobs:
+                self._queue.put(job.id)
+            if jobs:
+                logger.info(f"Re-queued {len(jobs)} unfinished jobs")
+        finally:
+            db.close()
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def submit(
+        self,
+        pdf_path: str,
+        prefer_label_column: bool = True,
+        file_id: Optional[str] = None,
+        owns_file: bool = False,
+        sha256: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Queue analysis of `pdf_path`; pass its `sha256` when known so it is not hashed again."""
+        job_id = uuid.uuid4().hex
+        db = SessionLocal()
+        try:
+            job = AnalysisJob(
+                id=job_id,
+                status="queued",
+                stage="queued",
+                file_id=file_id,
+                pdf_path=pdf_path,
+                sha256=sha256,
+                owns_file=owns_file,
+                prefer_label_column=prefer_label_column,
+            )
+            db.add(job)
+            db.commit()
+            db.refresh(job)
+            out = _job_to_dict(job, include_result=False)
+        finally:
+            db.close()
+        self._append_event(job_id, {"stage": "queued"})
+        self._queue.put(job_id)
+        return out
+
+    def get(self, job_id: str, include_result: bool = True) -> Optional[Dict[str, Any]]:
+        db = SessionLocal()
+        try:
+            job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+            return _job_to_dict(job, include_result) if job else None
+        finally:
+            db.close()
+
+    def events_since(self, job_id: str, seq: int) -> List[Dict[str, Any]]:
+        """In-memory progress events with seq > `seq` (empty if the job is not tracked)."""
+        with self._lock:
+            events = self._events.get(job_id)
+            return list(events[seq:]) if events else []
+
+    def is_tracked(self, job_id: str) -> bool:
+        with self._lock:
+            return job_id in self._events
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+    def _append_event(self, job_id: str, event: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            events = self._events.setdefault(job_id, [])
+            self._events.move_to_end(job_id)
+            event = {"seq": len(events) + 1, "ts": datetime.utcnow().isoformat(), **event}
+            events.append(event)
+            while len(self._events) > MAX_TRACKED_JOBS:
+                self._events.popitem(last=False)
+        return event
+
+    def _update(self, job_id: str, **fields: Any):
+        db = SessionLocal()
+        try:
+            job = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+            if not job:
+                return
+            for k, v in fields.items():
+                setattr(job, k, v)
+            db.commit()
+        finally:
+            db.close()
+
+    def _emit(self, job_id: str, event: Dict[str, Any], **fields: Any):
+        event = self._append_event(job_id, event)
+        self._update(job_id, stage=event["stage"], progress=json.dumps(event), **fields)
+
+    def _worker_loop(self):
+        while True:
+            job_id = self._queue.get()
+            if job_id is None:
+                return
+            try:
+                self._process(job_id)
+            except Exception:
+                logger.exception(f"Job {job_id} crashed")
+                self._emit(job_id, {"stage": "failed", "error": "job_crashed"}, status="failed", error="job_crashed")
+
+    def _process(self, job_id: str):
+        job = self.get(job_id, include_result=False)
+        if not job or job["status"] in TERMINAL_STATUSES:
+            return
+        db = SessionLocal()
+        try:
+            row = db.query(AnalysisJob).filter(AnalysisJob.id == job_id).first()
+            pdf_path, prefer, owns_file, sha256 = row.pdf_path, row.prefer_label_column, row.owns_file, row.sha256
+        finally:
+            db.close()
+
+        if not os.path.exists(pdf_path):
+            self._emit(job_id, {"stage": "failed", "error": "file_not_found"}, status="failed", error="file_not_found")
+            return
+
+        self._emit(job_id, {"stage": "started"}, status="running")
+        cached, sha256 = lookup_analysis(pdf_path, prefer, sha256)
+        if cached is not None:
+            self._emit(job_id, {"stage": "cache_hit", "sha256": sha256})
+            self._emit(job_id, {"stage": "succeeded"}, status="succeeded", result=json.dumps(cached))
+            if owns_file:
+                self._remove_upload(pdf_path)
+            return
+
+        events = self._mp_manager.Queue()
+        future = executor.get_executor().submit(_run_job, pdf_path, prefer, sha256, events)
+
+        # drain progress events while the worker process runs
+        while True:
+            try:
+                self._emit(job_id, events.get(timeout=EVENT_POLL_SECONDS))
+                continue
+            except queue.Empty:
+                pass
+            if future.done() and events.empty():
+                break
+
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.exception(f"Job {job_id} failed")
+            error = str(e) or e.__class__.__name__
+            self._emit(job_id, {"stage": "failed", "error": error}, status="failed", error=error)
+        else:
+            self._emit(job_id, {"stage": "succeeded"}, status="succeeded", result=json.dumps(result))
+        finally:
+            if owns_file:
+                self._remove_upload(pdf_path)
+
+    @staticmethod
+    def _remove_upload(pdf_path: str):
+        try:
+            os.remove(pdf_path)
+        except OSError:
+            logger.debug(f"Could not remove job upload {pdf_path} (ignored)")
+
+
+job_manager = JobManager()
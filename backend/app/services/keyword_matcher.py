@@ -0,0 +1,335 @@
+"""
+Compiled multi-pattern keyword matcher shared by section, TOC and heading detection.
+
+All keyword lists of the backend are compiled once, at import, into a single
+trie-shaped regex (alternatives share their common prefixes) plus a small set of
+anchors (the distinct first words of the keywords). A scan lowercases the text,
+finds candidate positions with str.find on each anchor and confirms them with
+one anchored regex match, so the text is never walked character by character in
+Python or in the regex engine. Matching is case-insensitive; offsets refer to the
+text that was passed in.
+One pass over a text returns every occurrence of every keyword:
+
+    for hit in KEYWORD_MATCHER.finditer(text):
+        hit.category, hit.keyword, hit.start, hit.end
+
+Hits are reported in start order. Overlapping keywords are all reported, like
+`keyword in text` would find them: at each candidate position the regex takes
+the longest keyword, and every shorter keyword that is a prefix of it
+(precomputed) is reported at the same offset. Restricting `categories` also
+restricts the anchors searched for.
+
+With `whole_words` (KEYWORD_MATCHER), a hit must start at a word start, and a
+one-word keyword must also end at a word end, so "oci" is not found inside
+"associates" or "social". Multi-word keywords may still end inside a word
+("cash flow" in "cash flows"), as before. The compact matchers run on text
+without spaces and match anywhere.
+
+Categories:
+- balance_sheet / pnl / cash_flow: statement section headings (ParserService._guess_section)
+- toc: TOC lines pointing at the summary financial information (OcrService._find_toc)
+- heading: summary financial information headings (OcrService.map_logical_to_physical)
+- mda: MD&A TOC entries (toc_service.detect_mda_page_range)
+
+COMPACT_KEYWORD_MATCHER holds the same keywords with whitespace removed, for raw
+probe text (app.services.text_probe) passed through compact().
+"""
+import re
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+SECTION_CATEGORIES = ("balance_sheet", "pnl", "cash_flow")
+
+KEYWORDS: Dict[str, List[str]] = {
+    "balance_sheet": [
+        "balance sheet",
+        "statement of financial position",
+        "statement of assets and liabilities",
+        "assets and liabilities",
+        "summary of assets and liabilities",
+        "restated consolidated balance sheet",
+        "restated statement of assets",
+        "restated statement of assets and liabilities",
+        "restated consolidated statement of assets and liabilities",
+        "restated consolidated statement of assets & liabilities",
+        "summary restated balance sheet",
+        "summary restated statement of assets",
+        "summary of restated balance sheet",
+        "summary of restated consolidated assets",
+        "summary of restated consolidated balance sheet",
+        "summary of balance sheet",
+        "summary balance sheet",
+        "summary restated consolidated balance sheet",
+        "assets & liabilities",
+        "assets and liability",
+        "restated financial position",
+        "summary of restated assets and liabilities",
+        "summary restated assets and liabilities",
+    ],
+    "pnl": [
+        "profit and loss",
+        "profit & loss",
+        "p&l",
+        "statement of profit",
+        "statement of profit and loss",
+        "consolidated p&l",
+        "summary restated profit",
+        "summary of profit and loss",
+        "summary profit and loss",
+        "restated consolidated profit",
+        "income statement",
+        "statement of income",
+        "total income",
+        "other comprehensive income",
+        "oci",
+        "restated consolidated statement of profit and loss",
+        "summary restated profit and loss",
+        "summary of restated profit and loss",
+        "restated consolidated profit and loss",
+        "statement of profit & loss",
+        "restated statement of profit and loss",
+        "restated consolidated statement of profit & loss",
+        "summary consolidated profit and loss",
+        "profit for the year",
+        "profit for the period",
+    ],
+    "cash_flow": [
+        "cash flow",
+        "cashflow",
+        "cash flows",
+        "cashflows",
+        "statement of cash flows",
+        "summary cash flow",
+        "summary of cash flows",
+        "restated cash flows",
+        "summary cash flows",
+        "restated consolidated cash flow",
+        "summary restated cash flows",
+        "summary restated consolidated cash flows",
+        "cash flow statement",
+        "cash flows statement",
+        "restated consolidated statement of cash flows",
+        "restated consolidated statement of cashflows",
+        "summary of restated cash flows",
+        "restated consolidated cash flows",
+        "summary consolidated cash flows",
+        "net cash",
+    ],
+    "toc": [
+        "summary of financial information",
+        "summary financial information",
+        "summary of restated financial information",
+        "summary restated financial information",
+        "summary of consolidated financial information",
+        "summary consolidated financial information",
+        "restated consolidated financial information",
+        "summary of restated consolidated financial information",
+        "summary restated consolidated financial information",
+    ],
+    "heading": [
+        "summary of financial information",
+        "summary financial information",
+        "summary of restated financial information",
+        "summary restated financial information",
+        "summary of consolidated financial information",
+        "summary consolidated financial information",
+        "summary of restated consolidated financial information",
+        "summary restated consolidated financial information",
+        "summary of assets and liabilities",
+        "summary balance sheet",
+        "summary of profit and loss",
+        "summary of cash flows",
+        "summary restated balance sheet",
+        "summary restated statement of profit and loss",
+        "summary restated statement of cash flows",
+    ],
+    "mda": [
+        "management's discussion and analysis of financial condition and result of operations",
+        "management's discussion and analysis",
+        "management discussion and analysis",
+        "discussion and analysis of financial condition",
+        "analysis of financial condition",
+        "financial condition and result of operations",
+        "management discussion",
+        "md&a",
+        "mda",
+    ],
+}
+
+
+class KeywordHit(NamedTuple):
+    category: str
+    keyword: str
+    start: int
+    end: int
+
+
+def _trie_pattern(words: Sequence[str]) -> str:
+    """Regex alternation of `words` nested by common prefix (longest alternative first)."""
+    trie: Dict[str, dict] = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        terminal = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        # greedy optional suffix: the longest keyword is preferred at each position
+        return f"(?:{body})?" if terminal else body
+
+    return build(trie)
+
+
+def _lower_aligned(text: str) -> str:
+    """text.lower(), keeping characters whose lowercase form is longer (offsets stay aligned)."""
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+def _minimal_anchors(anchors: Iterable[str]) -> Tuple[str, ...]:
+    """Drop anchors that contain a shorter anchor as a prefix (already covered by it)."""
+    out: List[str] = []
+    for a in sorted(set(anchors), key=len):
+        if not any(a.startswith(b) for b in out):
+            out.append(a)
+    return tuple(sorted(out))
+
+
+class KeywordMatcher:
+    def __init__(self, categories: Dict[str, Iterable[str]], whole_words: bool = False):
+        self.whole_words = whole_words
+        # keyword (lowercase) -> categories it belongs to
+        self._categories: Dict[str, Tuple[str, ...]] = {}
+        for category, words in categories.items():
+            for w in words:
+                w = w.lower()
+                if category not in self._categories.get(w, ()):
+                    self._categories[w] = self._categories.get(w, ()) + (category,)
+
+        words = sorted(self._categories)
+        # keyword -> shorter keywords that are its prefixes (also hit at the same offset)
+        self._prefixes: Dict[str, Tuple[str, ...]] = {
+            w: tuple(sorted((p for p in words if p != w and w.startswith(p)), key=len, reverse=True))
+            for w in words
+        }
+        self.pattern = re.compile(_trie_pattern(words))
+
+        # anchor: a keyword's first word. Candidate positions are found with str.find
+        # on anchors (C speed, skips ahead) and confirmed with pattern.match; scanning
+        # with the regex itself costs ~50ns per character in sre.
+        self._anchors: Dict[str, Tuple[str, ...]] = {}
+        for category, _ in categories.items():
+            firsts = {w.split(" ", 1)[0] for w, cats in self._categories.items() if category in cats}
+            self._anchors[category] = _minimal_anchors(firsts)
+        self._anchor_sets: Dict[Optional[Tuple[str, ...]], Tuple[str, ...]] = {}
+
+    def __contains__(self, keyword: str) -> bool:
+        """True when `keyword` is one of the compiled keywords."""
+        return keyword.lower() in self._categories
+
+    def _anchors_for(self, categories: Optional[Sequence[str]]) -> Tuple[str, ...]:
+        key = tuple(categories) if categories is not None else None
+        anchors = self._anchor_sets.get(key)
+        if anchors is None:
+            wanted = self._anchors if categories is None else {c: self._anchors.get(c, ()) for c in categories}
+            anchors = _minimal_anchors({a for group in wanted.values() for a in group})
+            self._anchor_sets[key] = anchors
+        return anchors
+
+    def finditer(self, text: str, categories: Optional[Sequence[str]] = None) -> Iterator[KeywordHit]:
+        """Every keyword occurrence in `text` (optionally only `categories`), in start order."""
+        if not text:
+            return iter(())
+        return self._scan(_lower_aligned(text), categories)
+
+    def _scan(self, lowered: str, categories: Optional[Sequence[str]]) -> Iterator[KeywordHit]:
+        starts = set()
+        find = lowered.find
+        for anchor in self._anchors_for(categories):
+            i = find(anchor)
+            while i != -1:
+                starts.add(i)
+                i = find(anchor, i + 1)
+
+        match = self.pattern.match
+        whole_words = self.whole_words
+        for start in sorted(starts):
+            if whole_words and start and lowered[start - 1].isalnum():
+                continue
+            m = match(lowered, start)
+            if m is None:
+                continue
+            longest = m.group()
+            for word in (longest,) + self._prefixes[longest]:
+                if whole_words and " " not in word and lowered[start + len(word):start + len(word) + 1].isalnum():
+                    continue
+                for category in self._categories[word]:
+                    if categories is None or category in categories:
+                        yield KeywordHit(category, word, start, start + len(word))
+
+    def first_category(self, text: str, categories: Sequence[str]) -> Optional[str]:
+        """First of `categories` (in priority order) with any hit in `text`; stops at the first hit."""
+        if not text:
+            return None
+        lowered = _lower_aligned(text)
+        for category in categories:
+            if next(self._scan(lowered, (category,)), None) is not None:
+                return category
+        return None
+
+    def find_all(self, text: str, categories: Optional[Sequence[str]] = None) -> List[KeywordHit]:
+        return list(self.finditer(text, categories))
+
+    def search(self, text: str, categories: Optional[Sequence[str]] = None) -> Optional[KeywordHit]:
+        """First hit (by offset) in `categories`, or None."""
+        return next(self.finditer(text, categories), None)
+
+    def categories_in(self, text: str, categories: Optional[Sequence[str]] = None) -> set:
+        return {hit.category for hit in self.finditer(text, categories)}
+
+    def hit_lines(
+        self,
+        text: str,
+        categories: Optional[Sequence[str]] = None,
+        sep: Optional[str] = None,
+    ) -> Dict[int, List[KeywordHit]]:
+        """
+        Hits grouped by line index, from a single pass over the whole text.
+        Lines are numbered as in `text.splitlines()` (or `text.split(sep)` when given).
+        """
+        hits = self.find_all(text, categories)
+        if not hits:
+            return {}
+        if sep is None:
+            lengths = [len(line) for line in text.splitlines(keepends=True)]
+        else:
+            lengths = [len(line) + len(sep) for line in text.split(sep)]
+
+        out: Dict[int, List[KeywordHit]] = {}
+        line_no = 0
+        line_end = lengths[0]
+        for hit in hits:
+            while hit.start >= line_end and line_no + 1 < len(lengths):
+                line_no += 1
+                line_end += lengths[line_no]
+            out.setdefault(line_no, []).append(hit)
+        return out
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def compact(text: str) -> str:
+    """Remove all whitespace (for raw probe text, where spaces are often not drawn)."""
+    return _WHITESPACE_RE.sub("", text or "")
+
+
+KEYWORD_MATCHER = KeywordMatcher(KEYWORDS, whole_words=True)
+# same keywords without whitespace; match against compact(text)
+COMPACT_KEYWORD_MATCHER = KeywordMatcher({c: [compact(w) for w in words] for c, words in KEYWORDS.items()})
@@ -1,26 +1,24 @@
 # app/services/mda_extractor.py
 
-import pdfplumber
+from app.services import page_extraction
 
-PAGE_OFFSET = 2   # RHPs usually start page numbering after 2 pages
+# RHPs usually start page numbering after 2 pages; only used when the PDF has
+# neither an outline nor page labels (see document_structure)
+PAGE_OFFSET = 2
 
 # Extract full text between start_page and end_page
-def extract_mda_text(pdf_path: str, start_page: int, end_page: int) -> str:
+# (printed page numbers; pass page_offset=0 for physical page numbers)
+def extract_mda_text(pdf_path: str, start_page: int, end_page: int, page_offset: int = PAGE_OFFSET) -> str:
     extracted = []
 
-    with pdfplumber.open(pdf_path) as pdf:
-        total_pages = len(pdf.pages)
+    # Convert real page numbers → zero-indexed page numbers
+    start_i = max(start_page - 1 + page_offset, 0)
+    end_i = end_page - 1 + page_offset
 
-        # Convert real page numbers → zero-indexed page numbers
-        start_i = max(start_page - 1 + PAGE_OFFSET, 0)
-        end_i = min(end_page - 1 + PAGE_OFFSET, total_pages - 1)
-
-        for i in range(start_i, end_i + 1):
-            try:
-                raw = pdf.pages[i].extract_text() or ""
-                clean = "\n".join(line.strip() for line in raw.split("\n"))
-                extracted.append(clean)
-            except:
-                continue
+    # pages are extracted in parallel and come back in page order;
+    # pages past the end of the document are skipped by the engine
+    for _, raw, _ in page_extraction.extract_pages(pdf_path, range(start_i, end_i + 1), text=True):
+        clean = "\n".join(line.strip() for line in raw.split("\n"))
+        extracted.append(clean)
 
     return "\n\n".join(extracted)
\ No newline at end of file
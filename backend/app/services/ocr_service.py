@@ -121,10 +121,16 @@
 Robust OCR service.
 
 Responsibilities:
-- Load PDF (uses pdfplumber by default)
+- Load PDF (pooled pdfplumber handle, see app.services.pdf_pool)
 - Find TOC-like candidates (first pages)
-- Map logical -> physical pages using heading search
-- Extract page text and structured tables (via pdfplumber.extract_tables)
+- Read the document outline / page labels (document_structure) once per document
+- Map logical -> physical pages using page labels and heading search
+- Extract page text and structured tables (pdfplumber.extract_tables, routed per page
+  between ruled / cropped / borderless strategies by table_strategy)
+- Extract text and tables of a page in one pass over its layout primitives
+  (page_extraction.extract_page: chars parsed and grouped into words once)
+- Cache per-page text / tables / words / layout so each page is laid out at most once
+- Fan larger page ranges out to the page-parallel engine (page_extraction)
 - Emit detailed logs and structured errors
 
 If your project uses a different OCR pipeline (Tesseract boxes, custom detector),
@@ -134,26 +140,104 @@ adapt extract_tables / extract_pages_text to return the same structures:
 
 Requires: pdfplumber
 """
+import gc
 import logging
+import os
 import re
-from typing import List, Dict, Any, Optional
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Callable, Iterable, Iterator, Sequence, Tuple
 import pdfplumber
 
+from app.services import page_extraction
+from app.services.document_structure import DocumentStructure, build_structure
+from app.services.keyword_matcher import COMPACT_KEYWORD_MATCHER, KEYWORD_MATCHER, SECTION_CATEGORIES, compact
+from app.services.page_classifier import (
+    MAX_CONTINUATION,
+    MIN_NUMERIC_DENSITY,
+    classify_pages,
+    is_statement_candidate,
+    numeric_density,
+)
+from app.services.pdf_pool import pdf_pool
+from app.services.text_probe import probe_text
+from app.utils.memory import current_rss_bytes, to_mb
+
 logger = logging.getLogger("app.services.ocr_service")
 
+# Max number of pages whose text/words/layout are kept per document.
+# Evicted pages also drop pdfplumber's own per-page caches.
+PAGE_CACHE_SIZE = int(os.getenv("OCR_PAGE_CACHE_SIZE", "256"))
+
+# Max RSS growth (MiB) allowed while one document is open; 0 disables the check.
+# When crossed, every pdfplumber page cache is flushed; if RSS is still over the
+# ceiling the analysis fails with OcrServiceError("memory_limit_exceeded").
+MAX_DOC_MB = int(os.getenv("OCR_MAX_DOC_MB", "1024"))
+
+# Pages classified per step of scan_statements (large enough for the page-parallel prefetch).
+STATEMENT_SCAN_CHUNK = int(os.getenv("STATEMENT_SCAN_CHUNK", "16"))
+
+# TOC fallback: the heading search and the adaptive extraction window never go past
+# WINDOW_PAGE_BUDGET pages or WINDOW_TIME_BUDGET_SECONDS seconds.
+WINDOW_PAGE_BUDGET = int(os.getenv("WINDOW_PAGE_BUDGET", "60"))
+WINDOW_TIME_BUDGET = float(os.getenv("WINDOW_TIME_BUDGET_SECONDS", "120"))
+
+# Use the layout-free text probe to skip pages in the heading search (HEADING_PROBE=0 disables).
+HEADING_PROBE = os.getenv("HEADING_PROBE", "1") != "0"
+
+# Sampling search for the statements (locate_statement_section): pages probed at the
+# first stride (doubled per refinement level) and the probe budget of the stride phase.
+SAMPLE_SEARCH_PAGES = int(os.getenv("SAMPLE_SEARCH_PAGES", "16"))
+SAMPLE_SEARCH_MAX_PROBES = int(os.getenv("SAMPLE_SEARCH_MAX_PROBES", "64"))
+
+# keyword categories that make a probed page a financial-section candidate
+SAMPLE_CATEGORIES = SECTION_CATEGORIES + ("heading", "toc")
+
+# page number at the end of a TOC line
+TRAILING_PAGE_RE = re.compile(r"(\d{1,4})\s*$")
+# printed page number right after a TOC keyword in compacted probe text
+# ("SUMMARY OF FINANCIAL INFORMATION ....... 399", "... Financial Information on page 399")
+POINTER_PAGE_RE = re.compile(r"(?:[.\u2026]{2,}|(?:on)?page)(\d{1,4})", re.IGNORECASE)
+
 
 class OcrServiceError(Exception):
     pass
 
 
+def _spread(pages: List[int]) -> List[int]:
+    """`pages` in bit-reversed index order: every prefix covers their whole range evenly."""
+    bits = max(1, len(pages) - 1).bit_length()
+    order = (int(format(i, f"0{bits}b")[::-1], 2) for i in range(1 << bits))
+    return [pages[i] for i in order if i < len(pages)]
+
+
 class OcrService:
-    def __init__(self, pdf_path: str):
+    def __init__(
+        self,
+        pdf_path: str,
+        page_cache_size: int = PAGE_CACHE_SIZE,
+        max_doc_mb: int = MAX_DOC_MB,
+        structure: Optional[DocumentStructure] = None,
+    ):
         self.pdf_path = pdf_path
         self._pdf: Optional[pdfplumber.PDF] = None
+        # page index (0-based) -> {"text": str, "tables": list, "words": list, "probe": str, "layout": LTPage}
+        self._page_cache: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._page_cache_size = max(1, int(page_cache_size))
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_evictions = 0
+        self._max_doc_bytes = max(0, int(max_doc_mb)) * 1024 * 1024
+        self.rss_start = 0
+        self.rss_peak = 0
+        self.memory_flushes = 0
+        # outline / page-label map; pass the cached one (document_structure.load_structure)
+        self._structure: Optional[DocumentStructure] = structure
 
     def open(self):
         try:
-            self._pdf = pdfplumber.open(self.pdf_path)
+            self.rss_start = self.rss_peak = current_rss_bytes()
+            self._pdf = pdf_pool.acquire(self.pdf_path)
             logger.info(f"PDF loaded: {len(self._pdf.pages)} pages")
         except Exception as e:
             logger.exception("Failed to open PDF file")
@@ -161,10 +245,489 @@ class OcrService:
 
     def close(self):
         if self._pdf:
+            logger.info(f"Page cache stats: {self.cache_stats()}")
+            logger.info(f"Memory stats: {self.memory_stats()}")
+            self._page_cache.clear()
+            pdf_pool.release(self._pdf)
+            self._pdf = None
+            logger.info(f"PDF pool stats: {pdf_pool.stats()}")
+
+    def structure(self) -> DocumentStructure:
+        """Outline / page-label index of the document (built from the open PDF unless one was passed in)."""
+        if self._pdf is None:
+            raise OcrServiceError("pdf_not_open")
+        if self._structure is None:
+            self._structure = build_structure(self._pdf)
+        return self._structure
+
+    # ------------------------------------------------------------------
+    # Per-page cache
+    # ------------------------------------------------------------------
+    def _cached_page_value(self, page_index: int, key: str, compute: Callable[[Any], Any]) -> Any:
+        """
+        Return cached `key` for page `page_index`, computing it from the pdfplumber page on a miss.
+        Entries are kept in LRU order and bounded by `page_cache_size`.
+        """
+        entry = self._page_cache.get(page_index)
+        if entry is not None and key in entry:
+            self._page_cache.move_to_end(page_index)
+            self.cache_hits += 1
+            return entry[key]
+
+        self.cache_misses += 1
+        value = compute(self._pdf.pages[page_index])
+        self._store_page_value(page_index, key, value)
+        return value
+
+    def _store_page_value(self, page_index: int, key: str, value: Any):
+        entry = self._page_cache.get(page_index)
+        if entry is None:
+            entry = {}
+            self._page_cache[page_index] = entry
+            self._evict_pages()
+        else:
+            self._page_cache.move_to_end(page_index)
+        entry[key] = value
+
+    def _missing(
+        self,
+        page_index: int,
+        text: bool,
+        tables: bool,
+        candidate_tables: bool,
+    ) -> Tuple[bool, bool]:
+        """(text missing, tables missing) for one page; gated tables are not missing when the cached text is no candidate."""
+        entry = self._page_cache.get(page_index, {})
+        want_tables = tables and "tables" not in entry
+        if want_tables and candidate_tables and "text" in entry:
+            want_tables = is_statement_candidate(entry["text"], self._follows_candidate(page_index))
+        return text and "text" not in entry, want_tables
+
+    def _follows_candidate(self, page_index: int) -> bool:
+        """Whether the previous page got its tables (a statement candidate in a gated walk)."""
+        return "tables" in self._page_cache.get(page_index - 1, {})
+
+    def _prefetch(
+        self,
+        page_indexes: List[int],
+        text: bool = False,
+        tables: bool = False,
+        candidate_tables: bool = False,
+    ):
+        """
+        Fill the cache for uncached pages using the page-parallel engine.
+        Small ranges are left to the serial per-page path.
+        """
+        missing = [p for p in page_indexes if any(self._missing(p, text, tables, candidate_tables))]
+        if not page_extraction.should_parallelize(len(missing)):
+            return
+        try:
+            results = page_extraction.extract_pages(
+                self.pdf_path, missing, text=text, tables=tables, candidate_tables=candidate_tables
+            )
+        except Exception:
+            logger.exception("Parallel page extraction failed; continuing serially")
+            return
+        for p, page_text, page_tables in results:
+            self.cache_misses += 1
+            if page_text is not None:
+                self._store_page_value(p, "text", page_text)
+            if page_tables is not None:
+                self._store_page_value(p, "tables", page_tables)
+
+    def _evict_pages(self):
+        while len(self._page_cache) > self._page_cache_size:
+            evicted, _ = self._page_cache.popitem(last=False)
+            self.cache_evictions += 1
             try:
-                self._pdf.close()
+                # drop pdfplumber's own layout/char caches for the evicted page
+                self._pdf.pages[evicted].close()
             except Exception:
-                logger.debug("Error closing PDF, ignoring")
+                logger.debug(f"Failed to flush pdfplumber cache for page {evicted + 1} (ignored)")
+
+    def page_content(
+        self,
+        page_index: int,
+        text: bool = True,
+        tables: bool = False,
+        candidate_tables: bool = False,
+    ) -> Tuple[Optional[str], Optional[List[List]]]:
+        """
+        (text, tables) of page `page_index` (0-based), the uncached ones extracted
+        together in one pass (page_extraction.extract_page). With `candidate_tables`,
+        tables are only extracted on statement candidates (else None).
+        """
+        want_text, want_tables = self._missing(page_index, text, tables, candidate_tables)
+        if want_text or want_tables:
+            self.cache_misses += 1
+            text_cached = "text" in self._page_cache.get(page_index, {})
+            page_text, page_tables = page_extraction.extract_page(
+                self._pdf.pages[page_index],
+                text=want_text,
+                tables=want_tables,
+                # the candidate gate was already applied to cached text (_missing)
+                candidate_tables=False if text_cached else candidate_tables,
+                follows_candidate=self._follows_candidate(page_index),
+            )
+            if page_text is not None:
+                self._store_page_value(page_index, "text", page_text)
+            if page_tables is not None:
+                self._store_page_value(page_index, "tables", page_tables)
+        else:
+            self.cache_hits += 1
+            if page_index in self._page_cache:
+                self._page_cache.move_to_end(page_index)
+        entry = self._page_cache.get(page_index, {})
+        return (entry.get("text") if text else None), (entry.get("tables") if tables else None)
+
+    def page_text(self, page_index: int) -> str:
+        """Layout text of page `page_index` (0-based)."""
+        return self.page_content(page_index, text=True)[0]
+
+    def page_words(self, page_index: int) -> List[Dict[str, Any]]:
+        """Positioned words of page `page_index` (0-based)."""
+        return self._cached_page_value(page_index, "words", lambda page: page.extract_words())
+
+    def page_probe_text(self, page_index: int) -> str:
+        """First characters drawn on page `page_index` (0-based), without layout (text_probe)."""
+        return self._cached_page_value(page_index, "probe", probe_text)
+
+    def page_layout(self, page_index: int):
+        """pdfminer LTPage layout of page `page_index` (0-based)."""
+        return self._cached_page_value(page_index, "layout", lambda page: page.layout)
+
+    def cache_stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "evictions": self.cache_evictions,
+            "cached_pages": len(self._page_cache),
+            "max_pages": self._page_cache_size,
+        }
+
+    # ------------------------------------------------------------------
+    # Memory-bounded page iteration
+    # ------------------------------------------------------------------
+    def iter_pages(
+        self,
+        start: int,
+        end: int,
+        text: bool = True,
+        tables: bool = False,
+        candidate_tables: bool = False,
+    ) -> Iterator[Tuple[int, Optional[str], Optional[List[List]]]]:
+        """
+        Stream pages [start, end] (1-based, inclusive) as (page_number, text, tables).
+        Only the requested values are captured (the other is None), both in one
+        extraction pass per page; with `candidate_tables` only statement candidates
+        get tables (page_content). Each page's
+        pdfplumber chars/layout are released as soon as its values are captured, so
+        RSS stays flat however many pages are walked; the captured text/tables stay
+        in the page cache. The per-document memory ceiling is checked after each page.
+        """
+        if self._pdf is None:
+            raise OcrServiceError("pdf_not_open")
+        s = max(1, start)
+        e = min(len(self._pdf.pages), end)
+        return self.iter_page_numbers(range(s, e + 1), text=text, tables=tables, candidate_tables=candidate_tables)
+
+    def iter_page_numbers(
+        self,
+        page_numbers: Iterable[int],
+        text: bool = True,
+        tables: bool = False,
+        candidate_tables: bool = False,
+    ) -> Iterator[Tuple[int, Optional[str], Optional[List[List]]]]:
+        """iter_pages over an explicit list of 1-based page numbers (out-of-range ones are skipped)."""
+        if self._pdf is None:
+            raise OcrServiceError("pdf_not_open")
+        total = len(self._pdf.pages)
+        indexes = sorted({p - 1 for p in page_numbers if 1 <= p <= total})
+        self._prefetch(indexes, text=text, tables=tables, candidate_tables=candidate_tables)
+        return self._iter_indexes(indexes, text, tables, candidate_tables)
+
+    def _iter_indexes(self, indexes: List[int], text: bool, tables: bool, candidate_tables: bool):
+        for p in indexes:
+            page_text, page_tables = self.page_content(p, text=text, tables=tables, candidate_tables=candidate_tables)
+            self._release_page(p)
+            self._check_memory()
+            yield p + 1, page_text, page_tables
+
+    def _release_page(self, page_index: int):
+        """Drop pdfplumber's chars/layout for one page (captured values stay cached)."""
+        entry = self._page_cache.get(page_index)
+        if entry is not None:
+            entry.pop("layout", None)
+        try:
+            self._pdf.pages[page_index].close()
+        except Exception:
+            logger.debug(f"Failed to flush pdfplumber cache for page {page_index + 1} (ignored)")
+
+    def _check_memory(self):
+        rss = current_rss_bytes()
+        self.rss_peak = max(self.rss_peak, rss)
+        if not self._max_doc_bytes or rss - self.rss_start <= self._max_doc_bytes:
+            return
+
+        logger.warning(
+            f"Document memory ceiling crossed ({to_mb(rss - self.rss_start)} MiB > "
+            f"{to_mb(self._max_doc_bytes)} MiB); flushing page caches"
+        )
+        self.memory_flushes += 1
+        for p in list(self._page_cache):
+            self._release_page(p)
+            self._page_cache[p].pop("words", None)
+        for page in self._pdf.pages:
+            page.close()
+        gc.collect()
+
+        rss = current_rss_bytes()
+        if rss - self.rss_start > self._max_doc_bytes:
+            logger.error(f"Document still over memory ceiling after flush ({to_mb(rss - self.rss_start)} MiB)")
+            raise OcrServiceError("memory_limit_exceeded")
+
+    def memory_stats(self) -> Dict[str, float]:
+        return {
+            "rss_start_mb": to_mb(self.rss_start),
+            "rss_peak_mb": to_mb(self.rss_peak),
+            "peak_growth_mb": to_mb(max(0, self.rss_peak - self.rss_start)),
+            "max_doc_mb": to_mb(self._max_doc_bytes),
+            "flushes": self.memory_flushes,
+        }
+
+    # ------------------------------------------------------------------
+    # Statement search
+    # ------------------------------------------------------------------
+    def scan_statements(
+        self,
+        is_confident: Optional[Callable[[str, Dict[str, Any], List[List]], bool]] = None,
+        early_exit: bool = True,
+        chunk_pages: int = STATEMENT_SCAN_CHUNK,
+        on_page: Optional[Callable[[int, int], None]] = None,
+        first_page: int = 1,
+        last_page: Optional[int] = None,
+        sections: Optional[Sequence[str]] = None,
+        time_budget: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        Walk pages [first_page, last_page] (default: the whole document) in order,
+        classify them chunk by chunk (page_classifier) and extract tables on
+        statement pages only. Tables of statement candidates (dense pages scoring a
+        section, and dense pages right after one) are extracted in the same pass as
+        their text, from the same word map, so no page is parsed twice.
+
+        With `early_exit`, the walk stops once every section of `sections` (default:
+        all statement sections) has a confident page (`is_confident(section, page_info,
+        page_tables)`; default: any table) and the statement run in progress has ended,
+        so a statement continued on the next page is still captured. Pages after that
+        are neither classified nor extracted. The walk also stops at the first chunk
+        that starts after `time_budget` seconds.
+
+        Returns {
+            "statement_pages": [...], "pages": {page: classifier info}, "tables": [...],
+            "pages_text": {page: text}, "found": {section: first confident page},
+            "pages_total", "pages_scanned", "ended_at_page", "pages_skipped",
+            "stopped": "complete" | "time_budget" | "end_of_range"
+        }
+        """
+        if self._pdf is None:
+            raise OcrServiceError("pdf_not_open")
+        is_confident = is_confident or (lambda section, info, page_tables: bool(page_tables))
+        total = len(self._pdf.pages)
+        chunk_pages = max(1, int(chunk_pages))
+        first_page = max(1, int(first_page))
+        last_page = min(total, int(last_page)) if last_page else total
+        sections = list(sections or SECTION_CATEGORIES)
+        deadline = time.monotonic() + time_budget if time_budget is not None else None
+
+        out: Dict[str, Any] = {"statement_pages": [], "pages": {}, "tables": [], "pages_text": {}, "found": {}}
+        carry = None
+        scanned = 0
+        ended_at = None
+        last_statement = None
+        stopped = "end_of_range"
+
+        for chunk_start in range(first_page, last_page + 1, chunk_pages):
+            if deadline is not None and time.monotonic() > deadline:
+                stopped = "time_budget"
+                break
+            chunk_end = min(last_page, chunk_start + chunk_pages - 1)
+            texts: Dict[int, str] = {}
+            classified = classify_pages(
+                (
+                    (page_number, texts.setdefault(page_number, text))
+                    for page_number, text, _ in self.iter_pages(
+                        chunk_start, chunk_end, text=True, tables=True, candidate_tables=True
+                    )
+                ),
+                carry=carry,
+            )
+            carry = classified["carry"]
+
+            for page_number in range(chunk_start, chunk_end + 1):
+                info = classified["pages"].get(page_number)
+                in_run = info is not None and last_statement is not None and page_number == last_statement[0] + 1
+                if early_exit and all(name in out["found"] for name in sections) and not in_run:
+                    ended_at = last_statement[0]
+                    stopped = "complete"
+                    break
+                scanned += 1
+                if info is None:
+                    continue
+
+                page_tables = self.extract_tables_on_pages([page_number], on_page=on_page)
+                out["statement_pages"].append(page_number)
+                out["pages"][page_number] = info
+                out["pages_text"][page_number] = texts.get(page_number, "")
+                out["tables"].extend(page_tables)
+                last_statement = (page_number, info["section"])
+                section = info["section"]
+                if section not in out["found"] and is_confident(section, info, [t["table"] for t in page_tables]):
+                    out["found"][section] = page_number
+                    logger.info(f"Confident {section} statement on page {page_number}")
+            if ended_at is not None:
+                break
+
+        out["pages_total"] = total
+        out["pages_scanned"] = scanned
+        out["ended_at_page"] = ended_at
+        out["pages_skipped"] = total - scanned
+        out["stopped"] = stopped
+        logger.info(
+            f"Statement search: {len(out['statement_pages'])} statement pages, found={out['found']}, "
+            f"scanned {scanned}/{total} pages from page {first_page}"
+            + (f", stopped after page {ended_at} ({out['pages_skipped']} pages skipped)" if ended_at else "")
+            + (" (time budget spent)" if stopped == "time_budget" else "")
+        )
+        return out
+
+    def locate_statement_section(
+        self,
+        sample_pages: int = SAMPLE_SEARCH_PAGES,
+        max_probes: int = SAMPLE_SEARCH_MAX_PROBES,
+    ) -> Dict[str, Any]:
+        """
+        Find where the statements block starts without walking the document page by page.
+
+        Stride phase: `sample_pages` evenly spaced pages are read with the text probe
+        (first characters drawn, i.e. the running header / title zone) and checked for
+        statement or financial-information keywords. A probed hit is confirmed from its
+        full text when it is as dense in figures as a statement page (narrative pages
+        that merely mention "balance sheet" are not). Without a confirmed page the
+        stride is halved and only the new midpoints are probed, until `max_probes`
+        probes were spent. The midpoints of a level are probed spread over the
+        document (bit-reversed order), so a level cut short by the budget still
+        refines the whole document evenly rather than only its first pages.
+        Bisection phase: the financial section is one contiguous block that opens with
+        the statements, so its first page is bisected between the last sample before
+        the confirmed page (the first unconfirmed hit when nothing was confirmed) and
+        that page, probing only.
+        Printed page numbers: a probed page that names the financial section with a
+        page number after it (a TOC line or a cross-reference, "... 399") points at
+        the block. The printed number is turned into a physical page through the
+        page-label map (/PageLabels, or the footer page numbers sampled by
+        document_structure.load_structure), and that page is probed and confirmed
+        before any further stride level.
+
+        Returns {"start": first page of the block or None, "confirmed": bool,
+                 "anchor": confirmed page or None, "probes": int, "full_reads": int, "levels": int,
+                 "pointer": page whose printed page number led to the anchor, or None}
+        """
+        if self._pdf is None:
+            raise OcrServiceError("pdf_not_open")
+        total = len(self._pdf.pages)
+        probed: Dict[int, bool] = {}
+        hits: List[int] = []
+        anchor = None
+        pointer = None
+        full_reads = 0
+        # printed page numbers found after TOC keywords: (probed page, printed number)
+        pointers: List[Tuple[int, int]] = []
+
+        def probe_hit(page_number: int) -> bool:
+            if page_number not in probed:
+                text = compact(self.page_probe_text(page_number - 1))
+                probed[page_number] = COMPACT_KEYWORD_MATCHER.search(text, SAMPLE_CATEGORIES) is not None
+                if probed[page_number]:
+                    for hit in COMPACT_KEYWORD_MATCHER.finditer(text, ("toc",)):
+                        m = POINTER_PAGE_RE.match(text, hit.end)
+                        if m:
+                            pointers.append((page_number, int(m.group(1))))
+            return probed[page_number]
+
+        def is_financial(page_number: int) -> bool:
+            text = self.page_text(page_number - 1)
+            self._release_page(page_number - 1)
+            return numeric_density(text) >= MIN_NUMERIC_DENSITY
+
+        def follow_pointers() -> Optional[int]:
+            nonlocal full_reads, pointer
+            while pointers:
+                source, printed = pointers.pop(0)
+                target = self.structure().physical_page(printed)
+                if target is None or target == source or target in probed or not 1 <= target <= total:
+                    continue
+                if probe_hit(target):
+                    full_reads += 1
+                    if is_financial(target):
+                        pointer = source
+                        return target
+            return None
+
+        n_samples = max(1, int(sample_pages))
+        levels = 0
+        while anchor is None and len(probed) < min(max_probes, total):
+            levels += 1
+            positions = {min(total, 1 + int((j + 0.5) * total / n_samples)) for j in range(n_samples)}
+            for p in _spread(sorted(positions - probed.keys())):
+                if len(probed) >= max_probes:
+                    break
+                if not probe_hit(p):
+                    continue
+                anchor = follow_pointers()
+                if anchor is not None:
+                    break
+                hits.append(p)
+                full_reads += 1
+                if is_financial(p):
+                    anchor = p
+                    break
+                self._check_memory()
+            if n_samples >= total:
+                break
+            n_samples *= 2
+
+        target = anchor or (min(hits) if hits else None)
+        start = None
+        if target is not None:
+            lo = max((p for p in probed if p < target), default=0)
+            start = target
+            while start - lo > 1:
+                mid = (lo + start) // 2
+                if probe_hit(mid):
+                    start = mid
+                else:
+                    lo = mid
+
+        result = {
+            "start": start,
+            "confirmed": anchor is not None,
+            "anchor": anchor,
+            "probes": len(probed),
+            "full_reads": full_reads,
+            "levels": levels,
+            "pointer": pointer,
+        }
+        if start is None:
+            logger.info(f"Sampling search: no financial-section candidates in {len(probed)} probed pages of {total}")
+            return result
+        logger.info(
+            f"Sampling search: financial section from page {start} "
+            f"({'confirmed at page ' + str(anchor) if anchor else 'unconfirmed'}"
+            f"{', printed page number on page ' + str(pointer) if pointer else ''}; "
+            f"{len(probed)} probes, {full_reads} full reads, {levels} levels, {total} pages)"
+        )
+        return result
 
     def _find_toc(self, probe_pages: int = 5) -> List[Dict[str, Any]]:
         """
@@ -172,27 +735,19 @@ class OcrService:
         Example TOC line: 'SUMMARY OF FINANCIAL INFORMATION ...................................... 99'
         Returns list of dicts with 'line', 'page_index', 'captured' (page number if found).
         """
-        TOC_PATTERNS = [
-            r"summary of financial information",
-            r"summary financial information",
-            r"summary of restated financial information",
-            r"summary restated financial information",
-            r"summary of consolidated financial information",
-            r"summary consolidated financial information",
-            r"restated consolidated financial information",
-            r"summary of restated consolidated financial information",
-            r"summary restated consolidated financial information",
-        ]
-
         toc = []
         try:
             for i in range(min(probe_pages, len(self._pdf.pages))):
-                text = (self._pdf.pages[i].extract_text() or "")
-                for line in text.splitlines():
-                    # if re.search(r"summary of financial information", line, re.I):
-                    if any(re.search(p, line, re.I) for p in TOC_PATTERNS):
-                        m = re.search(r"(\d{1,4})\s*$", line)
-                        toc.append({"line": line.strip(), "page_index": i, "captured": m.group(1) if m else None})
+                text = self.page_text(i)
+                self._release_page(i)
+                hit_lines = KEYWORD_MATCHER.hit_lines(text, ("toc",))
+                if not hit_lines:
+                    continue
+                lines = text.splitlines()
+                for line_no in sorted(hit_lines):
+                    line = lines[line_no]
+                    m = TRAILING_PAGE_RE.search(line)
+                    toc.append({"line": line.strip(), "page_index": i, "captured": m.group(1) if m else None})
             logger.debug(f"TOC candidates: {len(toc)}")
         except Exception:
             logger.exception("Error while searching TOC pages")
@@ -274,61 +829,100 @@ class OcrService:
     #     return mapped
 
 
-    def map_logical_to_physical(self, logical_start: int, toc_page_index: Optional[int] = None) -> Dict[str, int]:
-
-        HEADING_KEYWORDS = [
-            "summary of financial information",
-            "summary financial information",
-            "summary of restated financial information",
-            "summary restated financial information",
-            "summary of consolidated financial information",
-            "summary consolidated financial information",
-            "summary of restated consolidated financial information",
-            "summary restated consolidated financial information",
-            "summary of assets and liabilities",
-            "summary balance sheet",
-            "summary of profit and loss",
-            "summary of cash flows",
-            "summary restated balance sheet",
-            "summary restated statement of profit and loss",
-            "summary restated statement of cash flows",
-        ]
-
-        def contains_heading(text: str) -> bool:
-            t = (text or "").lower()
-            return any(k in t for k in HEADING_KEYWORDS)
+    def map_logical_to_physical(
+        self,
+        logical_start: int,
+        toc_page_index: Optional[int] = None,
+        page_budget: int = WINDOW_PAGE_BUDGET,
+        time_budget: float = WINDOW_TIME_BUDGET,
+        probe: bool = HEADING_PROBE,
+    ) -> Dict[str, int]:
+        """
+        Map the TOC's logical page to the physical page carrying the summary heading,
+        searching forward at most `page_budget` pages / `time_budget` seconds.
+        The search starts at the page labelled `logical_start` when the document has
+        page labels (usually the heading page itself), else at page `logical_start`.
+        physical_end is the furthest page an adaptive window from physical_start may
+        grow to (see extract_adaptive_window), not a fixed window end.
+
+        With `probe`, pages whose text is not cached yet are first checked with the
+        cheap text probe (first characters drawn, no layout); full text extraction
+        only runs on a page whose probe matches, to confirm it. If no probe matches,
+        the pages the probe could not read (no text, or it failed) are searched
+        again with full text.
+        """
+
+        def page_has_heading(p: int) -> bool:
+            text = self.page_text(p)
+            self._release_page(p)
+            return KEYWORD_MATCHER.search(text or "", ("heading",)) is not None
+
+        def probe_text_of(p: int) -> str:
+            try:
+                return self.page_probe_text(p)
+            except Exception:
+                logger.debug(f"Text probe failed on page {p+1}; falling back to full text")
+                return ""
 
         if self._pdf is None:
             raise OcrServiceError("pdf_not_open")
 
         total_pages = len(self._pdf.pages)
+        labelled = self.structure().physical_page(logical_start)
+        guess = labelled or max(1, int(logical_start))
 
         mapped = {
             "logical_start": int(logical_start),
             "toc_page": int(toc_page_index) if toc_page_index is not None else 0,
-            "mapped_physical_start": max(1, int(logical_start)),
-            "physical_start": max(1, int(logical_start)),
-            "physical_end": min(total_pages, int(logical_start) + 11),
+            "mapped_physical_start": guess,
+            "physical_start": guess,
+            "physical_end": min(total_pages, guess + page_budget - 1),
+            "from_page_labels": labelled is not None,
         }
 
         # define BEFORE loop (FIX)
         start_idx = max(0, mapped["mapped_physical_start"] - 1)
-        end_idx = min(total_pages, start_idx + 40)
+        end_idx = min(total_pages, start_idx + page_budget)
+        deadline = time.monotonic() + time_budget
 
         found_page = None
+        unprobed: List[int] = []
 
         for p in range(start_idx, end_idx):
+            if time.monotonic() > deadline:
+                logger.warning(f"Heading search stopped at page {p+1}: time budget of {time_budget}s spent")
+                break
+            try:
+                if probe and "text" not in self._page_cache.get(p, {}):
+                    probed = probe_text_of(p)
+                    if not probed.strip():
+                        unprobed.append(p)
+                        continue
+                    if COMPACT_KEYWORD_MATCHER.search(compact(probed), ("heading",)) is None:
+                        continue
+                if page_has_heading(p):
+                    found_page = p + 1
+                    break
+            except Exception:
+                logger.exception(f"Error extracting text from page {p+1}")
+            self._check_memory()
+
+        # pages the probe could not read (no text, or it failed) get the full-text check
+        for p in unprobed if not found_page else ():
+            if time.monotonic() > deadline:
+                logger.warning(f"Heading search stopped at page {p+1}: time budget of {time_budget}s spent")
+                break
             try:
-                text = self._pdf.pages[p].extract_text() or ""
-                if contains_heading(text):
+                if page_has_heading(p):
                     found_page = p + 1
                     break
             except Exception:
                 logger.exception(f"Error extracting text from page {p+1}")
+            self._check_memory()
 
         if found_page:
             mapped["physical_start"] = found_page
-            mapped["physical_end"] = min(total_pages, found_page + 11)
+            mapped["physical_end"] = min(total_pages, found_page + page_budget - 1)
             logger.info(
                 f"Found summary heading at physical page {found_page} "
                 f"(delta={found_page - mapped['mapped_physical_start']})"
@@ -339,48 +933,126 @@ class OcrService:
         return mapped
 
 
+    def extract_adaptive_window(
+        self,
+        start: int,
+        classify: Callable[[str], Dict[str, Any]],
+        is_confident: Callable[[str, Dict[str, Any], List[List]], bool],
+        page_budget: int = WINDOW_PAGE_BUDGET,
+        time_budget: float = WINDOW_TIME_BUDGET,
+        on_page: Optional[Callable[[int, int], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Extract text and tables from `start` onwards, one page at a time, growing the
+        window while a statement section still lacks a confident page
+        (`classify(text)` -> {"section", "confidence"}; `is_confident(section, info, tables)`).
+
+        Once every section is found the window still takes the pages that continue the
+        last statement (same section, or unclassified pages with tables, at most
+        MAX_CONTINUATION of them), then stops. It never grows past `page_budget` pages or
+        `time_budget` seconds.
+
+        Returns {"pages_text", "tables", "found": {section: page}, "start", "end",
+                 "stopped": "complete" | "page_budget" | "time_budget" | "end_of_document"}
+        """
+        if self._pdf is None:
+            raise OcrServiceError("pdf_not_open")
+        total = len(self._pdf.pages)
+        start = max(1, start)
+        last = min(total, start + max(1, page_budget) - 1)
+        deadline = time.monotonic() + time_budget
+
+        out: Dict[str, Any] = {"pages_text": {}, "tables": [], "found": {}, "start": start, "end": None}
+        stopped = "page_budget" if last < total else "end_of_document"
+        run_section = None
+        continuation = 0
+        for page_number in range(start, last + 1):
+            if time.monotonic() > deadline:
+                stopped = "time_budget"
+                break
+            _, text, raw_tables = next(self.iter_page_numbers([page_number], text=True, tables=True))
+            info = classify(text)
+            section = info["section"]
+            complete = len(out["found"]) == len(SECTION_CATEGORIES)
+            if complete:
+                continues = raw_tables and (section == run_section or (section == "unknown" and continuation < MAX_CONTINUATION))
+                if not continues:
+                    stopped = "complete"
+                    break
+                continuation = continuation + 1 if section == "unknown" else 0
+
+            out["pages_text"][page_number] = text
+            out["tables"].extend({"page": page_number, "table": t} for t in raw_tables)
+            out["end"] = page_number
+            if on_page:
+                on_page(page_number, len(raw_tables))
+            if section in SECTION_CATEGORIES:
+                run_section = section
+                if section not in out["found"] and is_confident(section, info, raw_tables):
+                    out["found"][section] = page_number
+
+        out["stopped"] = stopped
+        missing = [s for s in SECTION_CATEGORIES if s not in out["found"]]
+        logger.info(
+            f"Adaptive window {start}-{out['end']} stopped ({stopped}); found={out['found']}"
+            + (f", still missing {missing}" if missing else "")
+        )
+        return out
+
     def extract_pages_text(self, start: int, end: int) -> Dict[int, str]:
         """
         Extract text for pages in [start, end] inclusive.
         Returns dict: page_number -> text
         """
-        if self._pdf is None:
-            raise OcrServiceError("pdf_not_open")
+        return self._collect_text(self.iter_pages(start, end, text=True))
+
+    def extract_text_on_pages(self, page_numbers: Iterable[int]) -> Dict[int, str]:
+        """extract_pages_text for an explicit list of page numbers."""
+        return self._collect_text(self.iter_page_numbers(page_numbers, text=True))
+
+    @staticmethod
+    def _collect_text(pages) -> Dict[int, str]:
         out: Dict[int, str] = {}
-        total = len(self._pdf.pages)
-        s = max(1, start)
-        e = min(total, end)
-        for p in range(s - 1, e):
-            try:
-                text = self._pdf.pages[p].extract_text() or ""
-                out[p + 1] = text
-                logger.debug(f"Positional fallback extracted {len(text.splitlines())} rows on page {p+1}")
-            except Exception:
-                logger.exception(f"Failed to extract text from page {p+1}")
-                out[p + 1] = ""
+        for page_number, text, _ in pages:
+            out[page_number] = text
+            logger.debug(f"Positional fallback extracted {len(text.splitlines())} rows on page {page_number}")
         return out
 
-    def extract_tables(self, start: int, end: int) -> List[Dict[str, Any]]:
+    def extract_tables(
+        self,
+        start: int,
+        end: int,
+        on_page: Optional[Callable[[int, int], None]] = None,
+    ) -> List[Dict[str, Any]]:
         """
         Use pdfplumber's extract_tables to obtain structured tables where available.
         Returns list of dicts: { "page": int, "table": List[List] }
+        `on_page(page_number, n_tables)` is called after each page, for progress reporting.
         """
-        if self._pdf is None:
-            raise OcrServiceError("pdf_not_open")
-        tables: List[Dict[str, Any]] = []
-        total = len(self._pdf.pages)
-        s = max(1, start)
-        e = min(total, end)
-        for p in range(s - 1, e):
-            try:
-                page = self._pdf.pages[p]
-                raw_tables = page.extract_tables() or []
-                if raw_tables:
-                    for t in raw_tables:
-                        tables.append({"page": p + 1, "table": t})
-                else:
-                    logger.debug(f"No structured tables on page {p+1}")
-            except Exception:
-                logger.exception(f"Error extracting tables from page {p+1}")
+        tables = self._collect_tables(self.iter_pages(start, end, text=False, tables=True), on_page)
         logger.info(f"Extraction results: tables={len(tables)}, summary_range={{'physical_start':{start}, 'physical_end':{end}}}")
-        return tables
\ No newline at end of file
+        return tables
+
+    def extract_tables_on_pages(
+        self,
+        page_numbers: Iterable[int],
+        on_page: Optional[Callable[[int, int], None]] = None,
+    ) -> List[Dict[str, Any]]:
+        """extract_tables for an explicit list of page numbers (e.g. classified statement pages)."""
+        page_numbers = sorted(set(page_numbers))
+        tables = self._collect_tables(self.iter_page_numbers(page_numbers, text=False, tables=True), on_page)
+        logger.info(f"Extraction results: tables={len(tables)}, pages={page_numbers}")
+        return tables
+
+    @staticmethod
+    def _collect_tables(pages, on_page: Optional[Callable[[int, int], None]]) -> List[Dict[str, Any]]:
+        tables: List[Dict[str, Any]] = []
+        for page_number, _, raw_tables in pages:
+            if raw_tables:
+                for t in raw_tables:
+                    tables.append({"page": page_number, "table": t})
+            else:
+                logger.debug(f"No structured tables on page {page_number}")
+            if on_page:
+                on_page(page_number, len(raw_tables))
+        return tables
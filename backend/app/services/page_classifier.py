@@ -0,0 +1,178 @@
+"""
+Whole-document page classifier.
+
+Scores every page of a report as balance_sheet, pnl, cash_flow or other in one
+pass over the page texts, so table extraction only runs on statement pages
+instead of a fixed window after the TOC entry.
+
+Features (one row per page, combined with NumPy):
+- keyword score per statement section: every keyword hit (app.services.keyword_matcher)
+  weighs its word count, tripled inside the title zone (first lines of the page)
+- numeric density: share of whitespace-separated tokens that are numbers
+  (amounts, "(1,234.5)", percentages); statements are tables of figures,
+  narrative pages that merely mention "balance sheet" are not
+
+A page is a statement page when its best keyword score and its numeric density
+both clear their thresholds. Dense numeric pages without section keywords that
+directly follow a statement page are treated as its continuation (statements
+spanning two or three pages repeat no heading).
+
+Configuration (environment):
+- CLASSIFIER_MIN_KEYWORD_SCORE: minimum keyword score of a statement page (default: 3)
+- CLASSIFIER_MIN_NUMERIC_DENSITY: minimum share of numeric tokens (default: 0.2)
+- CLASSIFIER_MAX_CONTINUATION: continuation pages attached to a statement (default: 2)
+"""
+import logging
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.keyword_matcher import KEYWORD_MATCHER, SECTION_CATEGORIES
+
+logger = logging.getLogger("app.services.page_classifier")
+
+MIN_KEYWORD_SCORE = float(os.getenv("CLASSIFIER_MIN_KEYWORD_SCORE", "3"))
+MIN_NUMERIC_DENSITY = float(os.getenv("CLASSIFIER_MIN_NUMERIC_DENSITY", "0.2"))
+MAX_CONTINUATION = int(os.getenv("CLASSIFIER_MAX_CONTINUATION", "2"))
+
+OTHER = "other"
+LABELS = SECTION_CATEGORIES + (OTHER,)
+
+# keyword hits in the first TITLE_ZONE_LINES lines weigh TITLE_ZONE_WEIGHT times more
+TITLE_ZONE_LINES = 5
+TITLE_ZONE_WEIGHT = 3
+
+TOKEN_RE = re.compile(r"\S+")
+NUMERIC_TOKEN_RE = re.compile(r"(?<!\S)[(\-]?[₹$]?\d[\d,]*(?:\.\d+)?\)?%?(?!\S)")
+
+
+def _nth_newline(text: str, n: int) -> int:
+    """Offset just past the n-th line of `text` (len(text) if it has fewer lines)."""
+    pos = 0
+    for _ in range(n):
+        pos = text.find("\n", pos)
+        if pos == -1:
+            return len(text)
+        pos += 1
+    return pos
+
+
+def section_scores(page_text: str) -> List[float]:
+    """Keyword score of each SECTION_CATEGORIES entry for one page."""
+    scores = [0.0] * len(SECTION_CATEGORIES)
+    if not page_text:
+        return scores
+    title_end = _nth_newline(page_text, TITLE_ZONE_LINES)
+    for hit in KEYWORD_MATCHER.finditer(page_text, SECTION_CATEGORIES):
+        weight = hit.keyword.count(" ") + 1
+        scores[SECTION_CATEGORIES.index(hit.category)] += weight * TITLE_ZONE_WEIGHT if hit.start < title_end else weight
+    return scores
+
+
+def numeric_counts(page_text: str) -> Tuple[int, int]:
+    """(numeric tokens, all tokens) of one page."""
+    if not page_text:
+        return 0, 0
+    return len(NUMERIC_TOKEN_RE.findall(page_text)), len(TOKEN_RE.findall(page_text))
+
+
+def numeric_density(page_text: str) -> float:
+    """Share of numeric tokens of one page (0.0 for an empty page)."""
+    numeric, tokens = numeric_counts(page_text)
+    return numeric / tokens if tokens else 0.0
+
+
+def is_statement_candidate(
+    page_text: str,
+    follows_candidate: bool = False,
+    min_keyword_score: float = MIN_KEYWORD_SCORE,
+    min_numeric_density: float = MIN_NUMERIC_DENSITY,
+) -> bool:
+    """
+    Whether classify_pages can label this page a statement page on its own text:
+    dense in figures and scoring a section, or (`follows_candidate`: the previous
+    page is a candidate) a dense page without section keywords that continues it.
+    """
+    if numeric_density(page_text) < min_numeric_density:
+        return False
+    best_score = max(section_scores(page_text))
+    return best_score >= min_keyword_score or (follows_candidate and best_score == 0)
+
+
+def confidences(scores: np.ndarray) -> np.ndarray:
+    """Row-normalise keyword scores into per-section shares (all zero when a page has no hits)."""
+    totals = scores.sum(axis=1, keepdims=True)
+    return np.divide(scores, totals, out=np.zeros_like(scores), where=totals > 0)
+
+
+def classify_pages(
+    pages: Iterable[Tuple[int, str]],
+    min_keyword_score: float = MIN_KEYWORD_SCORE,
+    min_numeric_density: float = MIN_NUMERIC_DENSITY,
+    max_continuation: int = MAX_CONTINUATION,
+    carry: Optional[Tuple[int, int]] = None,
+) -> Dict[str, Any]:
+    """
+    Classify (page_number, text) pairs; texts are consumed as they stream in and not kept.
+    A document can be classified in consecutive chunks: pass the previous chunk's
+    "carry" so continuation pages are still attached across chunk boundaries.
+    Returns:
+        {
+          "pages_scanned": int,
+          "statement_pages": [page_number, ...],          # ascending
+          "pages": {page_number: {"section", "confidence", "numeric_density"}},  # statement pages only
+          "carry": (label of the last page, continuation run length)
+        }
+    """
+    numbers: List[int] = []
+    rows: List[List[float]] = []
+    counts: List[Tuple[int, int]] = []
+    for page_number, text in pages:
+        numbers.append(page_number)
+        rows.append(section_scores(text))
+        counts.append(numeric_counts(text))
+
+    other = len(SECTION_CATEGORIES)
+    if not numbers:
+        return {"pages_scanned": 0, "statement_pages": [], "pages": {}, "carry": carry or (other, 0)}
+
+    scores = np.asarray(rows, dtype=float)
+    count_arr = np.asarray(counts, dtype=float)
+    density = count_arr[:, 0] / np.maximum(count_arr[:, 1], 1)
+    conf = confidences(scores)
+
+    best = scores.argmax(axis=1)  # first max wins ties: balance sheet > P&L > cash flow
+    best_score = scores.max(axis=1)
+    dense = density >= min_numeric_density
+    label = np.where((best_score >= min_keyword_score) & dense, best, other)
+
+    # continuation pages: dense, no section keywords, right after a statement page
+    continuation = dense & (best_score == 0)
+    prev, run = carry or (other, 0)
+    for i in range(len(label)):
+        if label[i] != other:
+            run = 0
+        elif continuation[i] and prev != other and run < max_continuation:
+            label[i] = prev
+            run += 1
+        prev = int(label[i])
+
+    statement_idx = np.flatnonzero(label != other)
+    result = {
+        "pages_scanned": len(numbers),
+        "statement_pages": [numbers[i] for i in statement_idx],
+        "pages": {
+            numbers[i]: {
+                "section": LABELS[label[i]],
+                "confidence": {s: round(float(conf[i, j]), 3) for j, s in enumerate(SECTION_CATEGORIES)},
+                "numeric_density": round(float(density[i]), 3),
+            }
+            for i in statement_idx
+        },
+        "carry": (prev, run),
+    }
+    found = ", ".join(f"{p}:{info['section']}" for p, info in result["pages"].items())
+    logger.debug(f"Page classifier: {len(statement_idx)} statement pages of {len(numbers)} ({found})")
+    return result
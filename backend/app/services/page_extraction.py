@@ -0,0 +1,226 @@
+"""
+Page-parallel extraction engine shared by every page loop in the backend.
+
+pdfminer layout analysis is CPU-bound, so a page range is split into contiguous
+chunks and each chunk is extracted in a worker process that borrows a handle from
+its own process-wide pdf_pool (handles are never shared between processes, and a
+worker reuses its handle across chunks of the same document).
+
+Return shapes match the serial code paths:
+- extract_pages_text: Dict[int, str]  (1-based page number -> text)
+- extract_tables: List[Dict[str, Any]] where each dict is { "page": int, "table": List[List] }
+
+Page order is always deterministic (ascending page number), whatever order the
+workers finish in.
+
+Every page goes through extract_page, which derives the text and the tables from
+one set of layout primitives: the page's chars are parsed once and grouped into
+words once (the word map page.extract_text() builds internally); the text is laid
+out from that word map, borderless tables are rebuilt from its words and ruled
+tables are found on the same parsed chars and edges. With `candidate_tables`,
+tables are only extracted on statement candidates (page_classifier.is_statement_candidate),
+in the same pass as their text.
+
+Configuration (environment):
+- PAGE_WORKERS: worker processes (default: number of CPUs; 1 disables the pool)
+- PAGE_MIN_CHUNK: minimum pages handed to one worker (default: 4); ranges smaller
+  than two chunks are extracted in-process because the per-worker open costs more
+  than it saves
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from pdfplumber.utils.text import WordExtractor
+
+from app.services.page_classifier import is_statement_candidate
+from app.services.pdf_pool import pdf_pool
+from app.services.table_strategy import extract_page_tables
+
+logger = logging.getLogger("app.services.page_extraction")
+
+PAGE_WORKERS = int(os.getenv("PAGE_WORKERS", "0")) or (os.cpu_count() or 1)
+PAGE_MIN_CHUNK = max(1, int(os.getenv("PAGE_MIN_CHUNK", "4")))
+
+# (page_index, text or None, tables or None)
+PageResult = Tuple[int, Optional[str], Optional[List[List[Any]]]]
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def configure(workers: int):
+    """
+    Change the worker count used by default. Shuts the current pool down so the
+    next parallel call starts one with the new size.
+    """
+    global PAGE_WORKERS
+    PAGE_WORKERS = max(1, int(workers))
+    shutdown()
+
+
+def shutdown():
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        _executor_workers = 0
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ProcessPoolExecutor(max_workers=workers)
+            _executor_workers = workers
+            logger.info(f"Started page extraction pool with {workers} workers")
+        return _executor
+
+
+def _split(page_indexes: Sequence[int], workers: int) -> List[List[int]]:
+    """Split sorted page indexes into at most `workers` contiguous chunks of >= PAGE_MIN_CHUNK pages."""
+    n = len(page_indexes)
+    n_chunks = max(1, min(workers, n // PAGE_MIN_CHUNK))
+    size = -(-n // n_chunks)  # ceil
+    return [list(page_indexes[i:i + size]) for i in range(0, n, size)]
+
+
+def should_parallelize(n_pages: int, workers: Optional[int] = None) -> bool:
+    workers = PAGE_WORKERS if workers is None else workers
+    return workers > 1 and n_pages >= 2 * PAGE_MIN_CHUNK
+
+
+def extract_page(
+    page,
+    text: bool = True,
+    tables: bool = False,
+    candidate_tables: bool = False,
+    follows_candidate: bool = False,
+) -> Tuple[Optional[str], Optional[List[List[Any]]]]:
+    """
+    (text, tables) of one pdfplumber page in one pass; values not requested are None.
+    With `candidate_tables` (implies text), tables are None unless the page is a
+    statement candidate (`follows_candidate`: the previous page is one). The page is
+    not closed.
+    """
+    words = None
+    page_text = None
+    if text or candidate_tables:
+        try:
+            wordmap = WordExtractor().extract_wordmap(page.chars)
+            words = [word for word, _ in wordmap.tuples]
+            # same layout arguments as page.extract_text()
+            page_text = wordmap.to_textmap(
+                presorted=True,
+                layout_bbox=page.bbox,
+                layout_width=page.width,
+                layout_height=page.height,
+            ).as_string
+        except Exception:
+            logger.exception(f"Failed to extract text from page {page.page_number}")
+            page_text = ""
+        if candidate_tables and not is_statement_candidate(page_text, follows_candidate):
+            tables = False
+
+    page_tables = None
+    if tables:
+        try:
+            page_tables = extract_page_tables(page, words)
+        except Exception:
+            logger.exception(f"Error extracting tables from page {page.page_number}")
+            page_tables = []
+    return page_text, page_tables
+
+
+def _extract_chunk(
+    pdf_path: str,
+    page_indexes: List[int],
+    text: bool,
+    tables: bool,
+    candidate_tables: bool = False,
+) -> List[PageResult]:
+    """
+    Worker entry point: borrow a pooled handle and extract the requested pages.
+    Pages beyond the end of the document are skipped. With `candidate_tables`, the
+    first page of a chunk cannot continue a candidate of the previous chunk; such a
+    page gets its tables later, from the serial path (OcrService.page_content).
+    """
+    out: List[PageResult] = []
+    last_candidate = None
+    with pdf_pool.borrow(pdf_path) as pdf:
+        total = len(pdf.pages)
+        for p in page_indexes:
+            if p < 0 or p >= total:
+                continue
+            page = pdf.pages[p]
+            page_text, page_tables = extract_page(
+                page, text, tables, candidate_tables, follows_candidate=last_candidate == p - 1
+            )
+            if page_tables is not None:
+                last_candidate = p
+            # release layout/chars as soon as the page is captured
+            page.close()
+            out.append((p, page_text, page_tables))
+    return out
+
+
+def extract_pages(
+    pdf_path: str,
+    page_indexes: Sequence[int],
+    text: bool = True,
+    tables: bool = False,
+    workers: Optional[int] = None,
+    candidate_tables: bool = False,
+) -> List[PageResult]:
+    """
+    Extract text and/or tables for 0-based `page_indexes` (see extract_page for
+    `candidate_tables`). Returns a list of (page_index, text, tables) sorted by page index.
+    """
+    indexes = sorted(set(int(p) for p in page_indexes))
+    if not indexes:
+        return []
+    workers = PAGE_WORKERS if workers is None else max(1, int(workers))
+
+    if not should_parallelize(len(indexes), workers):
+        return _extract_chunk(pdf_path, indexes, text, tables, candidate_tables)
+
+    chunks = _split(indexes, workers)
+    try:
+        executor = _get_executor(workers)
+        futures = [executor.submit(_extract_chunk, pdf_path, chunk, text, tables, candidate_tables) for chunk in chunks]
+        results: List[PageResult] = []
+        for f in futures:
+            results.extend(f.result())
+    except BrokenProcessPool:
+        logger.exception("Page extraction pool broke; falling back to serial extraction")
+        shutdown()
+        return _extract_chunk(pdf_path, indexes, text, tables, candidate_tables)
+
+    logger.debug(f"Extracted {len(results)} pages in {len(chunks)} chunks")
+    results.sort(key=lambda r: r[0])
+    return results
+
+
+def extract_pages_text(pdf_path: str, start: int, end: int, workers: Optional[int] = None) -> Dict[int, str]:
+    """
+    Extract text for 1-based pages in [start, end] inclusive.
+    Returns dict: page_number -> text
+    """
+    results = extract_pages(pdf_path, range(max(1, start) - 1, end), text=True, workers=workers)
+    return {p + 1: t for p, t, _ in results}
+
+
+def extract_tables(pdf_path: str, start: int, end: int, workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Extract tables for 1-based pages in [start, end] inclusive.
+    Returns list of dicts: { "page": int, "table": List[List] }
+    """
+    results = extract_pages(pdf_path, range(max(1, start) - 1, end), text=False, tables=True, workers=workers)
+    return [{"page": p + 1, "table": t} for p, _, page_tables in results for t in page_tables]
@@ -167,7 +167,6 @@
 
 # logger = logging.getLogger("app.services.parser_service")
 
-
 # class ParserServiceError(Exception):
 #     pass
 
@@ -953,22 +952,73 @@
 Parser orchestration: converts OCR outputs (pages_text + tables) into final JSON.
 
 Strategy summary:
-- For each table, attempt KPI extraction using table_extractor.extract_kpi_rows(...)
+- Parse the figures of all tables in one batch (table_extractor.parse_numeric_tables)
+  and turn each table into a StatementTable (label column as in extract_kpi_rows)
 - Classify the table into balance_sheet / pnl / cash_flow using page text heuristics (keywords)
-- Append extracted KPI rows to the matching section
+- Append the table's rows to the matching section
 - Provide flags for unclassified or suspicious tables
 
+Sections stay columnar (app.services.statement_table) through KPI and ratio
+computation; the KPI dicts of the JSON output are produced once, in parse().
+
 Usage:
     parser = ParserService(prefer_first_column_labels=True)
     result_dict = parser.parse(tables, pages_text)
+    statements, flags, page_sections = parser.parse_statements(tables, pages_text)
 """
 import logging
-from typing import List, Dict, Any
-from app.services.table_extractor import extract_kpi_rows
+import os
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from app.services.table_extractor import NumericTable, detect_label_column, normalize_table, parse_numeric_tables
+from app.services.statement_table import LabelIndex, StatementTable
 from app.schemas.output_schema import ExtractionOutput
+from app.services.keyword_matcher import SECTION_CATEGORIES, KeywordMatcher
+from app.services.page_classifier import section_scores
 
 logger = logging.getLogger("app.services.parser_service")
 
+# Bump whenever OCR/parser output changes so cached analyses are not reused.
+PARSER_VERSION = "9"
+
+# A statement page ends the search for its section (early exit) when its classifier
+# confidence and the number of labelled numeric rows it yields reach these values.
+STATEMENT_MIN_CONFIDENCE = float(os.getenv("STATEMENT_MIN_CONFIDENCE", "0.5"))
+STATEMENT_MIN_ROWS = int(os.getenv("STATEMENT_MIN_ROWS", "2"))
+
+STATEMENT_SECTIONS = ("balance_sheet", "pnl", "cash_flow")
+
+# Row labels looked up by _compute_important_kpis, normalized like
+# statement_table.normalize_label (lowercase, no spaces, dots or colons). They are
+# compiled once into KPI_LABEL_MATCHER; each section's LabelIndex scans its labels
+# for all of them in one pass per parse.
+KPI_LABELS: Dict[str, List[str]] = {
+    "total_assets": ["totalassets"],
+    "total_assets_exclude": ["liabilitiesandequity", "assetsliabilities"],
+    "total_equity": ["totalequity"],
+    "equity_attributable": ["equityattributable"],
+    "non_controlling_interest": ["noncontrollinginterest"],
+    "total_liabilities": ["totalliabilities"],
+    "total_liabilities_contains": ["totalliabilities", "totalliability", "totalliabilitie"],
+    "total_liabilities_exclude": ["equity", "assets"],
+    "total_current_liabilities": ["totalcurrentliabilities"],
+    "total_non_current_liabilities": ["totalnoncurrentliabilities"],
+    "revenue": ["totalincome", "totalrevenue", "revenue"],
+    "net_profit": ["profitfortheperiod", "profit"],
+    "operating_cash_flow": ["operatingactivities", "netcashfromoperating"],
+    "net_cash_flow": [
+        "net(decrease)/increaseincash",
+        "netcash",
+        "netcashflow",
+        "netincreaseincash",
+        "netdecreaseincash",
+        "netcashfromoperating",
+    ],
+}
+KPI_LABEL_MATCHER = KeywordMatcher(KPI_LABELS)
+
 
 class ParserServiceError(Exception):
     pass
@@ -979,76 +1029,60 @@ class ParserService:
         self.prefer_first_column = bool(prefer_first_column_labels)
     
     def _compute_important_kpis(self, parsed):
-        bs = parsed.get("balance_sheet", []) or []
-        pnl = parsed.get("pnl", []) or []
-        cf = parsed.get("cash_flow", []) or []
-
-        def norm(s):
-            if not s:
-                return ""
-            return (
-                s.lower()
-                .replace(" ", "")
-                .replace("\u00a0", "")
-                .replace("\u2009", "")
-                .replace(".", "")
-                .replace(":", "")
-            )
+        """
+        KPIs and ratios of the statements in `parsed` (section -> StatementTable, as
+        from parse_statements; lists of KPI dicts are converted first).
+        """
+        # a section is (StatementTable, LabelIndex); the index is built once here
+        def section_table(name):
+            rows = parsed.get(name)
+            table = rows if isinstance(rows, StatementTable) else StatementTable.from_rows(rows or [])
+            return table, LabelIndex(table.labels.tolist(), KPI_LABEL_MATCHER)
+
+        bs = section_table("balance_sheet")
+        pnl = section_table("pnl")
+        cf = section_table("cash_flow")
 
         def is_number(x):
             return isinstance(x, (int, float))
 
 
+        # a "row" is (StatementTable, row index); values are read from the value matrix
         def extract_latest_single_value(row):
             """Return value from FIRST numeric column (latest: June 30, 2025)."""
-            vals = row.get("values", {}) or {}
-            for k in sorted(vals.keys()):
-                try:
-                    num = float(str(vals[k]).replace(",", ""))
-                    return num
-                except:
-                    continue
-            return None
+            table, r = row
+            return table.first_value(r)
 
         # -------------------------
         # Extract last-3-values (handles 4-col, 5-col and fallbacks)
         # -------------------------
         def extract_period_values(row):
-            vals = row.get("values", {}) or {}
-
-            # normalize numeric strings -> float
-            clean_vals = {}
-            for k,v in vals.items():
-                try:
-                    clean_vals[k] = float(str(v).replace(",", ""))
-                except:
-                    clean_vals[k] = None
-
-            keys = sorted(clean_vals.keys())
+            table, r = row
+            width = int(table.widths[r])
 
             # 5 column pattern
-            if "col_5" in clean_vals:
+            if width > 5:
                 mapping = {
-                    "2025": clean_vals.get("col_3"),
-                    "2024": clean_vals.get("col_4"),
-                    "2023": clean_vals.get("col_5"),
+                    "2025": table.value(r, 3),
+                    "2024": table.value(r, 4),
+                    "2023": table.value(r, 5),
                 }
             # 4 column pattern
-            elif "col_4" in clean_vals:
+            elif width > 4:
                 mapping = {
-                    "2025": clean_vals.get("col_2"),
-                    "2024": clean_vals.get("col_3"),
-                    "2023": clean_vals.get("col_4"),
+                    "2025": table.value(r, 2),
+                    "2024": table.value(r, 3),
+                    "2023": table.value(r, 4),
                 }
             else:
                 # fallback: last 3 numeric columns
-                numeric = [k for k in keys if clean_vals.get(k) is not None]
+                numeric = table.numeric_columns(r)
                 if len(numeric) >= 3:
                     last3 = numeric[-3:]
                     mapping = {
-                        "2025": clean_vals[last3[-1]],
-                        "2024": clean_vals[last3[-2]],
-                        "2023": clean_vals[last3[-3]],
+                        "2025": table.value(r, last3[-1]),
+                        "2024": table.value(r, last3[-2]),
+                        "2023": table.value(r, last3[-3]),
                     }
                 else:
                     mapping = {}
@@ -1068,21 +1102,16 @@ class ParserService:
         # ---------------------------------------
         # MATCH HELPERS (old logic behavior)
         # ---------------------------------------
-        def match_exact_label(rows, keywords):
-            for row in rows:
-                lbl = norm(row.get("label"))
-                if any(k == lbl for k in keywords):
-                    return row
-            return None
-
-        def match_contains(rows, keywords, exclude=None):
-            for row in rows:
-                lbl = norm(row.get("label"))
-                if exclude and any(e in lbl for e in exclude):
-                    continue
-                if any(k in lbl for k in keywords):
-                    return row
-            return None
+        # first row (in table order) matching, from the section's label index
+        def match_exact_label(section, keywords):
+            table, index = section
+            r = index.exact(keywords)
+            return None if r is None else (table, r)
+
+        def match_contains(section, keywords, exclude=None):
+            table, index = section
+            r = index.containing(keywords, exclude or ())
+            return None if r is None else (table, r)
         # -------------------------
         # Collect KPIs (latest + periods)
         # -------------------------
@@ -1104,21 +1133,21 @@ class ParserService:
         # ---------------------------------------
         assets_row = match_contains(
             bs,
-            ["totalassets"],
-            exclude=["liabilitiesandequity", "assetsliabilities"]
+            KPI_LABELS["total_assets"],
+            exclude=KPI_LABELS["total_assets_exclude"]
         )
         assign_kpi("total_assets", assets_row)
 
         # ---------------------------------------
         # 2️⃣ TOTAL EQUITY
         # ---------------------------------------
-        equity_row = match_exact_label(bs, ["totalequity"])
+        equity_row = match_exact_label(bs, KPI_LABELS["total_equity"])
         assign_kpi("total_equity", equity_row)
 
         # fallback: equity attributable + NCI
         if "total_equity" not in kpi:
-            eq_attr = match_contains(bs, ["equityattributable"])
-            nci = match_contains(bs, ["noncontrollinginterest", "n on-controllinginterest"])
+            eq_attr = match_contains(bs, KPI_LABELS["equity_attributable"])
+            nci = match_contains(bs, KPI_LABELS["non_controlling_interest"])
 
             if eq_attr:
                 eq_latest = extract_latest_single_value(eq_attr)
@@ -1142,12 +1171,12 @@ class ParserService:
         # ---------------------------------------
         # 3️⃣ TOTAL LIABILITIES
         # ---------------------------------------
-        liab_row = match_exact_label(bs, ["totalliabilities", "total liabilities"])
+        liab_row = match_exact_label(bs, KPI_LABELS["total_liabilities"])
         if not liab_row:
             liab_row = match_contains(
                 bs,
-                ["totalliabilities", "totalliability", "totalliabilitie"],
-                exclude=["equity", "assets"]
+                KPI_LABELS["total_liabilities_contains"],
+                exclude=KPI_LABELS["total_liabilities_exclude"]
             )
 
         if liab_row:
@@ -1155,8 +1184,8 @@ class ParserService:
 
         else:
             # fallback to current + non-current
-            tcl = match_contains(bs, ["totalcurrentliabilities", "total current liabilities"])
-            tncl = match_contains(bs, ["totalnoncurrentliabilities", "total non-current liabilities"])
+            tcl = match_contains(bs, KPI_LABELS["total_current_liabilities"])
+            tncl = match_contains(bs, KPI_LABELS["total_non_current_liabilities"])
 
             tcl_latest, tcl_periods = extract_period_values(tcl) if tcl else (None, {})
             tncl_latest, tncl_periods = extract_period_values(tncl) if tncl else (None, {})
@@ -1173,26 +1202,19 @@ class ParserService:
         # ---------------------------------------
         # 4️⃣ PNL KPIs
         # ---------------------------------------
-        rev_row = match_contains(pnl, ["totalincome", "totalrevenue", "revenue"])
+        rev_row = match_contains(pnl, KPI_LABELS["revenue"])
         assign_kpi("revenue", rev_row)
 
-        profit_row = match_contains(pnl, ["profitfortheperiod", "profit"])
+        profit_row = match_contains(pnl, KPI_LABELS["net_profit"])
         assign_kpi("net_profit", profit_row)
 
         # ---------------------------------------
         # 5️⃣ CASH FLOW KPIs
         # ---------------------------------------
-        ocf_row = match_contains(cf, ["operatingactivities", "netcashfromoperating"])
+        ocf_row = match_contains(cf, KPI_LABELS["operating_cash_flow"])
         assign_kpi("operating_cash_flow", ocf_row)
 
-        ncf_row = match_contains(cf, [
-            "net(decrease)/increaseincash",
-            "netcash",
-            "netcashflow",
-            "netincreaseincash",
-            "netdecreaseincash",
-            "netcashfromoperating",
-        ])
+        ncf_row = match_contains(cf, KPI_LABELS["net_cash_flow"])
         assign_kpi("net_cash_flow", ncf_row)
 
         # ---------------------------------------
@@ -1240,12 +1262,44 @@ class ParserService:
         pages_text: Dict[page_number -> text]
         returns: dict conforming to ExtractionOutput
         """
-        out = {
-            "balance_sheet": [],
-            "pnl": [],
-            "cash_flow": [],
-            "flags": [],
-        }
+        statements, flags, page_sections = self.parse_statements(tables, pages_text)
+        important_kpis = self._compute_important_kpis(statements)
+
+        # the API boundary: sections become lists of KPI dicts here
+        out = {section: statements[section].to_rows() for section in STATEMENT_SECTIONS}
+        out["flags"] = flags
+
+        # convert to pydantic model for validation and normalization
+        try:    
+            final = ExtractionOutput(
+                balance_sheet=out["balance_sheet"],
+                pnl=out["pnl"],
+                cash_flow=out["cash_flow"],
+                flags=out["flags"],
+                important_kpis=important_kpis,
+                debug={
+                    "page_sections": {str(p): page_sections[p] for p in sorted(page_sections, key=lambda x: (x is None, x or 0))},
+                    "periods": {
+                        section: {f"col_{c}": header for c, header in sorted(statements[section].periods.items())}
+                        for section in STATEMENT_SECTIONS
+                    },
+                },
+            )
+            return final.dict()
+        except Exception:
+            logger.exception("Failed to validate final output against schema")
+            # return raw out as fallback
+            out["important_kpis"] = important_kpis
+            return out
+
+    def parse_statements(
+        self, tables: List[Dict[str, Any]], pages_text: Dict[int, str]
+    ) -> Tuple[Dict[str, StatementTable], List[Dict[str, Any]], Dict[int, Dict[str, Any]]]:
+        """
+        Columnar form of parse(): ({section: StatementTable}, flags, {page: classification}).
+        """
+        flags: List[Dict[str, Any]] = []
+        pieces: Dict[str, List[StatementTable]] = {section: [] for section in STATEMENT_SECTIONS}
 
         if not tables:
             logger.warning("No tables provided to parser_service.parse")
@@ -1254,189 +1308,117 @@ class ParserService:
                 f"Parsing tables in range: pages {tables[0].get('page')} - {tables[-1].get('page')} , total tables: {len(tables)}"
             )
 
-        for t in tables:
-            page = t.get("page")
-            raw = t.get("table", [])
-            # try:
-            #     kpis = extract_kpi_rows(raw, prefer_first_column_labels=self.prefer_first_column)
-            # except Exception:
-            #     logger.exception(f"Failed to extract KPI rows from table on page {page}")
-            #     out["flags"].append({"page": page, "note": "kpi_extraction_failed"})
-            #     continue
-            page_text = pages_text.get(page, "") or ""
-            section = self._guess_section(page_text)
-            try:
+        # classify every page once; all tables on a page share the result
+        page_sections: Dict[int, Dict[str, Any]] = {}
 
-                # Force the first column to be label for cash flow tables
-                if section == "cash_flow":
-                    kpis = extract_kpi_rows(
-                        raw,
-                        prefer_first_column_labels=True,
-                        force_label_column=True   # NEW FLAG
-                    )
-                else:
-                    kpis = extract_kpi_rows(
-                        raw,
-                        prefer_first_column_labels=self.prefer_first_column
-                    )
+        def page_section(page: int) -> str:
+            if page not in page_sections:
+                page_sections[page] = self._classify_page(pages_text.get(page, "") or "")
+            return page_sections[page]["section"]
+
+        for page in sorted(pages_text):
+            page_section(page)
 
+        # figures of every table parsed in one batch (table_extractor.parse_numeric_tables)
+        norms = [normalize_table(t.get("table", []) or []) for t in tables]
+        numeric = parse_numeric_tables(norms)
+
+        for t, raw, parsed in zip(tables, norms, numeric):
+            page = t.get("page")
+            section = page_section(page)
+            try:
+                table = self._extract_rows(raw, section, parsed)
             except Exception:
                 logger.exception(f"Failed to extract KPI rows from table on page {page}")
-                out["flags"].append({"page": page, "note": "kpi_extraction_failed"})
+                flags.append({"page": page, "note": "kpi_extraction_failed"})
                 continue
-            #till here
-
-            logger.debug(f"Table on page {page} guessed as section {section}; extracted {len(kpis)} rows")
 
+            logger.debug(f"Table on page {page} guessed as section {section}; extracted {len(table)} rows")
 
-            if section == "balance_sheet":
-                out["balance_sheet"].extend(kpis)
-            elif section == "pnl":
-                out["pnl"].extend(kpis)
-            elif section == "cash_flow":
-                out["cash_flow"].extend(kpis)
+            if section in pieces:
+                pieces[section].append(table)
             else:
                 # attempt simple fallback: recognize words inside table labels
-                labelled = any((row.get("label") for row in kpis))
-                if labelled:
+                labels = table.labels.tolist()
+                if any(labels):
                     # try to detect using label keywords inside labels
-                    placed = False
-                    for row in kpis:
-                        lbl = (row.get("label") or "").lower()
+                    placed = {section: [] for section in STATEMENT_SECTIONS}
+                    for r, label in enumerate(labels):
+                        lbl = (label or "").lower()
                         if any(x in lbl for x in ["assets", "liabilities", "equity", "shareholders"]):
-                            out["balance_sheet"].append(row)
-                            placed = True
+                            placed["balance_sheet"].append(r)
                         elif any(x in lbl for x in ["revenue", "profit", "loss", "income", "turnover"]):
-                            out["pnl"].append(row)
-                            placed = True
+                            placed["pnl"].append(r)
                         elif any(x in lbl for x in ["cash", "operating activities", "investing activities", "financing activities"]):
-                            out["cash_flow"].append(row)
-                            placed = True
-                        else:
-                            continue
-                    if not placed:
-                        out["flags"].append({"page": page, "note": "unclassified_but_has_labels"})
+                            placed["cash_flow"].append(r)
+                    # rows keep their table order within each section
+                    for name, rows in placed.items():
+                        if rows:
+                            pieces[name].append(table.take(rows))
+                    if not any(placed.values()):
+                        flags.append({"page": page, "note": "unclassified_but_has_labels"})
                 else:
-                    out["flags"].append({"page": page, "note": "unclassified_table_no_labels"})
-        
-        important_kpis = self._compute_important_kpis(out)
+                    flags.append({"page": page, "note": "unclassified_table_no_labels"})
+
+        statements = {section: StatementTable.concat(pieces[section]) for section in STATEMENT_SECTIONS}
+        return statements, flags, page_sections
+
+    def _extract_rows(self, raw: List[List[str]], section: str, parsed: Optional[NumericTable] = None) -> StatementTable:
+        """StatementTable of one normalized table (label column as in table_extractor.extract_kpi_rows)."""
+        if parsed is None:
+            parsed = parse_numeric_tables([raw])[0]
+        # Force the first column to be label for cash flow tables
+        if section == "cash_flow":
+            labelled = True
+        else:
+            labelled = self.prefer_first_column and detect_label_column(raw, parsed)[0]
+        return StatementTable.from_numeric(raw, parsed, labelled)
 
-        # convert to pydantic model for validation and normalization
-        try:    
-            final = ExtractionOutput(
-                balance_sheet=out["balance_sheet"],
-                pnl=out["pnl"],
-                cash_flow=out["cash_flow"],
-                flags=out["flags"],
-                important_kpis=important_kpis,
-            )
-            return final.dict()
-        except Exception:
-            logger.exception("Failed to validate final output against schema")
-            # return raw out as fallback
-            return out
+    def is_confident_statement(self, section: str, page_info: Dict[str, Any], page_tables: List[List[List]]) -> bool:
+        """
+        Early-exit test for OcrService.scan_statements: the page's classifier confidence for
+        `section` is at least STATEMENT_MIN_CONFIDENCE and its tables yield at least
+        STATEMENT_MIN_ROWS labelled rows with a numeric value.
+        """
+        if page_info.get("confidence", {}).get(section, 0.0) < STATEMENT_MIN_CONFIDENCE:
+            return False
+        norms = [normalize_table(raw) for raw in page_tables]
+        rows = 0
+        for raw, parsed in zip(norms, parse_numeric_tables(norms)):
+            try:
+                table = self._extract_rows(raw, section, parsed)
+            except Exception:
+                logger.debug(f"Could not extract rows while checking {section} confidence (ignored)")
+                continue
+            labelled = np.fromiter(map(bool, table.labels.tolist()), bool, len(table))
+            rows += int((labelled & table.has_values()).sum())
+            if rows >= STATEMENT_MIN_ROWS:
+                return True
+        return False
+
+    @staticmethod
+    def _classify_page(page_text: str) -> Dict[str, Any]:
+        """
+        Score every statement section on a page from all of its keyword hits
+        (page_classifier.section_scores: specific headings outweigh generic words such
+        as "oci" or "net cash", and hits in the page title count triple).
+        Returns {"section": best section or "unknown", "confidence": {section: share of score}}.
+        Ties keep the balance sheet > P&L > cash flow priority.
+        """
+        scores = section_scores(page_text)
+        total = sum(scores)
+        if not total:
+            return {"section": "unknown", "confidence": {section: 0.0 for section in SECTION_CATEGORIES}}
+        best = max(range(len(scores)), key=scores.__getitem__)  # first max wins ties
+        return {
+            "section": SECTION_CATEGORIES[best],
+            "confidence": {section: round(scores[i] / total, 3) for i, section in enumerate(SECTION_CATEGORIES)},
+        }
 
     @staticmethod
     def _guess_section(page_text: str) -> str:
         """
-        Detect section type using ALL common variants seen in DRHP/RHP/AR.
+        Detect section type using ALL common variants seen in DRHP/RHP/AR
+        (keyword lists live in app.services.keyword_matcher); see _classify_page.
         """
-        if not page_text:
-            return "unknown"
-
-        t = page_text.lower()
-
-        # BALANCE SHEET keywords
-        bs_keywords = [
-            "balance sheet",
-            "statement of financial position",
-            "statement of assets and liabilities",
-            "assets and liabilities",
-            "summary of assets and liabilities",
-            "restated consolidated balance sheet",
-            "restated statement of assets",
-            "restated statement of assets and liabilities",
-            "restated consolidated statement of assets and liabilities",
-            "restated consolidated statement of assets & liabilities",
-            "summary restated balance sheet",
-            "summary restated statement of assets",
-            "summary of restated balance sheet",
-            "summary of restated consolidated assets",
-            "summary of restated consolidated balance sheet",
-            "summary of balance sheet",
-            "summary balance sheet",
-            "summary restated consolidated balance sheet",
-            "assets & liabilities",
-            "assets and liability",
-            "restated financial position",
-            "restated consolidated statement of assets and liabilities",
-            "summary of restated assets and liabilities",
-            "summary restated assets and liabilities",
-        ]
-
-        # PROFIT & LOSS keywords
-        pnl_keywords = [
-            "profit and loss",
-            "profit & loss",
-            "p&l",
-            "statement of profit",
-            "statement of profit and loss",
-            "consolidated p&l",
-            "summary restated profit",
-            "summary of profit and loss",
-            "summary profit and loss",
-            "restated consolidated profit",
-            "income statement",
-            "statement of income",
-            "total income",
-            "other comprehensive income",
-            "oci",
-            "restated consolidated statement of profit and loss",
-            "summary restated profit and loss",
-            "summary of restated profit and loss",
-            "restated consolidated profit and loss",
-            "statement of profit & loss",
-            "restated statement of profit and loss",
-            "restated consolidated statement of profit and loss",
-            "restated consolidated statement of profit & loss",
-            "summary consolidated profit and loss",
-            "profit for the year",
-            "profit for the period",
-            "income statement",
-        ]
-
-        # CASH FLOW keywords
-        cf_keywords = [
-            "cash flow",
-            "cashflow",
-            "cash flows",
-            "cashflows",
-            "statement of cash flows",
-            "summary cash flow",
-            "summary of cash flows",
-            "restated cash flows",
-            "summary cash flows",
-            "restated consolidated cash flow",
-            "summary restated cash flows",
-            "summary restated consolidated cash flows",
-            "cash flow statement",
-            "cash flows statement",
-            "restated consolidated statement of cash flows",
-            "restated consolidated statement of cashflows",
-            "summary restated cash flows",
-            "summary of restated cash flows",
-            "restated consolidated cash flows",
-            "summary consolidated cash flows",
-            "net cash",
-        ]
-
-        if any(k in t for k in bs_keywords):
-            return "balance_sheet"
-
-        if any(k in t for k in pnl_keywords):
-            return "pnl"
-
-        if any(k in t for k in cf_keywords):
-            return "cash_flow"
-
-        return "unknown"
\ No newline at end of file
+        return ParserService._classify_page(page_text)["section"]
@@ -0,0 +1,198 @@
+"""
+Process-wide pool of open pdfplumber documents.
+
+pdfplumber.open() re-parses the xref table and page tree every time, and one
+request used to open the same report up to three times (TOC text, MD&A text,
+analysis). Callers now borrow handles from this pool instead:
+
+    with pdf_pool.borrow(path) as pdf:
+        text = pdf.pages[0].extract_text()
+
+or, for handles held across method calls (OcrService):
+
+    pdf = pdf_pool.acquire(path)
+    ...
+    pdf_pool.release(pdf)
+
+Checkout semantics:
+- a handle is leased to exactly one caller at a time; concurrent borrowers of the
+  same document get separate handles, so pdfplumber objects are never shared
+- handles are keyed by (path, mtime), so a replaced file never serves stale pages
+- on release, per-page layout caches are flushed (the parsed page tree is kept)
+  and the handle goes back to an LRU of idle handles
+- the idle LRU is bounded by handle count and by an estimated memory budget
+  (file size is used as the size estimate); least recently used handles are closed
+- a forked child (page_extraction workers) starts with an empty pool instead of
+  inheriting the parent's handles, whose file offsets would be shared
+
+Configuration (environment):
+- PDF_POOL_MAX_HANDLES: idle handles kept open (default: 8)
+- PDF_POOL_MAX_MB: estimated memory budget for idle handles in MiB (default: 512)
+"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+import pdfplumber
+
+logger = logging.getLogger("app.services.pdf_pool")
+
+PDF_POOL_MAX_HANDLES = int(os.getenv("PDF_POOL_MAX_HANDLES", "8"))
+PDF_POOL_MAX_MB = int(os.getenv("PDF_POOL_MAX_MB", "512"))
+
+HandleKey = Tuple[str, int]  # (absolute path, mtime_ns)
+
+
+class PdfHandlePool:
+    def __init__(self, max_handles: int = PDF_POOL_MAX_HANDLES, max_bytes: int = PDF_POOL_MAX_MB * 1024 * 1024):
+        self.max_handles = max(0, int(max_handles))
+        self.max_bytes = max(0, int(max_bytes))
+        self._reset()
+
+    def _reset(self):
+        # idle (handle, estimated size) pairs in LRU order; one key may have several
+        self._idle: "OrderedDict[HandleKey, List[Tuple[pdfplumber.PDF, int]]]" = OrderedDict()
+        self._idle_count = 0
+        self._idle_bytes = 0
+        # id(pdf) -> (key, estimated size) for handles currently leased out
+        self._leased: Dict[int, Tuple[HandleKey, int]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(path: str) -> Tuple[HandleKey, int]:
+        abspath = os.path.abspath(path)
+        st = os.stat(abspath)
+        return (abspath, st.st_mtime_ns), st.st_size
+
+    def acquire(self, path: str) -> pdfplumber.PDF:
+        """Lease a handle for `path`; the caller must release() it."""
+        key, size = self._key(path)
+        with self._lock:
+            to_close = self._pop_stale(key)
+            handles = self._idle.get(key)
+            pdf = None
+            if handles:
+                pdf, _ = handles.pop()
+                if not handles:
+                    del self._idle[key]
+                self._idle_count -= 1
+                self._idle_bytes -= size
+                self._leased[id(pdf)] = (key, size)
+                self.hits += 1
+            else:
+                self.misses += 1
+        for handle in to_close:
+            self._close(handle)
+        if pdf is not None:
+            return pdf
+
+        # open outside the lock: parsing the xref can take a while
+        pdf = pdfplumber.open(key[0])
+        with self._lock:
+            self._leased[id(pdf)] = (key, size)
+        return pdf
+
+    def release(self, pdf: pdfplumber.PDF):
+        """Return a leased handle to the pool (or close it if it cannot be kept)."""
+        with self._lock:
+            leased = self._leased.pop(id(pdf), None)
+        if leased is None:
+            logger.warning("Releasing a PDF handle that was not leased from the pool; closing it")
+            self._close(pdf)
+            return
+
+        key, size = leased
+        self._flush_page_caches(pdf)
+        with self._lock:
+            if self.max_handles == 0 or size > self.max_bytes:
+                to_close = [pdf]
+            else:
+                self._idle.setdefault(key, []).append((pdf, size))
+                self._idle.move_to_end(key)
+                self._idle_count += 1
+                self._idle_bytes += size
+                to_close = self._pop_over_budget()
+        for handle in to_close:
+            self._close(handle)
+
+    @contextmanager
+    def borrow(self, path: str) -> Iterator[pdfplumber.PDF]:
+        pdf = self.acquire(path)
+        try:
+            yield pdf
+        finally:
+            self.release(pdf)
+
+    def clear(self):
+        """Close every idle handle (leased handles are closed when released)."""
+        with self._lock:
+            handles = [pdf for entries in self._idle.values() for pdf, _ in entries]
+            self._idle.clear()
+            self._idle_count = 0
+            self._idle_bytes = 0
+        for pdf in handles:
+            self._close(pdf)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "idle": self._idle_count,
+                "idle_bytes": self._idle_bytes,
+                "leased": len(self._leased),
+            }
+
+    # ------------------------------------------------------------------
+    # Internals: called with the lock held; return handles to close outside it
+    # ------------------------------------------------------------------
+    def _pop_stale(self, key: HandleKey) -> List[pdfplumber.PDF]:
+        """Idle handles for the same path with a different mtime (file was replaced)."""
+        stale: List[pdfplumber.PDF] = []
+        for k in [k for k in self._idle if k[0] == key[0] and k != key]:
+            for pdf, size in self._idle.pop(k):
+                self._idle_count -= 1
+                self._idle_bytes -= size
+                stale.append(pdf)
+        return stale
+
+    def _pop_over_budget(self) -> List[pdfplumber.PDF]:
+        evicted: List[pdfplumber.PDF] = []
+        while self._idle and (self._idle_count > self.max_handles or self._idle_bytes > self.max_bytes):
+            key, entries = next(iter(self._idle.items()))
+            pdf, size = entries.pop(0)
+            if not entries:
+                del self._idle[key]
+            self._idle_count -= 1
+            self._idle_bytes -= size
+            evicted.append(pdf)
+        return evicted
+
+    @staticmethod
+    def _flush_page_caches(pdf: pdfplumber.PDF):
+        """Drop per-page chars/layout caches but keep the parsed page tree."""
+        for page in getattr(pdf, "_pages", None) or []:
+            try:
+                page.close()
+            except Exception:
+                logger.debug("Failed to flush page cache (ignored)")
+        pdf.flush_cache([p for p in pdf.cached_properties if p != "_pages"])
+
+    @staticmethod
+    def _close(pdf: pdfplumber.PDF):
+        try:
+            pdf.close()
+        except Exception:
+            logger.debug("Error closing pooled PDF, ignoring")
+
+
+pdf_pool = PdfHandlePool()
+
+if hasattr(os, "register_at_fork"):
+    # drop (without closing) handles inherited from the parent process
+    os.register_at_fork(after_in_child=pdf_pool._reset)
@@ -0,0 +1,296 @@
+"""
+Columnar representation of the rows of one parsed statement section.
+
+ParserService used to keep every section as a list of KPI dicts
+({"label": str, "values": {"col_1": ..., ...}}), one dict per row plus one per row's
+values. A StatementTable keeps the same rows in a few arrays instead:
+
+- labels:   object array of the row labels (interned str; None for rows of tables
+            without a label column, whose values then start at col_0)
+- values:   float64 matrix (rows x columns); column i is "col_i" of the row dicts
+- mask:     bool matrix, True where values is NaN (blank, text, label or no cell)
+- integral: bool matrix, numbers written without a decimal point (int in the dicts)
+- widths:   cells in each source row; a row's dict keys run up to col_{width - 1}
+- text:     {(row, column): text} for the few cells that hold text, not a number
+- periods:  {column: header} from header cells naming a year ("March 31, 2025")
+
+Tables are built straight from the batch parse of table_extractor (from_numeric)
+and combined per section with concat / take, so no per-row dicts are allocated
+while parsing and computing KPIs. to_rows() produces the KPI dicts of the API
+response, exactly as extract_kpi_rows returns them; from_rows() converts them back.
+
+LabelIndex answers row lookups by normalized label (lowercase, without spaces,
+dots and colons): exact matches from a dict, substring and prefix matches from
+one KeywordMatcher pass over all labels when the index is built, so a lookup
+costs the rows it returns, not a scan of the table.
+"""
+import re
+import sys
+from bisect import bisect_right
+from itertools import accumulate
+from operator import add
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.table_extractor import CELL_SEP, NumericTable
+
+# header cells naming a period contain a year
+PERIOD_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+# rows at the top of a table searched for period headers
+PERIOD_HEADER_ROWS = 3
+# removed from labels by normalize_label (after lowercasing)
+LABEL_STRIP = (" ", "\u00a0", "\u2009", ".", ":")
+
+
+def _intern(label: Any) -> Optional[str]:
+    return sys.intern(label) if isinstance(label, str) else label
+
+
+def normalize_label(label: Optional[str]) -> str:
+    """Lowercase `label` and drop spaces, dots and colons ("Total Assets:" -> "totalassets")."""
+    if not label:
+        return ""
+    label = label.lower()
+    for ch in LABEL_STRIP:
+        label = label.replace(ch, "")
+    return label
+
+
+class StatementTable:
+    def __init__(
+        self,
+        labels: np.ndarray,
+        values: np.ndarray,
+        mask: np.ndarray,
+        integral: np.ndarray,
+        widths: np.ndarray,
+        text: Optional[Dict[Tuple[int, int], str]] = None,
+        periods: Optional[Dict[int, str]] = None,
+    ):
+        self.labels = labels
+        self.values = values
+        self.mask = mask
+        self.integral = integral
+        self.widths = widths
+        self.text = text or {}
+        self.periods = periods or {}
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    @property
+    def width(self) -> int:
+        return self.values.shape[1]
+
+    @classmethod
+    def empty(cls) -> "StatementTable":
+        return cls(
+            np.empty(0, dtype=object),
+            np.empty((0, 0)),
+            np.empty((0, 0), bool),
+            np.empty((0, 0), bool),
+            np.empty(0, dtype=np.int64),
+        )
+
+    @classmethod
+    def from_numeric(cls, norm: List[List[str]], parsed: NumericTable, labelled: bool) -> "StatementTable":
+        """
+        Rows of one normalized table and its parse_numeric_tables entry; with
+        `labelled`, column 0 holds the row labels (as in extract_kpi_rows).
+        """
+        widths = np.fromiter(map(len, norm), np.int64, len(norm))
+        values = parsed.values.copy()
+        mask = ~parsed.valid
+        integral = parsed.integral.copy()
+        width = values.shape[1]
+        start = 1 if labelled and width else 0
+        if start:
+            labels = np.array([_intern(row[0]) if row else "" for row in norm], dtype=object)
+            values[:, 0] = np.nan
+            mask[:, 0] = True
+            integral[:, 0] = False
+        else:
+            labels = np.full(len(norm), "" if labelled else None, dtype=object)
+
+        # non-numeric cells that are not blank keep their text
+        texts = mask & ~parsed.blank
+        texts[:, :start] = False
+        text = {(int(r), int(c)): parsed.cells[r, c] for r, c in zip(*np.nonzero(texts))}
+
+        periods: Dict[int, str] = {}
+        for row in norm[:PERIOD_HEADER_ROWS]:
+            for c in range(start, len(row)):
+                if c not in periods and PERIOD_RE.search(row[c]):
+                    periods[c] = row[c]
+        return cls(labels, values, mask, integral, widths, text, periods)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[Dict[str, Any]]) -> "StatementTable":
+        """StatementTable of KPI dicts (the inverse of to_rows)."""
+        if not rows:
+            return cls.empty()
+        width = 0
+        for row in rows:
+            for key in row.get("values") or {}:
+                width = max(width, int(key[4:]) + 1)
+        values = np.full((len(rows), width), np.nan)
+        integral = np.zeros((len(rows), width), bool)
+        widths = np.zeros(len(rows), np.int64)
+        text: Dict[Tuple[int, int], str] = {}
+        for r, row in enumerate(rows):
+            for key, v in (row.get("values") or {}).items():
+                c = int(key[4:])
+                widths[r] = max(widths[r], c + 1)
+                if isinstance(v, (int, float)) and not isinstance(v, bool):
+                    values[r, c] = v
+                    integral[r, c] = isinstance(v, int)
+                elif v is not None:
+                    text[(r, c)] = v
+        labels = np.array([_intern(row.get("label")) for row in rows], dtype=object)
+        return cls(labels, values, np.isnan(values), integral, widths, text)
+
+    @classmethod
+    def concat(cls, tables: Sequence["StatementTable"]) -> "StatementTable":
+        """Rows of `tables` one after the other (columns padded to the widest table)."""
+        tables = [t for t in tables if len(t)]
+        if not tables:
+            return cls.empty()
+        if len(tables) == 1:
+            return tables[0]
+        width = max(t.width for t in tables)
+        rows = sum(len(t) for t in tables)
+        values = np.full((rows, width), np.nan)
+        mask = np.ones((rows, width), bool)
+        integral = np.zeros((rows, width), bool)
+        text: Dict[Tuple[int, int], str] = {}
+        periods: Dict[int, str] = {}
+        offset = 0
+        for t in tables:
+            block = slice(offset, offset + len(t))
+            values[block, :t.width] = t.values
+            mask[block, :t.width] = t.mask
+            integral[block, :t.width] = t.integral
+            text.update({(r + offset, c): v for (r, c), v in t.text.items()})
+            for c, header in t.periods.items():
+                periods.setdefault(c, header)
+            offset += len(t)
+        return cls(
+            np.concatenate([t.labels for t in tables]),
+            values,
+            mask,
+            integral,
+            np.concatenate([t.widths for t in tables]),
+            text,
+            periods,
+        )
+
+    def take(self, rows: Sequence[int]) -> "StatementTable":
+        """The table restricted to `rows` (in that order)."""
+        rows = list(rows)
+        new_index = {r: i for i, r in enumerate(rows)}
+        text = {(new_index[r], c): v for (r, c), v in self.text.items() if r in new_index}
+        return StatementTable(
+            self.labels[rows],
+            self.values[rows],
+            self.mask[rows],
+            self.integral[rows],
+            self.widths[rows],
+            text,
+            self.periods,
+        )
+
+    def value(self, row: int, column: int) -> Optional[float]:
+        """Number in `column` of `row` (None when the cell is blank, text, the label or missing)."""
+        if column >= self.width or self.mask[row, column]:
+            return None
+        return float(self.values[row, column])
+
+    def numeric_columns(self, row: int) -> List[int]:
+        """Columns of `row` holding a number, left to right."""
+        return np.flatnonzero(~self.mask[row]).tolist()
+
+    def first_value(self, row: int) -> Optional[float]:
+        """Number in the first numeric column of `row`, or None."""
+        columns = self.numeric_columns(row)
+        return float(self.values[row, columns[0]]) if columns else None
+
+    def has_values(self) -> np.ndarray:
+        """Per row: at least one cell holds a number."""
+        return (~self.mask).any(axis=1) if self.width else np.zeros(len(self), bool)
+
+    def to_rows(self) -> List[Dict[str, Any]]:
+        """The rows as KPI dicts ({"label": ..., "values": {"col_i": ...}}), for the API response."""
+        values = self.values.tolist()
+        mask = self.mask.tolist()
+        integral = self.integral.tolist()
+        text = self.text
+        keys = [f"col_{c}" for c in range(self.width)]
+        rows = []
+        for r, (label, width) in enumerate(zip(self.labels.tolist(), self.widths.tolist())):
+            row_values = {}
+            row_mask, row_integral, row_numbers = mask[r], integral[r], values[r]
+            for c in range(0 if label is None else 1, width):
+                if row_mask[c]:
+                    row_values[keys[c]] = text.get((r, c))
+                else:
+                    row_values[keys[c]] = int(row_numbers[c]) if row_integral[c] else row_numbers[c]
+            rows.append({"label": label, "values": row_values})
+        return rows
+
+
+class LabelIndex:
+    """
+    Row lookups by normalized label over one statement table, for the keywords
+    compiled into `matcher` (other keywords fall back to one scan each, cached).
+    Rows are reported in table order.
+    """
+
+    def __init__(self, labels: Sequence[Optional[str]], matcher: KeywordMatcher):
+        self.matcher = matcher
+        if None in labels:
+            labels = [label or "" for label in labels]
+        # all labels normalized at once, on one joined string
+        joined = normalize_label(CELL_SEP.join(labels))
+        self.keys = joined.split(CELL_SEP) if labels else []
+        # label -> first row: built in reverse so the first row's entry is written last
+        rows = range(len(self.keys) - 1, -1, -1)
+        self._exact: Dict[str, int] = dict(zip(reversed(self.keys), rows))
+
+        # keyword -> rows whose label contains it / starts with it
+        self._contains: Dict[str, List[int]] = {}
+        self._prefix: Dict[str, List[int]] = {}
+        # offset of each label in `joined` (labels are one CELL_SEP apart)
+        starts = list(map(add, accumulate(map(len, self.keys), initial=0), range(len(self.keys) + 1)))
+        for hit in matcher.finditer(joined):
+            r = bisect_right(starts, hit.start) - 1
+            rows = self._contains.setdefault(hit.keyword, [])
+            if not rows or rows[-1] != r:
+                rows.append(r)
+            if hit.start == starts[r]:
+                self._prefix.setdefault(hit.keyword, []).append(r)
+
+    def _rows(self, keyword: str, found: Dict[str, List[int]], prefix: bool) -> List[int]:
+        if keyword not in self.matcher and keyword not in found:
+            found[keyword] = [
+                r for r, key in enumerate(self.keys) if (key.startswith(keyword) if prefix else keyword in key)
+            ]
+        return found.get(keyword, [])
+
+    def exact(self, keywords: Iterable[str]) -> Optional[int]:
+        """First row whose label is one of `keywords`."""
+        rows = [self._exact[k] for k in keywords if k in self._exact]
+        return min(rows) if rows else None
+
+    def containing(self, keywords: Iterable[str], exclude: Iterable[str] = ()) -> Optional[int]:
+        """First row whose label contains one of `keywords` and none of `exclude`."""
+        excluded = {r for e in exclude for r in self._rows(e, self._contains, False)}
+        firsts = (next((r for r in self._rows(k, self._contains, False) if r not in excluded), None) for k in keywords)
+        rows = [r for r in firsts if r is not None]
+        return min(rows) if rows else None
+
+    def starting_with(self, keywords: Iterable[str]) -> Optional[int]:
+        """First row whose label starts with one of `keywords`."""
+        rows = [r for k in keywords for r in self._rows(k, self._prefix, True)[:1]]
+        return min(rows) if rows else None
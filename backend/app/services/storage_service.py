@@ -0,0 +1,234 @@
+"""
+Content-addressed upload storage.
+
+Upload bytes are stored once per SHA-256 under uploads/blobs/ and shared by every
+FileMetadata row (file_id) that uploaded the same content:
+
+- store_upload(): move a freshly streamed upload into the blob store, or drop it
+  when an identical blob already exists (deduplicated upload)
+- register_file(): create the FileMetadata row for a new file_id -> blob reference
+- resolve_path() / resolve_file(): file_id -> path on disk (and the content hash,
+  so callers never hash stored bytes again), served from the indexed
+  file_metadata / stored_blobs tables (no directory scans)
+- iter_stored_files(): lazy os.scandir walk of the upload tree for paginated listings
+- release_file(): drop one reference; the blob (and its cached analysis) is removed
+  only when the last reference goes
+
+Blobs are sharded two levels deep by hash prefix (blobs/ab/cd/<sha256><ext>) so no
+directory grows past a few hundred entries at any corpus size.
+
+Because analysis results are cached by the same SHA-256, a deduplicated upload
+reuses any existing analysis without re-running the pipeline.
+Files uploaded before content addressing (uploads/<file_id>, no sha256) are still
+resolved and deleted by file_id.
+"""
+import logging
+import os
+import uuid
+from datetime import datetime
+from typing import Iterator, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.database import FileMetadata, StoredBlob
+from app.services.analysis_cache import analysis_cache, file_sha256
+
+logger = logging.getLogger("app.services.storage_service")
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UPLOAD_DIR = os.path.join(BASE_DIR, "uploads")
+BLOB_DIR = os.path.join(UPLOAD_DIR, "blobs")
+INCOMING_DIR = os.path.join(UPLOAD_DIR, "incoming")
+os.makedirs(BLOB_DIR, exist_ok=True)
+os.makedirs(INCOMING_DIR, exist_ok=True)
+
+
+def incoming_path(original_name: str = "") -> str:
+    """Temporary path (same filesystem as the blob store) to stream a new upload into."""
+    ext = os.path.splitext(original_name)[1].lower()
+    return os.path.join(INCOMING_DIR, f"{uuid.uuid4().hex}{ext}.part")
+
+
+def _blob_relpath(sha256: str, ext: str) -> str:
+    return os.path.join("blobs", sha256[:2], sha256[2:4], f"{sha256}{ext}")
+
+
+def blob_abspath(blob: StoredBlob) -> str:
+    return os.path.join(UPLOAD_DIR, blob.path)
+
+
+def store_upload(db: Session, tmp_path: str, sha256: str, size: int, original_name: str = "") -> Tuple[StoredBlob, bool]:
+    """
+    Move `tmp_path` into the blob store under its content hash and take one reference.
+    Returns (blob, deduplicated). When identical bytes are already stored the
+    temporary file is discarded instead of written again.
+    """
+    blob = db.query(StoredBlob).filter(StoredBlob.sha256 == sha256).first()
+    if blob and os.path.exists(blob_abspath(blob)):
+        os.remove(tmp_path)
+        deduplicated = True
+    else:
+        relpath = blob.path if blob else _blob_relpath(sha256, os.path.splitext(original_name)[1].lower())
+        dest = os.path.join(UPLOAD_DIR, relpath)
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        os.replace(tmp_path, dest)
+        deduplicated = False
+        if not blob:
+            blob = StoredBlob(sha256=sha256, path=relpath, size=size, ref_count=0)
+            db.add(blob)
+            try:
+                db.commit()
+            except IntegrityError:
+                # a concurrent upload of the same bytes created the row first
+                db.rollback()
+                blob = db.query(StoredBlob).filter(StoredBlob.sha256 == sha256).one()
+
+    db.query(StoredBlob).filter(StoredBlob.sha256 == sha256).update(
+        {StoredBlob.ref_count: StoredBlob.ref_count + 1}, synchronize_session=False
+    )
+    db.commit()
+    db.refresh(blob)
+    logger.info(f"Stored blob {sha256} (refs={blob.ref_count}, deduplicated={deduplicated})")
+    return blob, deduplicated
+
+
+def register_file(
+    db: Session,
+    file_id: str,
+    name: str,
+    size: int,
+    content_type: str,
+    sha256: str,
+    company: Optional[str] = None,
+) -> FileMetadata:
+    entry = FileMetadata(
+        id=file_id,
+        stored_as=file_id,
+        name=name,
+        uploaded_at=datetime.utcnow(),
+        size=size,
+        type=content_type,
+        company=company,
+        sha256=sha256,
+    )
+    db.add(entry)
+    db.commit()
+    db.refresh(entry)
+    return entry
+
+
+def _entry_file(db: Session, entry: FileMetadata) -> Optional[Tuple[str, Optional[str]]]:
+    if entry.sha256:
+        blob = db.query(StoredBlob).filter(StoredBlob.sha256 == entry.sha256).first()
+        if blob and os.path.exists(blob_abspath(blob)):
+            return blob_abspath(blob), blob.sha256
+    # legacy layout: uploads/<stored_as> (not content addressed: no known hash)
+    legacy = os.path.join(UPLOAD_DIR, os.path.basename(entry.stored_as))
+    return (legacy, None) if os.path.isfile(legacy) else None
+
+
+def resolve_file(db: Session, file_id: str) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    (path, sha256) of the bytes behind `file_id`, or None if nothing is stored for it.
+    sha256 is None for legacy uploads stored before content addressing.
+    """
+    entry = db.query(FileMetadata).filter(FileMetadata.id == file_id).first()
+    if entry:
+        found = _entry_file(db, entry)
+        if found:
+            return found
+
+    # legacy upload never registered in file_metadata: uploads/<file_id> (single stat)
+    legacy = os.path.join(UPLOAD_DIR, os.path.basename(file_id))
+    return (legacy, None) if os.path.isfile(legacy) else None
+
+
+def resolve_path(db: Session, file_id: str) -> Optional[str]:
+    """Path of the bytes behind `file_id`, or None if nothing is stored for it."""
+    found = resolve_file(db, file_id)
+    return found[0] if found else None
+
+
+def resolve_prefix(db: Session, prefix: str) -> Optional[Tuple[str, str, Optional[str]]]:
+    """
+    Resolve a file_id prefix (e.g. just the uuid of "uuid_originalname").
+    Uses a primary-key range scan instead of globbing the upload directory.
+    Returns (file_id, path, sha256) of the first match, or None.
+    """
+    if not prefix:
+        return None
+    entry = (
+        db.query(FileMetadata)
+        .filter(FileMetadata.id >= prefix, FileMetadata.id < prefix + "\U0010ffff")
+        .order_by(FileMetadata.id)
+        .first()
+    )
+    if not entry:
+        return None
+    found = _entry_file(db, entry)
+    return (entry.id, *found) if found else None
+
+
+def iter_stored_files() -> Iterator[str]:
+    """
+    Lazily yield stored files (relative to UPLOAD_DIR) with os.scandir: legacy
+    top-level uploads and sharded blobs; incoming/ (partial uploads) is skipped.
+    Order is directory order, which is stable while the tree is unchanged, so
+    callers can paginate with islice without listing everything.
+    """
+    def walk(rel_dir: str) -> Iterator[str]:
+        with os.scandir(os.path.join(UPLOAD_DIR, rel_dir)) as it:
+            for entry in it:
+                rel = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if rel_dir or entry.name == "blobs":
+                        yield from walk(rel)
+                elif entry.is_file(follow_symlinks=False):
+                    yield rel
+
+    yield from walk("")
+
+
+def release_file(db: Session, entry: FileMetadata) -> bool:
+    """
+    Drop the reference held by `entry` (the caller deletes the row itself).
+    Returns True when stored bytes were removed from disk.
+    """
+    if not entry.sha256:
+        legacy = os.path.join(UPLOAD_DIR, os.path.basename(entry.stored_as))
+        if not os.path.exists(legacy):
+            return False
+        analysis_cache.evict(file_sha256(legacy))
+        os.remove(legacy)
+        return True
+
+    return release_blob(db, entry.sha256)
+
+
+def release_blob(db: Session, sha256: str) -> bool:
+    """
+    Drop one reference to the blob stored under `sha256` (taken by store_upload);
+    the last reference removes its bytes and cached analysis.
+    Returns True when stored bytes were removed from disk.
+    """
+    blob = db.query(StoredBlob).filter(StoredBlob.sha256 == sha256).first()
+    if not blob:
+        return False
+    db.query(StoredBlob).filter(StoredBlob.sha256 == sha256).update(
+        {StoredBlob.ref_count: StoredBlob.ref_count - 1}, synchronize_session=False
+    )
+    db.commit()
+    db.refresh(blob)
+    if blob.ref_count > 0:
+        logger.info(f"Blob {blob.sha256} still referenced {blob.ref_count} times; keeping it")
+        return False
+
+    path = blob_abspath(blob)
+    if os.path.exists(path):
+        os.remove(path)
+    analysis_cache.evict(blob.sha256)
+    db.delete(blob)
+    db.commit()
+    logger.info(f"Removed blob {sha256} (last reference released)")
+    return True
@@ -2,17 +2,50 @@
 Table normalization and KPI extraction heuristics.
 
 - normalize_table: convert raw table (list of rows) to cleaned string matrix
+- parse_numeric_tables / parse_numeric_table: parse every cell of normalized tables
+  at once into a float matrix plus validity mask per table; label detection and
+  the KPI dicts both read it
 - detect_label_column: heuristics to decide if first column is labels (non-numeric)
 - extract_kpi_rows: convert table rows into KPI dicts: {"label": ..., "values": {"col_1": val, ...}}
-- _parse_numeric: try to parse ints/floats; return original string if not numeric
+
+Cell values in the KPI dicts come straight from the parsed matrix: int for whole
+numbers, float otherwise, None for blanks and nil markers, and the trimmed cell
+text when it is not a number. Consumers test `isinstance(v, (int, float))`
+instead of parsing the value again.
 """
-from typing import List, Any, Tuple, Dict
-import re
+from typing import List, Any, NamedTuple, Optional, Sequence, Tuple, Dict
 import logging
+import operator
+import re
+from itertools import compress, repeat
+
+import numpy as np
 
 logger = logging.getLogger("app.services.table_extractor")
 
-NUMERIC_RE = re.compile(r"^-?\d+([,.\u2009]\d+)*$")  # allow commas, dots, narrow spaces
+# cells that stand for "no value" (compared lowercased, without spaces)
+NIL_MARKERS = frozenset(("", "-", "\u2013", "\u2014", "na", "n/a", "nil", "none"))
+# digit group separators (Western "1,234,567" and Indian "12,34,567" alike)
+GROUP_SEPARATORS = (",", "\u2009", "\xa0", " ")
+# a whole cell, group separators removed: signed number, or number in parentheses (negative)
+NUMBER_RE = re.compile(r"[+-]?(?:\d+\.?\d*|\.\d+)|\((?:\d+\.?\d*|\.\d+)\)")
+# a cell counted as numeric by detect_label_column (group separators removed): digit
+# groups joined by "," "." or a narrow space, so dates ("31.03.2025") and section
+# numbers ("1.2.3") count as figures there, "(123)" and "+5" do not
+LABEL_NUMBER_RE = re.compile(r"-?\d+(?:[,.\u2009]\d+)*")
+# joins the cells of a table so separators are removed in one pass (never occurs in PDF text)
+CELL_SEP = "\x1f"
+
+
+class NumericTable(NamedTuple):
+    """Per-cell parse of a normalized table (all arrays shaped rows x widest row)."""
+    values: np.ndarray    # float64, NaN where the cell is not a number
+    valid: np.ndarray     # bool, cell is a number
+    integral: np.ndarray  # bool, cell is a number written without a decimal point
+    blank: np.ndarray     # bool, cell is empty or a nil marker
+    empty: np.ndarray     # bool, cell is empty (or padding of a short row)
+    cells: np.ndarray     # object, the KPI value: int / float, None for blanks, else the cell text
+    numeric_share: np.ndarray  # float64 per column, share of its non-empty cells matching LABEL_NUMBER_RE
 
 
 def normalize_table(raw_table: List[List[Any]]) -> List[List[str]]:
@@ -30,62 +63,91 @@ def normalize_table(raw_table: List[List[Any]]) -> List[List[str]]:
     return out
 
 
-def _parse_numeric(s: str):
-    if s is None:
-        return None
-    st = str(s).strip()
-    if st == "" or st.lower() in ("na", "n/a", "-"):
-        return None
-    # remove group separators like commas or narrow spaces
-    clean = st.replace(",", "").replace("\u2009", "").replace(" ", "")
-    # allow parentheses for negative numbers: (1,234) -> -1234
-    if clean.startswith("(") and clean.endswith(")"):
-        clean = "-" + clean[1:-1]
-    # try parse int or float
-    try:
-        if "." in clean:
-            return float(clean)
-        # If it's digits only (possibly leading '-') parse int
-        if re.fullmatch(r"-?\d+", clean):
-            return int(clean)
-        # maybe it's a float-like with thousands delimiters removed previously
-        return float(clean)
-    except Exception:
-        # not strictly numeric, return original trimmed string
-        return st
-
-
-def detect_label_column(table: List[List[str]]) -> Tuple[bool, int]:
+def parse_numeric_tables(norms: Sequence[List[List[str]]]) -> List[NumericTable]:
+    """
+    Parse every cell of `norms` (normalize_table outputs) in one pass: the rows of all
+    tables are stacked, separators are stripped from the joined cells at once, each
+    cell is matched by one compiled regex and the numbers are converted into one
+    NumPy matrix, which is then split back per table (row slices, no copies).
+    Numbers may use digit grouping, a sign, one decimal point and parentheses for
+    negatives ("(1,23,456.50)" -> -123456.5); dashes and nil markers are blank.
+    numeric_share, which drives detect_label_column, counts cells by the looser
+    LABEL_NUMBER_RE instead, so label detection is unchanged from the per-cell version.
+    """
+    rows = [r for norm in norms for r in norm]
+    width = max((len(r) for r in rows), default=0)
+    cells = [c for r in rows for c in (r if len(r) == width else list(r) + [""] * (width - len(r)))]
+    size = len(cells)
+
+    joined = CELL_SEP.join(cells)
+    for sep in GROUP_SEPARATORS:
+        joined = joined.replace(sep, "")
+    split = joined.split(CELL_SEP)
+    valid = np.fromiter(map(bool, map(NUMBER_RE.fullmatch, split)), bool, size)
+    label_numeric = np.fromiter(map(bool, map(LABEL_NUMBER_RE.fullmatch, split)), bool, size)
+    blank = np.fromiter(map(NIL_MARKERS.__contains__, joined.lower().split(CELL_SEP)), bool, size)
+    empty = np.fromiter(map(operator.not_, cells), bool, size)
+
+    values = np.full(size, np.nan)
+    integral = np.zeros(size, bool)
+    typed = np.array(cells, dtype=object)
+    typed[blank] = None
+    if valid.any():
+        # "(1234.5)" -> "-1234.5"; only the valid cells are converted
+        signed = joined.replace("(", "-").replace(")", "").split(CELL_SEP)
+        numbers = list(compress(signed, valid.tolist()))
+        floats = list(map(float, numbers))
+        whole = [not dot for dot in map(operator.contains, numbers, repeat("."))]
+        values[valid] = floats
+        integral[valid] = whole
+        # an object array keeps ints and floats apart (a list would be cast to float64)
+        objects = np.empty(len(floats), dtype=object)
+        objects[:] = [int(f) if w else f for f, w in zip(floats, whole)]
+        typed[valid] = objects
+
+    matrices = [a.reshape(len(rows), width) for a in (values, valid, integral, blank, empty, typed)]
+    # per-table column sums of all tables at once (empty tables are skipped by reduceat)
+    starts = np.cumsum([0] + [len(norm) for norm in norms[:-1]])
+    filled_tables = [i for i, norm in enumerate(norms) if norm]
+    shares = np.zeros((len(norms), width))
+    if filled_tables and width:
+        numeric = np.add.reduceat(label_numeric.reshape(len(rows), width), starts[filled_tables], axis=0)
+        filled = np.add.reduceat(~matrices[4], starts[filled_tables], axis=0)
+        shares[filled_tables] = np.divide(numeric, filled, out=np.zeros(numeric.shape), where=filled > 0)
+
+    out = []
+    for i, norm in enumerate(norms):
+        width_t = max((len(r) for r in norm), default=0)
+        rows_t = slice(starts[i], starts[i] + len(norm))
+        out.append(NumericTable(*(m[rows_t, :width_t] for m in matrices), shares[i, :width_t]))
+    return out
+
+
+def parse_numeric_table(norm: List[List[str]]) -> NumericTable:
+    """parse_numeric_tables for a single table."""
+    return parse_numeric_tables([norm])[0]
+
+
+def _typed_rows(norm: List[List[str]], parsed: NumericTable) -> List[List[Any]]:
+    """KPI values of every row of `norm` (padding of short rows dropped)."""
+    return [cells[:len(row)] for row, cells in zip(norm, parsed.cells.tolist())]
+
+
+def detect_label_column(table: List[List[str]], parsed: Optional[NumericTable] = None) -> Tuple[bool, int]:
     """
     Heuristic:
     - If first column has low numeric fraction (<0.3) and other columns have higher numeric fraction (>0.5)
       then we assume the first column is label column.
+    `parsed` is parse_numeric_table(table), when the caller already has it.
     Returns (has_label_column, index_of_label_column)
     """
-    if not table:
+    if not table or not max(len(r) for r in table):
         return False, 0
-    max_cols = max(len(r) for r in table)
-    # gather columns
-    cols: List[List[str]] = []
-    for ci in range(max_cols):
-        col = [r[ci] if len(r) > ci else "" for r in table]
-        cols.append(col)
-
-    def numeric_fraction(col: List[str]) -> float:
-        cnt = 0
-        tot = 0
-        for v in col:
-            vv = (v or "").strip()
-            if vv == "":
-                continue
-            tot += 1
-            # use NUMERIC_RE but after removing commas and spaces
-            if NUMERIC_RE.match(vv.replace(",", "").replace(" ", "").replace("\u2009", "")):
-                cnt += 1
-        return (cnt / tot) if tot > 0 else 0.0
-
-    first_frac = numeric_fraction(cols[0])
-    others_fracs = [numeric_fraction(c) for c in cols[1:]] if len(cols) > 1 else []
+    parsed = parsed if parsed is not None else parse_numeric_table(table)
+    fracs = parsed.numeric_share.tolist()
+
+    first_frac = fracs[0]
+    others_fracs = fracs[1:]
     avg_others = (sum(others_fracs) / len(others_fracs)) if others_fracs else 0.0
     logger.debug(f"detect_label_column: first_frac={first_frac:.2f}, avg_others={avg_others:.2f}, others={others_fracs}")
     if first_frac < 0.3 and avg_others > 0.5:
@@ -93,39 +155,41 @@ def detect_label_column(table: List[List[str]]) -> Tuple[bool, int]:
     return False, 0
 
 
-def extract_kpi_rows(table: List[List[Any]], prefer_first_column_labels: bool = True, force_label_column: bool= False) -> List[Dict]:
+def extract_kpi_rows(
+    table: List[List[Any]],
+    prefer_first_column_labels: bool = True,
+    force_label_column: bool= False,
+    parsed: Optional[NumericTable] = None,
+) -> List[Dict]:
     """
     Convert a table (raw list of rows) to KPI dicts.
     Each returned dict: {"label": str or None, "values": {"col_i": numeric_or_string, ...}}
+    With `parsed` (the table's parse_numeric_tables entry, when the caller parsed a
+    batch), `table` must be the normalized table that was parsed.
     """
-    norm = normalize_table(table)
+    if parsed is None:
+        norm = normalize_table(table)
+        parsed = parse_numeric_table(norm)
+    else:
+        norm = table
+    typed = _typed_rows(norm, parsed)
     if force_label_column:
         result = []
-        for row in norm:
+        for row, cells in zip(norm, typed):
             label = row[0] if len(row) > 0 else ""
-            values = {
-                f"col_{i}": _parse_numeric(cell)
-                for i, cell in enumerate(row[1:], start=1)
-            }
+            values = {f"col_{i}": v for i, v in enumerate(cells[1:], start=1)}
             result.append({"label": label, "values": values})
         return result
-    has_label, label_idx = detect_label_column(norm)
+    has_label, label_idx = detect_label_column(norm, parsed)
     result: List[Dict] = []
     if has_label and prefer_first_column_labels:
-        for row in norm:
+        for row, cells in zip(norm, typed):
             label = row[label_idx] if len(row) > label_idx else ""
-            values = {}
-            for i, cell in enumerate(row):
-                if i == label_idx:
-                    continue
-                key = f"col_{i}"
-                values[key] = _parse_numeric(cell)
+            values = {f"col_{i}": v for i, v in enumerate(cells) if i != label_idx}
             result.append({"label": label, "values": values})
     else:
         # fallback: return each row as unlabeled with columns
-        for row in norm:
-            values = {}
-            for i, cell in enumerate(row):
-                values[f"col_{i}"] = _parse_numeric(cell)
+        for cells in typed:
+            values = {f"col_{i}": v for i, v in enumerate(cells)}
             result.append({"label": None, "values": values})
-    return result
\ No newline at end of file
+    return result
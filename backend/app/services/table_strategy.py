@@ -0,0 +1,110 @@
+"""
+Per-page routing between pdfplumber table-finding strategies.
+
+pdfplumber's default extract_tables() finds cells from ruling lines only, so it
+returns nothing for the borderless statements common in Indian filings. Every
+page is therefore routed from its ruling objects (line and rect objects, counted
+from the page's already-parsed objects, no extra pass over the content stream):
+
+- "lines":   enough rulings spread over the page -> default lattice settings
+- "cropped": enough rulings, but inside one region of the page -> lattice settings
+             on the page cropped to that region (fewer chars and edges to match)
+- "text":    (almost) no rulings -> tables rebuilt from word positions
+             (app.services.word_tables): rows from word tops, columns from
+             the x-spans of the figures, headings from the rows right above
+
+When a ruled strategy finds no table the page gets one "text" pass. The chosen
+strategy, the number of passes and the timing are logged for every page.
+
+Configuration (environment):
+- TABLE_STRATEGY: auto (default), or lines / text to force one strategy on every page
+  (no retry; lines is the previous behaviour)
+- TABLE_MIN_RULINGS: ruling objects needed for the ruled strategies (default: 4)
+- TABLE_CROP_MAX_AREA: largest share of the page the ruled region may cover for
+  "cropped" (default: 0.6)
+"""
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services import word_tables
+
+logger = logging.getLogger("app.services.table_strategy")
+
+TABLE_STRATEGY = os.getenv("TABLE_STRATEGY", "auto").strip().lower()
+TABLE_MIN_RULINGS = int(os.getenv("TABLE_MIN_RULINGS", "4"))
+TABLE_CROP_MAX_AREA = float(os.getenv("TABLE_CROP_MAX_AREA", "0.6"))
+
+LINES = "lines"
+CROPPED = "cropped"
+TEXT = "text"
+
+# room around the ruled region so cell text touching the outer rules is kept
+CROP_PADDING = 2
+
+
+def ruling_stats(page) -> Tuple[int, Optional[Tuple[float, float, float, float]]]:
+    """(number of line/rect objects, bounding box of all of them or None)."""
+    objects = page.objects
+    rulings = objects.get("line", []) + objects.get("rect", [])
+    if not rulings:
+        return 0, None
+    bbox = (
+        min(o["x0"] for o in rulings),
+        min(o["top"] for o in rulings),
+        max(o["x1"] for o in rulings),
+        max(o["bottom"] for o in rulings),
+    )
+    return len(rulings), bbox
+
+
+def choose_strategy(page) -> Tuple[str, int, Optional[Tuple[float, float, float, float]]]:
+    """(strategy, ruling count, ruled region) for one pdfplumber page."""
+    rulings, bbox = ruling_stats(page)
+    if TABLE_STRATEGY in (LINES, TEXT):
+        return TABLE_STRATEGY, rulings, bbox
+    if rulings < TABLE_MIN_RULINGS or bbox is None:
+        return TEXT, rulings, bbox
+    area = max(0.0, bbox[2] - bbox[0]) * max(0.0, bbox[3] - bbox[1])
+    page_area = float(page.width * page.height) or 1.0
+    if area / page_area <= TABLE_CROP_MAX_AREA:
+        return CROPPED, rulings, bbox
+    return LINES, rulings, bbox
+
+
+def _run(page, strategy: str, bbox, words: Optional[List[Dict[str, Any]]]) -> List[List[List[Any]]]:
+    if strategy == TEXT:
+        return word_tables.reconstruct_tables(page.extract_words() if words is None else words)
+    if strategy == CROPPED:
+        x0, top, x1, bottom = bbox
+        region = (
+            max(page.bbox[0], x0 - CROP_PADDING),
+            max(page.bbox[1], top - CROP_PADDING),
+            min(page.bbox[2], x1 + CROP_PADDING),
+            min(page.bbox[3], bottom + CROP_PADDING),
+        )
+        return page.crop(region, strict=False).extract_tables() or []
+    return page.extract_tables() or []
+
+
+def extract_page_tables(page, words: Optional[List[Dict[str, Any]]] = None) -> List[List[List[Any]]]:
+    """
+    Tables of one pdfplumber page (same shape as page.extract_tables()), extracted
+    with the routed strategy and a "text" retry when a ruled strategy finds none.
+    `words` are the page's extract_words(), when the caller already has them.
+    """
+    started = time.perf_counter()
+    strategy, rulings, bbox = choose_strategy(page)
+    passes = [strategy]
+    tables = _run(page, strategy, bbox, words)
+    if not tables and strategy != TEXT and TABLE_STRATEGY not in (LINES, TEXT):
+        passes.append(TEXT)
+        tables = _run(page, TEXT, bbox, words)
+
+    logger.info(
+        f"Tables page {page.page_number}: {' -> '.join(passes)} ({rulings} rulings), "
+        f"{len(tables)} tables / {sum(len(t) for t in tables)} rows in "
+        f"{(time.perf_counter() - started) * 1000:.1f} ms"
+    )
+    return tables
@@ -0,0 +1,64 @@
+"""
+Cheap text probe for a PDF page.
+
+pdfplumber's extract_text() (and even page.chars or a cropped page) interprets the
+page's whole content stream and builds a positioned object for every character
+before any text comes out. Looking for a heading only needs the first few hundred
+characters the page draws: headings are drawn before the body on virtually every
+generated report.
+
+probe_text() runs pdfminer's interpreter with a minimal text device that only
+decodes characters (no layout objects, no positions) and aborts the interpretation
+as soon as `max_chars` characters were seen. Whitespace is unreliable in this raw
+stream (many PDFs position words instead of drawing spaces), so callers should
+match against whitespace-free text (see keyword_matcher.COMPACT_KEYWORD_MATCHER).
+
+Configuration (environment):
+- HEADING_PROBE_CHARS: characters read per page (default: 1500)
+"""
+import logging
+import os
+
+from pdfminer.pdfdevice import PDFTextDevice
+from pdfminer.pdffont import PDFUnicodeNotDefined
+from pdfminer.pdfinterp import PDFPageInterpreter
+
+logger = logging.getLogger("app.services.text_probe")
+
+PROBE_CHARS = int(os.getenv("HEADING_PROBE_CHARS", "1500"))
+
+
+class _ProbeFull(Exception):
+    pass
+
+
+class _ProbeDevice(PDFTextDevice):
+    def __init__(self, rsrcmgr, max_chars: int):
+        super().__init__(rsrcmgr)
+        self.max_chars = max_chars
+        self.chars = []
+
+    def render_char(self, matrix, font, fontsize, scaling, rise, cid, ncs, graphicstate):
+        try:
+            self.chars.append(font.to_unichr(cid))
+        except PDFUnicodeNotDefined:
+            pass
+        if len(self.chars) >= self.max_chars:
+            raise _ProbeFull
+        return font.char_width(cid) * fontsize * scaling
+
+
+def probe_text(page, max_chars: int = PROBE_CHARS) -> str:
+    """
+    First `max_chars` characters drawn on a pdfplumber `page`, in content-stream order
+    (no spacing or line breaks guaranteed). Returns "" if the page cannot be interpreted.
+    """
+    rsrcmgr = page.pdf.rsrcmgr
+    device = _ProbeDevice(rsrcmgr, max_chars)
+    try:
+        PDFPageInterpreter(rsrcmgr, device).process_page(page.page_obj)
+    except _ProbeFull:
+        pass
+    except Exception:
+        logger.debug(f"Text probe failed on page {page.page_number} (ignored)")
+    return "".join(device.chars)
@@ -1,22 +1,21 @@
 # app/services/toc_service.py
 
-import pdfplumber
 import re
 
+from app.services import page_extraction
+from app.services.keyword_matcher import KEYWORD_MATCHER
+
 # --------------------------------------------------------
 # Extract TOC text from first 20 pages
 # --------------------------------------------------------
 def extract_toc_text(pdf_path: str) -> str:
     toc_text = []
 
-    with pdfplumber.open(pdf_path) as pdf:
-        for i in range(min(20, len(pdf.pages))):
-            try:
-                text = pdf.pages[i].extract_text() or ""
-                if text.strip():
-                    toc_text.append(text)
-            except:
-                continue
+    pages_text = page_extraction.extract_pages_text(pdf_path, 1, 20)
+    for page_no in sorted(pages_text):
+        text = pages_text[page_no]
+        if text.strip():
+            toc_text.append(text)
 
     return "\n".join(toc_text)
 
@@ -26,26 +25,21 @@ def extract_toc_text(pdf_path: str) -> str:
 # --------------------------------------------------------
 def detect_mda_page_range(toc_text: str):
     text = toc_text.lower().replace("’", "'")
-    lines = [l.strip() for l in text.split("\n") if l.strip()]
-
-    keywords = [
-        "management's discussion and analysis of financial condition and result of operations",
-        "management's discussion and analysis",
-        "management discussion and analysis",
-        "discussion and analysis of financial condition",
-        "analysis of financial condition",
-        "financial condition and result of operations",
-        "management discussion",
-        "md&a",
-        "mda",
-    ]
+    # one keyword pass over the whole TOC; hits are grouped by raw line
+    hit_lines = KEYWORD_MATCHER.hit_lines(text, ("mda",), sep="\n")
+    lines = []
+    is_mda = []
+    for line_no, raw in enumerate(text.split("\n")):
+        if raw.strip():
+            lines.append(raw.strip())
+            is_mda.append(line_no in hit_lines)
 
     mda_start_page = None
     mda_line_index = None
 
     # --- FIND START PAGE ---
     for i, line in enumerate(lines):
-        if not any(k in line for k in keywords):
+        if not is_mda[i]:
             continue
 
         # same-line page number
@@ -0,0 +1,156 @@
+"""
+Table reconstruction from word positions, for statements without ruling lines.
+
+Input is pdfplumber's page.extract_words() (text + x0/x1/top/bottom); output has
+the shape of page.extract_tables(): a list of tables, each a list of rows whose
+first cell is the row label and whose other cells are the figure columns, so it
+feeds normalize_table / extract_kpi_rows unchanged.
+
+Clustering is done on NumPy arrays of all words of a page at once:
+- rows:    words sorted by top; a new row starts where the gap to the previous
+           top exceeds ROW_TOLERANCE x the median word height
+- tables:  rows holding figures form the body; a figure is a numeric token that
+           is not a bare year and stands apart from the word before it (the
+           "3" of "Note 3" stays in the label). The body is split where the gap
+           between consecutive figure rows exceeds TABLE_GAP_FACTOR x the row
+           pitch (median gap above a figure row); up to MAX_HEADER_ROWS rows
+           right above a body (column headings such as "March 31, 2025") are kept
+- columns: the [x0, x1] spans of the body's figures are merged where they overlap
+           (within COLUMN_TOLERANCE points), so left-, right- and centre-aligned
+           figures all form one column each
+- cells:   the label column spans the body rows' words left of the first figure
+           column; every word goes to the column (label or figures) nearest to
+           its centre
+"""
+import logging
+import re
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+
+from app.services.page_classifier import NUMERIC_TOKEN_RE
+
+logger = logging.getLogger("app.services.word_tables")
+
+ROW_TOLERANCE = 0.5
+# a number closer than this x the word height to the previous word continues a phrase
+WORD_GAP_FACTOR = 0.6
+TABLE_GAP_FACTOR = 3.0
+MAX_HEADER_ROWS = 2
+COLUMN_TOLERANCE = 2.0
+# a table needs at least this many rows with figures, one of them with MIN_ROW_AMOUNTS
+MIN_BODY_ROWS = 2
+MIN_ROW_AMOUNTS = 2
+
+YEAR_RE = re.compile(r"^(?:19|20)\d{2}$")
+
+
+def _is_amount(text: str) -> bool:
+    return bool(NUMERIC_TOKEN_RE.fullmatch(text)) and not YEAR_RE.match(text)
+
+
+def _row_ids(top: np.ndarray, height: np.ndarray) -> np.ndarray:
+    """Row index of every word (words must be sorted by top)."""
+    tolerance = ROW_TOLERANCE * float(np.median(height))
+    breaks = np.diff(top) > tolerance
+    return np.concatenate(([0], np.cumsum(breaks)))
+
+
+def _stands_apart(rows: np.ndarray, x0: np.ndarray, x1: np.ndarray, height: np.ndarray) -> np.ndarray:
+    """True for words that start a row or follow the previous word of their row by a column gap."""
+    order = np.lexsort((x0, rows))
+    gap = np.empty(len(order))
+    gap[0] = np.inf
+    gap[1:] = np.where(rows[order][1:] == rows[order][:-1], x0[order][1:] - x1[order][:-1], np.inf)
+    apart = np.empty(len(order), bool)
+    apart[order] = gap > WORD_GAP_FACTOR * height[order]
+    return apart
+
+
+def _column_spans(x0: np.ndarray, x1: np.ndarray) -> np.ndarray:
+    """Merge overlapping [x0, x1] intervals; returns a (columns, 2) array of spans."""
+    order = np.argsort(x0)
+    x0, x1 = x0[order], x1[order]
+    reach = np.maximum.accumulate(x1)
+    starts = np.flatnonzero(np.concatenate(([True], x0[1:] > reach[:-1] + COLUMN_TOLERANCE)))
+    return np.column_stack((x0[starts], np.maximum.reduceat(x1, starts)))
+
+
+def _build_table(texts: Sequence[str], x0: np.ndarray, x1: np.ndarray, rows: np.ndarray, amounts: np.ndarray) -> List[List[str]]:
+    spans = _column_spans(x0[amounts], x1[amounts])
+    row_values = np.unique(rows)
+    row_index = np.searchsorted(row_values, rows)
+
+    # label column: from the page edge to the last label word of the body rows
+    body_row = np.bincount(row_index, weights=amounts, minlength=len(row_values))[row_index] > 0
+    label_words = body_row & (x1 < spans[0, 0])
+    label_end = x1[label_words].max() if label_words.any() else spans[0, 0] - 1
+    spans = np.vstack(([[-np.inf, label_end]], spans))
+
+    centre = (x0 + x1) / 2
+    # distance from each word centre to each column span (0 inside the span)
+    distance = np.maximum(spans[None, :, 0] - centre[:, None], 0) + np.maximum(centre[:, None] - spans[None, :, 1], 0)
+    column = distance.argmin(axis=1)
+
+    cells: List[List[List[str]]] = [[[] for _ in range(len(spans))] for _ in row_values]
+    for i in np.lexsort((x0, column, row_index)):
+        cells[row_index[i]][column[i]].append(texts[i])
+    return [[" ".join(cell) for cell in row] for row in cells]
+
+
+def reconstruct_tables(words: Sequence[Dict[str, Any]]) -> List[List[List[str]]]:
+    """Tables (list of rows of cells) reconstructed from one page's words."""
+    if not words:
+        return []
+    order = sorted(range(len(words)), key=lambda i: (words[i]["top"], words[i]["x0"]))
+    texts = [words[i]["text"] for i in order]
+    x0 = np.fromiter((words[i]["x0"] for i in order), float, len(order))
+    x1 = np.fromiter((words[i]["x1"] for i in order), float, len(order))
+    top = np.fromiter((words[i]["top"] for i in order), float, len(order))
+    bottom = np.fromiter((words[i]["bottom"] for i in order), float, len(order))
+    amounts = np.fromiter((_is_amount(t) for t in texts), bool, len(order))
+
+    rows = _row_ids(top, bottom - top)
+    amounts &= _stands_apart(rows, x0, x1, bottom - top)
+    n_rows = int(rows[-1]) + 1
+    amounts_per_row = np.bincount(rows, weights=amounts, minlength=n_rows)
+    row_top = np.full(n_rows, np.inf)
+    np.minimum.at(row_top, rows, top)
+
+    body = np.flatnonzero(amounts_per_row >= 1)
+    if len(body) < MIN_BODY_ROWS:
+        return []
+    # row pitch: typical gap between a figure row and the row above it
+    above = body[body > 0]
+    pitch = float(np.median(row_top[above] - row_top[above - 1]))
+    # split the amount rows into blocks at large vertical gaps
+    gaps = np.diff(row_top[body]) > TABLE_GAP_FACTOR * pitch
+    blocks = np.split(body, np.flatnonzero(gaps) + 1)
+
+    tables = []
+    previous_end = -1
+    for block in blocks:
+        if len(block) < MIN_BODY_ROWS or amounts_per_row[block].max() < MIN_ROW_AMOUNTS:
+            continue
+        first, last = int(block[0]), int(block[-1])
+        # column headings: rows right above the body, within 1.5 row pitches of each other
+        headers = 0
+        while (
+            headers < MAX_HEADER_ROWS
+            and first - 1 > previous_end
+            and row_top[first] - row_top[first - 1] <= 1.5 * pitch
+        ):
+            first -= 1
+            headers += 1
+        previous_end = last
+        in_table = (rows >= first) & (rows <= last)
+        idx = np.flatnonzero(in_table)
+        table = _build_table([texts[i] for i in idx], x0[idx], x1[idx], rows[idx], amounts[idx])
+        if table:
+            tables.append(table)
+    return tables
+
+
+def extract_page_tables(page) -> List[List[List[str]]]:
+    """reconstruct_tables on a pdfplumber page."""
+    return reconstruct_tables(page.extract_words())
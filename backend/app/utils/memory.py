@@ -0,0 +1,36 @@
+"""
+Process memory probes (no third-party dependencies).
+
+- current_rss_bytes(): resident set size right now (/proc/self/statm on Linux,
+  falling back to the process peak where /proc is unavailable)
+- peak_rss_bytes(): highest RSS the process has reached (getrusage)
+"""
+import os
+import sys
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def peak_rss_bytes() -> int:
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def current_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+def to_mb(n_bytes: int) -> float:
+    return round(n_bytes / (1024 * 1024), 1)
@@ -0,0 +1,58 @@
+"""
+Stream uploads to disk in fixed-size chunks.
+
+Uploads are never read into memory in one piece: each chunk is hashed (SHA-256)
+and written as it arrives, and the configured size limit is enforced as early as
+possible (from the declared size when the client sends one, otherwise as soon as
+the running total crosses the limit).
+
+Configuration (environment):
+- MAX_UPLOAD_MB: maximum accepted upload size in MiB (default: 200)
+"""
+import hashlib
+import logging
+import os
+from typing import Tuple
+
+from fastapi import UploadFile
+
+logger = logging.getLogger("app.utils.upload_stream")
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "200")) * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class UploadTooLargeError(Exception):
+    pass
+
+
+async def save_upload(file: UploadFile, dest_path: str, max_bytes: int = MAX_UPLOAD_BYTES) -> Tuple[int, str]:
+    """
+    Write `file` to `dest_path` chunk by chunk.
+    Returns (size_in_bytes, sha256_hex). Raises UploadTooLargeError past `max_bytes`;
+    a partially written file is removed on any failure.
+    """
+    if file.size is not None and file.size > max_bytes:
+        raise UploadTooLargeError(f"upload exceeds {max_bytes} bytes")
+
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(dest_path, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLargeError(f"upload exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        try:
+            os.remove(dest_path)
+        except OSError:
+            logger.debug(f"Could not remove partial upload {dest_path} (ignored)")
+        raise
+
+    return size, digest.hexdigest()
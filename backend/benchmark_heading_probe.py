@@ -0,0 +1,74 @@
+"""
+Benchmark: heading search in OcrService.map_logical_to_physical, full text vs text probe
+
+Runs the logical -> physical mapping on a report with a cold page cache, once with
+full extract_text() on every page searched and once with the layout-free text probe
+(full text only on the page whose probe matches), and checks both map to the same page.
+
+Usage:
+    python benchmark_heading_probe.py report.pdf [logical_page] [--rounds N]
+
+logical_page defaults to the page captured from the report's TOC (or 1).
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.ocr_service import OcrService
+
+
+def run_mapping(pdf_path, logical_page, probe):
+    ocr = OcrService(pdf_path)
+    ocr.open()
+    try:
+        start = time.perf_counter()
+        mapped = ocr.map_logical_to_physical(logical_page, probe=probe)
+        elapsed = time.perf_counter() - start
+        stats = ocr.cache_stats()
+    finally:
+        ocr.close()
+    return mapped, elapsed, stats["misses"]
+
+
+def toc_logical_page(pdf_path):
+    ocr = OcrService(pdf_path)
+    ocr.open()
+    try:
+        candidates = ocr._find_toc()
+    finally:
+        ocr.close()
+    for c in candidates:
+        if c.get("captured"):
+            return int(c["captured"])
+    return 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf")
+    parser.add_argument("logical_page", nargs="?", type=int)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    logical_page = args.logical_page or toc_logical_page(args.pdf)
+    print(f"⏱  Mapping logical page {logical_page} in {os.path.basename(args.pdf)} ({args.rounds} rounds, cold cache)\n")
+
+    results = {}
+    for label, probe in (("full text", False), ("text probe", True)):
+        best = None
+        for _ in range(args.rounds):
+            mapped, elapsed, misses = run_mapping(args.pdf, logical_page, probe)
+            best = elapsed if best is None else min(best, elapsed)
+        results[label] = mapped["physical_start"]
+        print(f"   {label:<11} physical_start={mapped['physical_start']:<5} best {best * 1000:9.1f} ms   page extractions {misses}")
+
+    assert results["full text"] == results["text probe"], "probe mapped to a different page"
+    print("\n✅ Both modes map to the same physical page")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Microbenchmark: compiled keyword matcher vs the previous brute-force keyword loops
+
+Compares, on synthetic ~6 KB report pages (and on real PDF pages when a path is
+given), the old implementations of
+- ParserService._guess_section   (any(k in t) over ~70 section keywords)
+- OcrService._find_toc           (re.search with 9 patterns on every line)
+- map_logical_to_physical         (any(k in t) over heading keywords)
+- detect_mda_page_range           (any(k in line) over MD&A keywords on every line)
+with app.services.keyword_matcher, and checks that both return the same answers.
+The brute-force versions apply KEYWORD_MATCHER's whole-word rule (a keyword
+starts at a word start; a one-word keyword also ends at a word end), so
+"oci" does not match inside "associates".
+
+Usage:
+    python benchmark_keyword_matcher.py [report.pdf] [--rounds N]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.keyword_matcher import KEYWORD_MATCHER, KEYWORDS, SECTION_CATEGORIES
+
+VOCAB = (
+    "the company revenue from operations increased during fiscal year compared to previous "
+    "period due to higher sales volume expenses employee benefit finance costs depreciation "
+    "amortisation tax associates subsidiaries total equity borrowings trade receivables "
+    "inventories management discussion board directors risk factors outlook"
+).split()
+
+
+# ----------------------------------------------------------------------
+# Previous implementations (brute force)
+# ----------------------------------------------------------------------
+def _word_pattern(keyword):
+    """Whole-word search pattern of one keyword ([^\\W_]: a letter or digit)."""
+    end = "" if " " in keyword else "(?![^\\W_])"
+    return re.compile(r"(?<![^\W_])" + re.escape(keyword) + end, re.I)
+
+
+WORD_PATTERNS = {c: [_word_pattern(k) for k in words] for c, words in KEYWORDS.items()}
+
+
+def _has_keyword(text, category):
+    return any(p.search(text) for p in WORD_PATTERNS[category])
+
+
+def legacy_guess_section(page_text):
+    t = page_text.lower()
+    for section in SECTION_CATEGORIES:
+        if _has_keyword(t, section):
+            return section
+    return "unknown"
+
+
+def legacy_toc_lines(page_text):
+    return [line.strip() for line in page_text.splitlines() if _has_keyword(line, "toc")]
+
+
+def legacy_has_heading(page_text):
+    return _has_keyword(page_text.lower(), "heading")
+
+
+def legacy_mda_lines(toc_text):
+    lines = [l.strip() for l in toc_text.lower().split("\n") if l.strip()]
+    return [i for i, line in enumerate(lines) if _has_keyword(line, "mda")]
+
+
+# ----------------------------------------------------------------------
+# Compiled matcher
+# ----------------------------------------------------------------------
+def matcher_guess_section(page_text):
+    return KEYWORD_MATCHER.first_category(page_text, SECTION_CATEGORIES) or "unknown"
+
+
+def matcher_toc_lines(page_text):
+    lines = page_text.splitlines()
+    return [lines[i].strip() for i in sorted(KEYWORD_MATCHER.hit_lines(page_text, ("toc",)))]
+
+
+def matcher_has_heading(page_text):
+    return KEYWORD_MATCHER.search(page_text, ("heading",)) is not None
+
+
+def matcher_mda_lines(toc_text):
+    text = toc_text.lower()
+    hits = KEYWORD_MATCHER.hit_lines(text, ("mda",), sep="\n")
+    out, n = [], 0
+    for line_no, raw in enumerate(text.split("\n")):
+        if raw.strip():
+            if line_no in hits:
+                out.append(n)
+            n += 1
+    return out
+
+
+def synthetic_pages(n, seed=7):
+    rng = random.Random(seed)
+    keywords = [k for words in KEYWORDS.values() for k in words]
+    pages = []
+    for i in range(n):
+        lines = []
+        for _ in range(60):
+            words = [rng.choice(VOCAB) for _ in range(12)]
+            if rng.random() < 0.03:
+                words.insert(rng.randrange(len(words)), rng.choice(keywords).upper())
+            lines.append(" ".join(words) + (f" ..... {rng.randint(1, 400)}" if i % 10 == 0 else ""))
+        pages.append("\n".join(lines))
+    return pages
+
+
+def pdf_pages(path):
+    import pdfplumber
+    with pdfplumber.open(path) as pdf:
+        return [page.extract_text() or "" for page in pdf.pages]
+
+
+def bench(name, legacy, compiled, inputs, rounds):
+    for x in inputs:
+        assert legacy(x) == compiled(x), f"{name}: results differ"
+    timings = []
+    for fn in (legacy, compiled):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for x in inputs:
+                fn(x)
+        timings.append((time.perf_counter() - start) / (rounds * len(inputs)) * 1e6)
+    print(f"   {name:<22} legacy {timings[0]:8.1f} µs   matcher {timings[1]:8.1f} µs   x{timings[0] / timings[1]:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf", nargs="?", help="optional report PDF to benchmark on")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    corpora = [("synthetic", synthetic_pages(200))]
+    if args.pdf:
+        corpora.append((os.path.basename(args.pdf), pdf_pages(args.pdf)))
+
+    for label, pages in corpora:
+        avg = sum(len(p) for p in pages) / max(1, len(pages))
+        print(f"\n⏱  {label}: {len(pages)} pages, {avg:.0f} chars/page (per-call averages)")
+        bench("_guess_section", legacy_guess_section, matcher_guess_section, pages, args.rounds)
+        bench("_find_toc (per page)", legacy_toc_lines, matcher_toc_lines, pages, args.rounds)
+        bench("heading probe", legacy_has_heading, matcher_has_heading, pages, args.rounds)
+        toc_text = "\n".join(pages[:20])
+        bench("detect_mda (20 pages)", legacy_mda_lines, matcher_mda_lines, [toc_text], args.rounds * 10)
+    print("\n✅ All call sites return identical results")
+
+
+if __name__ == "__main__":
+    main()
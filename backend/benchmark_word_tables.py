@@ -0,0 +1,104 @@
+"""
+Benchmark: table extraction per page, lattice vs pdfplumber text strategy vs word positions
+
+Runs three extractors over the same pages of a report and reports, for each, the
+best time per page over N rounds and the yield: tables found and rows with at
+least two numeric cells (the rows extract_kpi_rows can use).
+
+- lattice:  page.extract_tables() (ruling lines only; the pre-router behaviour)
+- text:     page.extract_tables() with pdfplumber's text strategies
+- words:    app.services.word_tables (page.extract_words() + NumPy clustering)
+
+Every round reopens the pages, so parsed page objects are not reused across runs.
+
+Usage:
+    python benchmark_word_tables.py report.pdf [--pages 40-60] [--rounds N]
+"""
+import argparse
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pdfplumber
+
+from app.services.page_classifier import NUMERIC_TOKEN_RE
+from app.services.word_tables import extract_page_tables
+
+TEXT_SETTINGS = {"vertical_strategy": "text", "horizontal_strategy": "text"}
+
+EXTRACTORS = {
+    "lattice": lambda page: page.extract_tables() or [],
+    "text": lambda page: page.extract_tables(TEXT_SETTINGS) or [],
+    "words": extract_page_tables,
+}
+
+
+def numeric_rows(tables):
+    return sum(
+        1
+        for table in tables
+        for row in table
+        if sum(1 for cell in row if cell and NUMERIC_TOKEN_RE.fullmatch(str(cell).strip())) >= 2
+    )
+
+
+def page_indexes(spec, page_count):
+    if not spec:
+        return list(range(page_count))
+    first, _, last = spec.partition("-")
+    first = max(1, int(first))
+    last = min(page_count, int(last or first))
+    return list(range(first - 1, last))
+
+
+def run(pdf_path, indexes, extract):
+    """(seconds spent extracting tables, tables, numeric rows) over `indexes`."""
+    elapsed = 0.0
+    tables = rows = 0
+    with pdfplumber.open(pdf_path) as pdf:
+        for i in indexes:
+            page = pdf.pages[i]
+            start = time.perf_counter()
+            found = extract(page)
+            elapsed += time.perf_counter() - start
+            tables += len(found)
+            rows += numeric_rows(found)
+            page.close()
+    return elapsed, tables, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdf")
+    parser.add_argument("--pages", help="1-based page range, e.g. 40-60 (default: all pages)")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    with pdfplumber.open(args.pdf) as pdf:
+        indexes = page_indexes(args.pages, len(pdf.pages))
+    if not indexes:
+        print("❌ No pages selected")
+        sys.exit(1)
+
+    print(f"⏱  Table extraction on {len(indexes)} pages of {os.path.basename(args.pdf)} ({args.rounds} rounds)\n")
+    print(f"   {'extractor':<9} {'ms/page':>9} {'tables':>7} {'numeric rows':>13}")
+    results = {}
+    for label, extract in EXTRACTORS.items():
+        best = None
+        for _ in range(args.rounds):
+            elapsed, tables, rows = run(args.pdf, indexes, extract)
+            best = elapsed if best is None else min(best, elapsed)
+        results[label] = (best, rows)
+        print(f"   {label:<9} {best * 1000 / len(indexes):9.1f} {tables:7d} {rows:13d}")
+
+    lattice_time, lattice_rows = results["lattice"]
+    words_time, words_rows = results["words"]
+    print(f"\n✅ words vs lattice: {lattice_time / words_time if words_time else float('inf'):.1f}x faster, "
+          f"{words_rows - lattice_rows:+d} numeric rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -46,11 +46,17 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import logging
-from fastapi import FastAPI
-from app.routes import upload, analysis, news, summary, files
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.routes import upload, analysis, news, summary, files, admin, jobs
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.trustedhost import TrustedHostMiddleware
 from app.database import init_db
+from app.services import executor, page_extraction
+from app.services.job_service import job_manager
+from app.services.pdf_pool import pdf_pool
+from app.utils.upload_stream import MAX_UPLOAD_BYTES
 #from config.logging_config import configure_logging
 
 #configure_logging()
@@ -59,9 +65,23 @@ logger = logging.getLogger("app.main")
 # Initialize database
 init_db()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # resume jobs left unfinished by a previous run
+    job_manager.start()
+    yield
+    # stop worker threads and processes on shutdown
+    job_manager.stop()
+    executor.shutdown()
+    page_extraction.shutdown()
+    pdf_pool.clear()
+
+
 app = FastAPI(
     title="Financial Document Analysis API",
-    description="Secure backend for OCR, text extraction, and analysis of financial reports."
+    description="Secure backend for OCR, text extraction, and analysis of financial reports.",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -89,12 +109,27 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+# Reject oversized uploads from the declared Content-Length, before the body is read.
+# Chunked uploads without a length are capped while streaming (app.utils.upload_stream).
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+@app.middleware("http")
+async def reject_oversized_uploads(request: Request, call_next):
+    content_length = request.headers.get("content-length")
+    if request.method == "POST" and content_length and content_length.isdigit():
+        if int(content_length) > MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES:
+            return JSONResponse(status_code=413, content={"detail": "File too large."})
+    return await call_next(request)
+
 # mount routers: upload -> /upload/, analysis -> /analyze/
 app.include_router(upload.router, prefix="/upload", tags=["Upload"])
 app.include_router(analysis.router, prefix="/analyze", tags=["Analysis"])
 app.include_router(news.router, prefix="/news", tags=["News"])
 app.include_router(summary.router, prefix="/summary", tags=["Summary"])
 app.include_router(files.router, prefix="/files", tags=["Files"])
+app.include_router(admin.router, prefix="/admin", tags=["Admin"])
+app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
 
 
 @app.get("/ping", tags=["Health"])
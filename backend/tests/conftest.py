@@ -0,0 +1,31 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+# run from backend/ or the repository root: make the app package importable
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# keep cached analyses / document structures out of the source tree
+os.environ.setdefault("ANALYSIS_CACHE_DIR", tempfile.mkdtemp(prefix="analysis_cache_"))
+
+
+@pytest.fixture
+def open_ocr():
+    """Open an OcrService on a PDF path; closed after the test."""
+    from app.services.ocr_service import OcrService
+
+    opened = []
+
+    def _open(path, **kwargs):
+        ocr = OcrService(str(path), **kwargs)
+        ocr.open()
+        opened.append(ocr)
+        return ocr
+
+    yield _open
+    for ocr in opened:
+        ocr.close()
@@ -0,0 +1,178 @@
+"""
+Minimal PDF writer for the tests: Helvetica text lines and ruling lines on
+letter-size pages, with an optional outline and /PageLabels. No dependencies,
+so tests can build exactly the layouts they exercise.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# (x, y, text, font size)
+Line = Tuple[float, float, str, float]
+# (x0, y0, x1, y1)
+Rule = Tuple[float, float, float, float]
+
+PERIOD_HEADERS = ("June 30, 2025", "March 31, 2025", "March 31, 2024")
+COLUMN_X = (340, 440, 530)
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def text_page(*lines: str, footer: Optional[str] = None) -> Dict[str, list]:
+    """Page with `lines` of body text from the top down and an optional footer line."""
+    page = {"lines": [(72, 740 - 20 * i, line, 12 if i == 0 else 10) for i, line in enumerate(lines)], "rules": []}
+    if footer:
+        page["lines"].append((300, 30, footer, 9))
+    return page
+
+
+def statement_page(
+    title: str,
+    rows: Sequence[Tuple[str, str, str, str]],
+    ruled: bool = True,
+    footer: Optional[str] = None,
+    headers: Sequence[str] = PERIOD_HEADERS,
+) -> Dict[str, list]:
+    """Statement page: `title`, a header row and (label, value, value, value) rows, ruled or borderless."""
+    lines: List[Line] = [(72, 740, title, 14), (72, 700, "Particulars", 10)]
+    lines += [(x - 10, 700, header, 10) for x, header in zip(COLUMN_X, headers)]
+    y = 700
+    for label, *values in rows:
+        y -= 20
+        lines.append((72, y, label, 10))
+        lines += [(x, y, value, 10) for x, value in zip(COLUMN_X, values)]
+    rules: List[Rule] = []
+    if ruled:
+        top, bottom = 715, y - 8
+        rules += [(65, yy, 590, yy) for yy in range(top, int(bottom) - 1, -20)]
+        rules.append((65, bottom, 590, bottom))
+        rules += [(x, top, x, bottom) for x in (65, 320, 420, 510, 590)]
+    if footer:
+        lines.append((300, 30, footer, 9))
+    return {"lines": lines, "rules": rules}
+
+
+def filing(
+    path: str,
+    n_pages: int,
+    statements_at: int,
+    toc: bool = True,
+    cross_reference_at: Optional[int] = None,
+    front_pages: int = 2,
+    cash_flow: bool = True,
+) -> str:
+    """
+    Offer-document-like PDF of `n_pages` pages: narrative pages with printed page
+    numbers in the footers (numbering starts after `front_pages` unnumbered pages),
+    balance sheet / P&L / cash flow on physical pages statements_at .. statements_at + 2
+    under a "Summary of Financial Information" heading, and a pointer to the printed
+    page of that heading: a TOC on page 3 (`toc`) and/or a cross-reference in the
+    body of page `cross_reference_at`. No outline, no /PageLabels. Without `cash_flow`
+    the cash flow page is a narrative page.
+    """
+    printed_start = statements_at - front_pages
+    pages = []
+    for physical in range(1, n_pages + 1):
+        printed = physical - front_pages
+        footer = str(printed) if printed >= 1 else None
+        if toc and physical == 3:
+            page = text_page(
+                "TABLE OF CONTENTS",
+                f"SUMMARY OF FINANCIAL INFORMATION ........ {printed_start}",
+                f"OTHER REGULATORY DISCLOSURES ........ {printed_start + 8}",
+                footer=footer,
+            )
+        elif physical == cross_reference_at:
+            page = text_page(
+                "Overview",
+                f"See Summary of Financial Information on page {printed_start} for the figures.",
+                footer=footer,
+            )
+        elif physical == statements_at:
+            page = statement_page("SUMMARY OF ASSETS AND LIABILITIES", [
+                ("Total assets", "1,234.50", "1,100.00", "(950.25)"),
+                ("Total equity", "600.00", "550.00", "500.00"),
+                ("Total liabilities", "634.50", "550.00", "450.25"),
+            ], footer=footer)
+            page["lines"].insert(1, (72, 760, "SUMMARY OF FINANCIAL INFORMATION", 12))
+        elif physical == statements_at + 1:
+            page = statement_page("SUMMARY STATEMENT OF PROFIT AND LOSS", [
+                ("Total income", "900.00", "800.00", "700.00"),
+                ("Profit for the period", "120.00", "100.00", "-"),
+            ], footer=footer)
+        elif physical == statements_at + 2 and cash_flow:
+            page = statement_page("SUMMARY STATEMENT OF CASH FLOWS", [
+                ("Net cash from operating activities", "80.00", "70.00", "60.00"),
+                ("Net increase in cash", "10.00", "(5.00)", "3.00"),
+            ], footer=footer)
+        else:
+            page = text_page(
+                f"Narrative page {physical}",
+                "Our business grew during the year with new customers.",
+                footer=footer,
+            )
+        pages.append(page)
+    return build_pdf(pages, path)
+
+
+def build_pdf(
+    pages: Sequence[Dict[str, list]],
+    path: str,
+    outline: Optional[Sequence[Tuple[str, int]]] = None,
+    labels_offset: Optional[int] = None,
+) -> str:
+    """
+    Write `pages` to `path`. `outline` lists (title, 0-based page index) entries;
+    `labels_offset` numbers pages from 1 starting at that page index (earlier
+    pages get roman labels). Returns `path`.
+    """
+    objs: List[bytes] = []
+
+    def add(obj: bytes) -> int:
+        objs.append(obj)
+        return len(objs)
+
+    font = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = add(b"")
+    page_ids = []
+    for page in pages:
+        ops = [f"BT /F1 {size} Tf {x} {y} Td ({_escape(text)}) Tj ET" for x, y, text, size in page.get("lines", [])]
+        ops += [f"{x0} {y0} m {x1} {y1} l S" for x0, y0, x1, y1 in page.get("rules", [])]
+        data = "\n".join(ops).encode("latin-1")
+        content = add(b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream")
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (pages_id, content, font)
+        ))
+    kids = " ".join(f"{p} 0 R" for p in page_ids)
+    objs[pages_id - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    catalog = ""
+    if outline:
+        root = len(objs) + 1
+        items = list(range(root + 1, root + 1 + len(outline)))
+        add(f"<< /Type /Outlines /First {items[0]} 0 R /Last {items[-1]} 0 R /Count {len(outline)} >>".encode())
+        for i, (title, index) in enumerate(outline):
+            entry = f"<< /Title ({_escape(title)}) /Parent {root} 0 R /Dest [{page_ids[index]} 0 R /XYZ 0 792 0]"
+            if i > 0:
+                entry += f" /Prev {items[i - 1]} 0 R"
+            if i < len(outline) - 1:
+                entry += f" /Next {items[i + 1]} 0 R"
+            add((entry + " >>").encode())
+        catalog += f" /Outlines {root} 0 R"
+    if labels_offset is not None:
+        catalog += f" /PageLabels << /Nums [0 << /S /r >> {labels_offset} << /S /D /St 1 >>] >>"
+    root_id = add(f"<< /Type /Catalog /Pages {pages_id} 0 R{catalog} >>".encode())
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objs, 1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n".encode() + obj + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objs) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{o:010d} 00000 n \n".encode() for o in offsets)
+    out += f"trailer\n<< /Size {len(objs) + 1} /Root {root_id} 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(out)
+    return path
@@ -0,0 +1,42 @@
+from pdf_factory import build_pdf, statement_page, text_page
+
+BALANCE_SHEET = [
+    ("Total assets", "1,234.50", "1,100.00", "(950.25)"),
+    ("Total equity", "600.00", "550.00", "500.00"),
+]
+# second page of the balance sheet: figures only, no section heading
+CONTINUED = [
+    ("Borrowings", "300.00", "250.00", "200.00"),
+    ("Trade payables", "334.50", "300.00", "250.25"),
+]
+
+
+def test_statement_continued_across_chunk_boundary(tmp_path, open_ocr):
+    pages = [text_page(f"Narrative page {i}", "Our business grew during the year.") for i in range(1, 4)]
+    pages.append(statement_page("SUMMARY OF ASSETS AND LIABILITIES", BALANCE_SHEET))
+    pages.append(statement_page("(continued)", CONTINUED))
+    pages.append(text_page("Narrative page 6", "We discuss our results of operations below."))
+    ocr = open_ocr(build_pdf(pages, str(tmp_path / "continued.pdf")))
+
+    # page 4 ends the first chunk, its continuation opens the second
+    chunked = ocr.scan_statements(chunk_pages=4, early_exit=False)
+    whole = ocr.scan_statements(chunk_pages=16, early_exit=False)
+
+    assert chunked["statement_pages"] == whole["statement_pages"] == [4, 5]
+    assert chunked["pages"][5]["section"] == "balance_sheet"
+
+
+def test_tables_extracted_on_statement_candidates_only(tmp_path, open_ocr):
+    pages = [
+        text_page("Narrative page 1", "Our business grew during the year."),
+        # dense in figures, but no statement keywords and not after a statement page
+        statement_page("KEY OPERATING METRICS", [("Stores", "120", "110", "100"), ("Employees", "900", "850", "800")]),
+        statement_page("SUMMARY OF ASSETS AND LIABILITIES", BALANCE_SHEET),
+        statement_page("(continued)", CONTINUED),
+    ]
+    ocr = open_ocr(build_pdf(pages, str(tmp_path / "metrics.pdf")))
+
+    scan = ocr.scan_statements(early_exit=False)
+
+    assert scan["statement_pages"] == [3, 4]
+    assert [p + 1 for p, entry in ocr._page_cache.items() if "tables" in entry] == [3, 4]
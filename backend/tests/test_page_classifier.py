@@ -0,0 +1,63 @@
+from app.services.page_classifier import MAX_CONTINUATION, classify_pages, numeric_density, section_scores
+
+NARRATIVE = "Our business grew during the year.\nWe discuss our results of operations below."
+BALANCE_SHEET = (
+    "SUMMARY OF ASSETS AND LIABILITIES\n"
+    "Particulars 2025 2024\n"
+    "Total assets 1,234.50 1,100.00\n"
+    "Total equity 600.00 550.00\n"
+)
+PROFIT_AND_LOSS = "SUMMARY STATEMENT OF PROFIT AND LOSS\nTotal income 900.00 800.00\nExpenses 780.00 700.00\n"
+FIGURES = "Borrowings 300.00 250.00\nTrade payables 334.50 (300.00)\n"
+
+
+def test_section_scores_weight_the_title_zone():
+    body_only = "\n" * 10 + "balance sheet"
+    assert section_scores("balance sheet")[0] > section_scores(body_only)[0] > 0
+    assert section_scores(NARRATIVE) == [0.0, 0.0, 0.0]
+
+
+def test_numeric_density():
+    assert numeric_density("") == 0.0
+    assert numeric_density("Total 1,234.50 (12) 5%") == 0.75
+
+
+def test_statement_pages_and_continuations():
+    pages = [(1, NARRATIVE), (2, BALANCE_SHEET), (3, FIGURES), (4, NARRATIVE), (5, PROFIT_AND_LOSS)]
+    result = classify_pages(iter(pages))
+
+    assert result["pages_scanned"] == 5
+    assert result["statement_pages"] == [2, 3, 5]
+    assert [result["pages"][p]["section"] for p in (2, 3, 5)] == ["balance_sheet", "balance_sheet", "pnl"]
+    assert result["pages"][2]["confidence"]["balance_sheet"] == 1.0
+
+
+def test_continuation_run_is_capped():
+    pages = [(1, BALANCE_SHEET)] + [(p, FIGURES) for p in range(2, MAX_CONTINUATION + 4)]
+    result = classify_pages(pages)
+    assert result["statement_pages"] == list(range(1, MAX_CONTINUATION + 2))
+
+
+def test_carry_links_chunks():
+    pages = [(1, NARRATIVE), (2, BALANCE_SHEET), (3, FIGURES), (4, FIGURES), (5, FIGURES)]
+    whole = classify_pages(pages)
+    first = classify_pages(pages[:2])
+    second = classify_pages(pages[2:], carry=first["carry"])
+
+    assert first["statement_pages"] + second["statement_pages"] == whole["statement_pages"]
+    assert second["carry"] == whole["carry"]
+    # without the carry the continuation pages of the next chunk are lost
+    assert classify_pages(pages[2:])["statement_pages"] == []
+
+
+def test_keywords_inside_words_do_not_score():
+    # "oci" (other comprehensive income) occurs inside "associates"
+    notes = (
+        "Note 7: Investments in associates\n"
+        "Associate A 1,200.00 1,100.00\n"
+        "Associate B 300.00 250.00\n"
+        "Total investments in associates 1,500.00 1,350.00\n"
+    )
+    assert section_scores(notes) == [0.0, 0.0, 0.0]
+    assert classify_pages([(1, notes)])["statement_pages"] == []
+    assert section_scores("Other comprehensive income (OCI)")[1] > 0
@@ -0,0 +1,100 @@
+import pytest
+
+from app.services import analysis_pipeline
+from app.services.analysis_pipeline import run_analysis
+from app.services.document_structure import load_structure
+from app.services.ocr_service import WINDOW_PAGE_BUDGET
+from pdf_factory import filing
+
+# large enough for the sampling search (SAMPLE_SEARCH_MIN_PAGES) to apply
+PAGES = 320
+STATEMENTS_AT = 201
+
+
+@pytest.fixture(scope="module")
+def pdfs(tmp_path_factory):
+    root = tmp_path_factory.mktemp("filings")
+    return {
+        "toc": filing(str(root / "toc.pdf"), PAGES, STATEMENTS_AT),
+        "no_toc": filing(str(root / "no_toc.pdf"), PAGES, STATEMENTS_AT, toc=False),
+        # page 91 is sampled at the first stride, which passes over pages 201-203
+        "cross_reference": filing(str(root / "xref.pdf"), PAGES, STATEMENTS_AT, toc=False, cross_reference_at=91),
+        "no_cash_flow": filing(str(root / "no_cash_flow.pdf"), PAGES, STATEMENTS_AT, cash_flow=False),
+    }
+
+
+def _analyze(path):
+    stages = []
+    result = run_analysis(path, True, lambda stage, **info: stages.append(stage))
+    return result["debug"]["statement_search"], stages
+
+
+def test_toc_entry_is_used_before_the_sampling_search(pdfs):
+    assert PAGES >= analysis_pipeline.SAMPLE_SEARCH_MIN_PAGES
+    search, stages = _analyze(pdfs["toc"])
+
+    assert search["scope"] == "toc"
+    assert search["toc_start"] == STATEMENTS_AT
+    assert search["sampling"] is None
+    assert "statements_located" not in stages
+    assert search["found"] == {"balance_sheet": STATEMENTS_AT, "pnl": STATEMENTS_AT + 1, "cash_flow": STATEMENTS_AT + 2}
+    assert search["pages_skipped"] >= PAGES - 5
+
+
+def test_missing_statement_rescans_only_pages_next_to_the_scope(pdfs):
+    search, _ = _analyze(pdfs["no_cash_flow"])
+
+    assert search["scope"] == "toc"
+    assert search["found"] == {"balance_sheet": STATEMENTS_AT, "pnl": STATEMENTS_AT + 1}
+    first, rescan = search["passes"]
+    assert (first["first_page"], first["last_page"]) == (STATEMENTS_AT, PAGES)
+    assert (rescan["first_page"], rescan["last_page"]) == (STATEMENTS_AT - WINDOW_PAGE_BUDGET, STATEMENTS_AT - 1)
+    assert search["pages_scanned"] == first["pages_scanned"] + rescan["pages_scanned"]
+    assert search["pages_scanned"] == PAGES - STATEMENTS_AT + 1 + WINDOW_PAGE_BUDGET
+    assert search["pages_skipped"] == PAGES - search["pages_scanned"]
+
+
+def test_sampling_search_without_toc(pdfs):
+    search, stages = _analyze(pdfs["no_toc"])
+
+    assert search["scope"] == "sampled"
+    assert search["toc_start"] is None
+    assert search["sampling"]["start"] == STATEMENTS_AT and search["sampling"]["confirmed"]
+    assert stages.index("toc_found") < stages.index("statements_located")
+    assert search["found"]["balance_sheet"] == STATEMENTS_AT
+
+
+def test_sampling_follows_printed_page_numbers(pdfs, open_ocr):
+    path = pdfs["cross_reference"]
+    structure = load_structure(path)
+    assert structure.label_source == "footers"
+
+    located = open_ocr(path, structure=structure).locate_statement_section()
+    assert located["pointer"] == 91
+    assert located["anchor"] == located["start"] == STATEMENTS_AT
+    assert located["levels"] == 1
+
+    # without the pointer the first stride misses the three statement pages
+    assert open_ocr(pdfs["no_toc"], structure=load_structure(pdfs["no_toc"])).locate_statement_section()["levels"] > 1
+
+
+def test_heading_search_reads_full_text_only_where_the_probe_cannot(pdfs, open_ocr, monkeypatch):
+    path = pdfs["toc"]
+    ocr = open_ocr(path, structure=load_structure(path))
+    full_reads = []
+    page_text = ocr.page_text
+    monkeypatch.setattr(ocr, "page_text", lambda p: full_reads.append(p) or page_text(p))
+    probe = ocr.page_probe_text
+
+    def failing_probe(p):
+        if p == 129:
+            raise RuntimeError("probe failed")
+        return probe(p)
+
+    monkeypatch.setattr(ocr, "page_probe_text", failing_probe)
+
+    # printed page 100 is physical page 102; the heading (page 201) is past the budget
+    mapped = ocr.map_logical_to_physical(100)
+
+    assert mapped["physical_start"] == mapped["mapped_physical_start"] == 102
+    assert full_reads == [129]
@@ -0,0 +1,118 @@
+import math
+
+import pytest
+
+from app.services.keyword_matcher import KeywordMatcher
+from app.services.statement_table import LabelIndex, StatementTable, normalize_label
+from app.services.table_extractor import extract_kpi_rows, normalize_table, parse_numeric_tables
+
+BALANCE_SHEET = [
+    ["Particulars", "March 31, 2025", "March 31, 2024"],
+    ["Total assets", "1,234.50", "1,100"],
+    ["Total equity", "(600.00)", "-"],
+    ["Contingent liabilities", "Refer note 5", ""],
+    ["Short row"],
+]
+UNLABELLED = [["2025", "2024"], ["12", "14.5"], ["13"]]
+
+
+def _table(raw, labelled):
+    norm = normalize_table(raw)
+    return StatementTable.from_numeric(norm, parse_numeric_tables([norm])[0], labelled)
+
+
+@pytest.mark.parametrize("raw, labelled", [(BALANCE_SHEET, True), (UNLABELLED, False)])
+def test_rows_match_extract_kpi_rows(raw, labelled):
+    assert _table(raw, labelled).to_rows() == extract_kpi_rows(raw, force_label_column=labelled)
+
+
+def test_from_rows_round_trip():
+    rows = _table(BALANCE_SHEET, True).to_rows()
+    again = StatementTable.from_rows(rows)
+    assert again.to_rows() == rows
+    assert type(again.to_rows()[1]["values"]["col_2"]) is int
+    assert StatementTable.from_rows([]).to_rows() == []
+
+
+def test_cell_access():
+    table = _table(BALANCE_SHEET, True)
+    assert len(table) == 5 and table.width == 3
+    assert table.value(1, 1) == 1234.5
+    assert table.value(2, 1) == -600.0
+    assert table.value(2, 2) is None  # nil marker
+    assert table.value(1, 0) is None  # label column
+    assert table.value(1, 7) is None  # past the last column
+    assert table.numeric_columns(1) == [1, 2]
+    assert table.first_value(2) == -600.0
+    assert table.first_value(3) is None
+    assert table.has_values().tolist() == [False, True, True, False, False]
+    assert table.periods == {1: "March 31, 2025", 2: "March 31, 2024"}
+
+
+def test_concat_and_take():
+    labelled, unlabelled = _table(BALANCE_SHEET, True), _table(UNLABELLED, False)
+    combined = StatementTable.concat([labelled, StatementTable.empty(), unlabelled])
+
+    assert combined.to_rows() == labelled.to_rows() + unlabelled.to_rows()
+    assert combined.width == 3
+    assert math.isnan(combined.values[-1, 2]) and combined.mask[-1, 2]
+    assert StatementTable.concat([labelled]) is labelled
+    assert len(StatementTable.concat([])) == 0
+
+    picked = combined.take([6, 1])
+    assert picked.to_rows() == [combined.to_rows()[6], combined.to_rows()[1]]
+    assert combined.take([3]).to_rows() == [{"label": "Contingent liabilities", "values": {"col_1": "Refer note 5", "col_2": None}}]
+
+
+LABELS = [
+    "Particulars",
+    "Total Assets:",
+    None,
+    "Total equity",
+    "Non-current liabilities",
+    "Total liabilities",
+    "Total  Assets",
+    "Revenue from operations",
+    "Other income",
+]
+
+
+@pytest.fixture
+def index():
+    matcher = KeywordMatcher({"kpi": ["totalassets", "liabilities", "equity", "revenue", "income", "total"]})
+    return LabelIndex(LABELS, matcher)
+
+
+def test_normalize_label():
+    assert normalize_label("Total Assets:") == "totalassets"
+    assert normalize_label("T otal equity.") == "totalequity"
+    assert normalize_label(None) == normalize_label("") == ""
+
+
+def test_label_index_exact(index):
+    assert index.keys[1] == index.keys[6] == "totalassets"
+    assert index.keys[2] == ""
+    assert index.exact(["totalassets"]) == 1
+    assert index.exact(["totalliabilities", "totalequity"]) == 3
+    assert index.exact(["missing"]) is None
+
+
+def test_label_index_containing_and_prefix(index):
+    assert index.containing(["liabilities"]) == 4
+    assert index.containing(["liabilities"], exclude=["non-current"]) == 5
+    assert index.containing(["income", "revenue"]) == 7
+    assert index.starting_with(["total"]) == 1
+    assert index.starting_with(["liabilities"]) is None
+    # keywords outside the matcher fall back to a scan of the keys
+    assert index.containing(["fromoperations"]) == 7
+    assert index.starting_with(["other"]) == 8
+    assert index.containing(["nothing"]) is None
+
+
+def test_label_index_matches_brute_force(index):
+    keys = index.keys
+    for keyword in ["totalassets", "liabilities", "equity", "revenue", "income", "total", "assets", "tal"]:
+        contains = [r for r, k in enumerate(keys) if keyword in k]
+        prefix = [r for r, k in enumerate(keys) if k.startswith(keyword)]
+        assert index.containing([keyword]) == (contains[0] if contains else None)
+        assert index.starting_with([keyword]) == (prefix[0] if prefix else None)
@@ -0,0 +1,56 @@
+import math
+
+import pytest
+
+from app.services.table_extractor import detect_label_column, extract_kpi_rows, parse_numeric_table, parse_numeric_tables
+
+
+@pytest.mark.parametrize(
+    "cell, value",
+    [
+        ("1,234", 1234),
+        ("12,34,567.50", 1234567.5),
+        ("(1,23,456.50)", -123456.5),
+        ("-42", -42),
+        ("+5", 5),
+        (".5", 0.5),
+        ("1 234", 1234),
+        ("-", None),
+        ("—", None),
+        ("N/A", None),
+        ("", None),
+        ("31.03.2025", "31.03.2025"),
+        ("1.2.3", "1.2.3"),
+        ("Revenue", "Revenue"),
+    ],
+)
+def test_cell_values(cell, value):
+    parsed = parse_numeric_table([["Label", cell]])
+    got = parsed.cells[0, 1]
+    assert got == value and type(got) is type(value)
+    assert parsed.valid[0, 1] == isinstance(value, (int, float))
+
+
+def test_batch_parse_matches_single_tables():
+    tables = [[["Revenue", "1,234.50"], ["Net profit", "(12.00)"]], [], [["Total", "1", "2", "3"]]]
+    for batch, single in zip(parse_numeric_tables(tables), map(parse_numeric_table, tables)):
+        assert batch.values.shape == single.values.shape
+        assert (batch.valid == single.valid).all()
+        assert all(
+            a == b or (math.isnan(a) and math.isnan(b)) for a, b in zip(batch.values.ravel(), single.values.ravel())
+        )
+        assert batch.numeric_share.tolist() == single.numeric_share.tolist()
+
+
+def test_date_headers_count_as_figures_for_label_detection():
+    # the header dates keep the figure columns numeric enough for the labels to be detected
+    table = [["Particulars", "31.03.2025", "31.03.2024"], ["Revenue from operations", "1,234.50", "1,100.00"]]
+    assert detect_label_column(table) == (True, 0)
+    rows = extract_kpi_rows(table)
+    assert rows[1] == {"label": "Revenue from operations", "values": {"col_1": 1234.5, "col_2": 1100.0}}
+    assert rows[0]["values"] == {"col_1": "31.03.2025", "col_2": "31.03.2024"}
+
+
+def test_section_numbers_in_first_column_are_not_labels():
+    table = [["1.1", "Revenue", "1,234.50"], ["1.2", "Net profit", "120.00"]]
+    assert detect_label_column(table) == (False, 0)
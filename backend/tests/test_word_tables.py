@@ -0,0 +1,41 @@
+import pdfplumber
+
+from app.services import table_strategy
+from app.services.table_extractor import extract_kpi_rows, normalize_table
+from app.services.word_tables import reconstruct_tables
+from pdf_factory import build_pdf, statement_page
+
+ROWS = [
+    ("Total income", "900.00", "800.00", "700.00"),
+    ("Other expenses (Note 3)", "(120.50)", "-", "98.25"),
+    ("Total expenses", "780.00", "700.00", "600.00"),
+    ("Profit for the period", "1,20,000", "100.00", "-"),
+]
+
+
+def _page_words(tmp_path):
+    path = build_pdf([statement_page("SUMMARY STATEMENT OF PROFIT AND LOSS", ROWS, ruled=False)], str(tmp_path / "p.pdf"))
+    with pdfplumber.open(path) as pdf:
+        page = pdf.pages[0]
+        return page.extract_tables(), page.extract_words(), table_strategy.extract_page_tables(page)
+
+
+def test_borderless_statement_is_rebuilt_from_words(tmp_path):
+    lattice, words, routed = _page_words(tmp_path)
+    assert lattice == []
+
+    tables = reconstruct_tables(words)
+    assert len(tables) == 1
+    table = tables[0]
+    assert table[0] == ["Particulars", "June 30, 2025", "March 31, 2025", "March 31, 2024"]
+    assert table[1:] == [list(row) for row in ROWS]
+    # a page without rulings is routed to the word-position strategy
+    assert routed == tables
+
+    rows = extract_kpi_rows(normalize_table(table))
+    assert rows[2] == {"label": "Other expenses (Note 3)", "values": {"col_1": -120.5, "col_2": None, "col_3": 98.25}}
+    assert rows[4]["values"]["col_1"] == 120000
+
+
+def test_no_words_no_tables():
+    assert reconstruct_tables([]) == []